@@ -0,0 +1,54 @@
+"""Moonlark 基准测试公共工具
+
+基准测试脚本需在仓库根目录下运行，例如：
+
+    poetry run python benchmarks/bench_larklang_text.py
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+ROOT = Path(__file__).parent.parent
+
+os.environ.setdefault("SQLALCHEMY_DATABASE_URL", "sqlite+aiosqlite://")
+os.environ.setdefault("ALEMBIC_STARTUP_CHECK", "False")
+
+
+def init_nonebot(*plugins: str) -> None:
+    """初始化 NoneBot 并加载指定插件"""
+    import nonebot
+
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT.joinpath("src/plugins").as_posix())
+    nonebot.init()
+    for plugin in plugins:
+        nonebot.require(plugin)
+
+
+async def create_tables() -> None:
+    """在测试数据库中创建所有 ORM 表"""
+    from nonebot_plugin_orm import Model, get_session
+
+    async with get_session() as session:
+        connection = await session.connection()
+        await connection.run_sync(Model.metadata.create_all)
+        await session.commit()
+
+
+async def measure(name: str, func: Callable[[], Awaitable[Any]], count: int) -> float:
+    """执行 count 次 func 并输出每秒调用次数"""
+    begin = time.perf_counter()
+    for _ in range(count):
+        await func()
+    cost = time.perf_counter() - begin
+    rate = count / cost
+    print(f"{name:<48} {count:>8} 次  {cost:>8.3f} s  {rate:>12.1f} 次/秒")
+    return rate
+
+
+def report(name: str, **values: Any) -> None:
+    """输出一行基准测试结果"""
+    print(f"{name:<48} " + "  ".join(f"{key}={value}" for key, value in values.items()))
@@ -0,0 +1,50 @@
+"""调用方插件解析开销基准测试
+
+对比 `inspect.stack()` 与 `get_caller_plugin_name()`（`sys._getframe` + 代码对象缓存）的单次耗时，
+并测量 LangHelper 构造与 open_file 的开销。
+"""
+
+import time
+import inspect
+from typing import Any, Callable
+
+from _utils import report, init_nonebot
+
+COUNT = 20000
+
+
+def measure_sync(name: str, func: Callable[[], Any], count: int = COUNT) -> None:
+    begin = time.perf_counter()
+    for _ in range(count):
+        func()
+    cost = time.perf_counter() - begin
+    report(name, count=count, per_call=f"{cost / count * 1e6:.2f}us")
+
+
+def main() -> None:
+    init_nonebot("nonebot_plugin_larklang")
+
+    from nonebot_plugin_larklang import LangHelper
+    from nonebot_plugin_larkutils import FileType, open_file, get_caller_plugin_name
+
+    # 以插件模块的全局命名空间编译调用方，模拟插件内部的调用
+    plugin_globals = {
+        "__name__": "nonebot_plugin_larklang.command",
+        "inspect": inspect,
+        "LangHelper": LangHelper,
+        "FileType": FileType,
+        "open_file": open_file,
+        "get_caller_plugin_name": get_caller_plugin_name,
+    }
+
+    def from_plugin(expr: str) -> Callable[[], Any]:
+        return eval(f"lambda: {expr}", plugin_globals)  # noqa: S307
+
+    measure_sync("inspect.stack()", from_plugin("inspect.stack()"), COUNT // 20)
+    measure_sync("get_caller_plugin_name()", from_plugin("get_caller_plugin_name(0)"))
+    measure_sync("LangHelper()", from_plugin("LangHelper()"))
+    measure_sync("open_file()", from_plugin("open_file('bench.json', FileType.CACHE)"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""回声洞文本查重基准测试
+
+生成指定规模的回声洞文本（随机中文句子），其中一部分投稿为已有回声洞的改写（随机增删改若干字符），
+对比逐一 SequenceMatcher 比较（原实现）与 MinHash/LSH 候选筛选的耗时，
+并检查两者对每条投稿的判定（是否达到 cave_maximum_similarity）是否一致。
+
+    python benchmarks/bench_cave_text_similarity.py [规模 ...]
+"""
+
+import sys
+import time
+import random
+import difflib
+
+from _utils import report, init_nonebot
+
+QUERIES = 100
+CHARSET = "的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可主发年动同工也能下过子说产种面而方后多定行学法所民得经十三之进着等部度家电力里如水化高自二理起小物现实加量都两体制机当使点从业本去把性好应开它合还因由其些然前外天政四日那社义事平形相全表间样与关各重新线内数正心反你明看原又么利比或但质气第向道命此变条只没结解问意建月公无系军很情者最立代想已通并提直题党程展五果料象员革位入常文总次品式活设及管特件长求老头基资边流路级少图山统接知较将组见计别她手角期根论运农指几九区强放决西被干做必战先回则任取据处理府研质"
+
+
+def random_text(rng: random.Random) -> str:
+    return "".join(rng.choices(CHARSET, k=rng.randint(10, 120)))
+
+
+def mutate(text: str, rng: random.Random) -> str:
+    chars = list(text)
+    for _ in range(rng.randint(0, max(1, len(chars) // 8))):
+        position = rng.randrange(len(chars))
+        action = rng.random()
+        if action < 0.4:
+            chars[position] = rng.choice(CHARSET)
+        elif action < 0.7:
+            chars.insert(position, rng.choice(CHARSET))
+        elif len(chars) > 1:
+            chars.pop(position)
+    return "".join(chars)
+
+
+def main() -> None:
+    init_nonebot("nonebot_plugin_larkcave")
+
+    from nonebot_plugin_larkcave.config import config
+    from moonlark_cave_similarity import find_similar_cave
+    from nonebot_plugin_larkcave.utils.text_index import MinHashLSH
+
+    threshold = config.cave_maximum_similarity
+    sizes = [int(size) for size in sys.argv[1:]] or [1_000, 10_000, 50_000]
+    for size in sizes:
+        rng = random.Random(size)
+        caves = [(cave_id, random_text(rng)) for cave_id in range(size)]
+        postings = [mutate(rng.choice(caves)[1], rng) for _ in range(QUERIES // 2)]
+        postings += [random_text(rng) for _ in range(QUERIES // 2)]
+
+        begin = time.perf_counter()
+        index = MinHashLSH()
+        for cave_id, content in caves:
+            index.add(cave_id, index.get_signature(content))
+        report(f"MinHashLSH 构建 ({size})", cost=f"{time.perf_counter() - begin:.3f}s")
+
+        scan_count = min(QUERIES, max(4, 200_000 // size))
+        begin = time.perf_counter()
+        expected = []
+        for posting in postings[: scan_count // 2] + postings[QUERIES // 2 : QUERIES // 2 + scan_count // 2]:
+            expected.append(
+                any(difflib.SequenceMatcher(None, content, posting).ratio() >= threshold for _, content in caves)
+            )
+        cost = time.perf_counter() - begin
+        report(f"逐一比较（原实现） ({size})", queries=scan_count, per_query=f"{cost / scan_count * 1e3:.2f}ms")
+
+        begin = time.perf_counter()
+        candidate_count = 0
+        results = []
+        for posting in postings:
+            candidates = sorted(index.query(index.get_signature(posting)))
+            candidate_count += len(candidates)
+            results.append(find_similar_cave(posting, [caves[i] for i in candidates], threshold) is not None)
+        cost = time.perf_counter() - begin
+        report(
+            f"LSH 候选 + 比较 ({size})",
+            queries=len(postings),
+            per_query=f"{cost / len(postings) * 1e3:.2f}ms",
+            candidates=f"{candidate_count / len(postings):.1f}",
+        )
+
+        # 与逐一比较结果不一致（LSH 漏检）的投稿数
+        checked = results[: scan_count // 2] + results[QUERIES // 2 : QUERIES // 2 + scan_count // 2]
+        missed = sum(exp and not got for exp, got in zip(expected, checked))
+        report(f"判定一致性 ({size})", checked=len(checked), duplicates=sum(expected), missed=missed)
+
+
+if __name__ == "__main__":
+    main()
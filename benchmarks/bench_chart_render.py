@@ -0,0 +1,75 @@
+"""图表渲染事件循环阻塞测试
+
+对比在事件循环中直接绘制与通过 render_chart 在进程池中绘制 N 张折线图的总用时，
+并以一个每 10ms 唤醒一次的探测任务记录期间事件循环的最大延迟。
+
+    poetry run python benchmarks/bench_chart_render.py [并发数]
+"""
+
+import sys
+import time
+import asyncio
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable
+
+from _utils import report, init_nonebot
+
+PROBE_INTERVAL = 0.01
+
+
+async def probe(stop: asyncio.Event, lags: list[float]) -> None:
+    while not stop.is_set():
+        begin = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append((time.perf_counter() - begin - PROBE_INTERVAL) * 1000)
+
+
+async def run(name: str, func: Callable[[], Awaitable[object]]) -> None:
+    stop = asyncio.Event()
+    lags: list[float] = []
+    task = asyncio.create_task(probe(stop, lags))
+    await asyncio.sleep(0)
+    begin = time.perf_counter()
+    await func()
+    cost = time.perf_counter() - begin
+    stop.set()
+    await task
+    report(name, wall=f"{cost:.3f}s", max_loop_lag=f"{max(lags, default=0):.1f}ms")
+
+
+async def main(concurrency: int) -> None:
+    init_nonebot("nonebot_plugin_render")
+
+    from moonlark_chart import LineChart, prewarm
+    from nonebot_plugin_render.chart import get_executor, render_chart
+
+    now = datetime(2026, 1, 1)
+    chart = LineChart(
+        figsize=(12, 6),
+        dpi=200,
+        title="趋势",
+        x=[now + timedelta(minutes=10 * i) for i in range(144)],
+        y=[i * 37 % 100 for i in range(144)],
+        line_kwargs={"marker": "o", "linewidth": 2, "markersize": 4},
+        grid={"visible": True, "alpha": 0.3},
+    )
+    # 预热进程池与当前进程的字体缓存
+    await asyncio.get_running_loop().run_in_executor(get_executor(), prewarm)
+    prewarm()
+    chart.render()
+
+    async def inline() -> None:
+        for _ in range(concurrency):
+            chart.render()
+            await asyncio.sleep(0)
+
+    async def pooled() -> None:
+        await asyncio.gather(*[render_chart(chart) for _ in range(concurrency)])
+
+    await run(f"事件循环内绘制 x{concurrency}", inline)
+    await run(f"render_chart 进程池 x{concurrency}", pooled)
+    get_executor().shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 8))
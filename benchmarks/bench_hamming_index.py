@@ -0,0 +1,76 @@
+"""感知哈希查重基准测试
+
+在 1 万 / 10 万 / 100 万个随机 256 位哈希上对比 HammingIndex 与线性扫描（整数异或计数）的查询耗时，
+并在 1 万规模上给出原实现（逐行 imagehash.hex_to_hash）的耗时作为参照。
+查询中一半为已存储哈希翻转若干位后的近似重复，一半为随机哈希。
+
+    python benchmarks/bench_hamming_index.py [规模 ...]
+"""
+
+import sys
+import time
+import random
+from typing import Callable
+
+from _utils import report, init_nonebot
+
+BITS = 256
+SIMILARITY = 0.98
+QUERIES = 200
+
+
+def flip_bits(value: int, count: int, rng: random.Random) -> int:
+    for position in rng.sample(range(BITS), count):
+        value ^= 1 << position
+    return value
+
+
+def measure_queries(name: str, size: int, func: Callable[[int], int], queries: list[int]) -> None:
+    begin = time.perf_counter()
+    found = sum(func(query) for query in queries)
+    cost = time.perf_counter() - begin
+    report(f"{name} ({size})", queries=len(queries), found=found, per_query=f"{cost / len(queries) * 1e3:.3f}ms")
+
+
+def main() -> None:
+    init_nonebot("nonebot_plugin_larkutils")
+
+    import imagehash
+    from nonebot_plugin_larkutils import HammingIndex, get_max_distance
+
+    sizes = [int(size) for size in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    max_distance = get_max_distance(SIMILARITY, BITS)
+    for size in sizes:
+        rng = random.Random(size)
+        hashes = [rng.getrandbits(BITS) for _ in range(size)]
+        queries = [flip_bits(rng.choice(hashes), rng.randint(0, max_distance), rng) for _ in range(QUERIES // 2)]
+        queries += [rng.getrandbits(BITS) for _ in range(QUERIES // 2)]
+
+        begin = time.perf_counter()
+        index: HammingIndex[int] = HammingIndex(BITS)
+        for key, value in enumerate(hashes):
+            index.add(key, value)
+        report(f"HammingIndex 构建 ({size})", cost=f"{time.perf_counter() - begin:.3f}s")
+
+        measure_queries("HammingIndex.search", size, lambda query: len(index.search(query, max_distance)), queries)
+        measure_queries(
+            "线性扫描（整数异或）",
+            size,
+            lambda query: sum((value ^ query).bit_count() <= max_distance for value in hashes),
+            queries[:20],
+        )
+        if size <= 10_000:
+            hex_hashes = [f"{value:064x}" for value in hashes]
+
+            def scan_hex(query: int) -> int:
+                query_hex = f"{query:064x}"
+                return sum(
+                    imagehash.hex_to_hash(query_hex) - imagehash.hex_to_hash(value) <= max_distance
+                    for value in hex_hashes
+                )
+
+            measure_queries("线性扫描（imagehash，原实现）", size, scan_hex, queries[:4])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""LangHelper.text 吞吐量基准测试
+
+对比旧实现（每次调用查询 LanguageKeyCache 并 json.loads）与进程内 LanguageTable 的每秒调用次数。
+"""
+
+import json
+import random
+import asyncio
+
+from _utils import measure, init_nonebot, create_tables
+
+COUNT = 20000
+
+
+async def main() -> None:
+    init_nonebot("nonebot_plugin_larklang")
+
+    from sqlalchemy import select
+    from nonebot_plugin_orm import get_session
+    from nonebot_plugin_larklang.models import LanguageKeyCache
+    from nonebot_plugin_larklang.__main__ import LangHelper, get_text, load_languages
+
+    await create_tables()
+    await load_languages()
+    lang = LangHelper("larklang")
+
+    async def legacy_get_text() -> str:
+        async with get_session() as session:
+            data = await session.scalar(
+                select(LanguageKeyCache.text).where(
+                    LanguageKeyCache.language == "zh_hans",
+                    LanguageKeyCache.plugin == "larklang",
+                    LanguageKeyCache.key == "set.success",
+                )
+            )
+        return random.choice(json.loads(data or "[]")).format("zh_hans")
+
+    async def table_get_text() -> str:
+        return await get_text("zh_hans", "larklang", "set.success", "zh_hans")
+
+    async def helper_text() -> str:
+        return await lang.text("set.success", "benchmark-user", "zh_hans")
+
+    await measure("get_text (LanguageKeyCache 查询)", legacy_get_text, COUNT)
+    await measure("get_text (LanguageTable)", table_get_text, COUNT)
+    await measure("LangHelper.text", helper_text, COUNT)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
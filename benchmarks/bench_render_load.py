@@ -0,0 +1,65 @@
+"""Render 并发负载测试
+
+以 N 个并发 render_template 调用回放本地 HTML 模板（benchmarks/fixtures/render_load.html.jinja），
+输出吞吐量、端到端延迟分位数以及渲染引擎记录的各阶段平均用时。
+
+    poetry run python benchmarks/bench_render_load.py [并发数] [轮数]
+"""
+
+import sys
+import time
+import asyncio
+
+from _utils import ROOT, report, init_nonebot, create_tables
+
+
+async def main(concurrency: int, rounds: int) -> None:
+    init_nonebot("nonebot_plugin_render")
+
+    from nonebot_plugin_htmlrender import init_browser, shutdown_browser
+    from nonebot_plugin_render.engine import engine
+    from nonebot_plugin_larklang.__main__ import load_languages
+    from nonebot_plugin_render.render import env, render_template
+
+    await create_tables()
+    await load_languages()
+    await init_browser()
+    env.loader.searchpath.append(ROOT.joinpath("benchmarks/fixtures").as_posix())  # type: ignore
+    templates = {"rows": [{"index": i, "name": f"user-{i}", "value": i * 37 % 1000} for i in range(30)]}
+
+    async def render_once() -> float:
+        begin = time.perf_counter()
+        await render_template(
+            "render_load.html.jinja",
+            "Render Load",
+            "mlsid::--lang=zh_hans",
+            templates,
+            {"title": "Render Load"},
+            result_cache=False,
+        )
+        return (time.perf_counter() - begin) * 1000
+
+    # 预热页面池
+    await asyncio.gather(*[render_once() for _ in range(engine.pool.size)])
+    engine.stats.timings.clear()
+
+    latencies: list[float] = []
+    begin = time.perf_counter()
+    for _ in range(rounds):
+        latencies.extend(await asyncio.gather(*[render_once() for _ in range(concurrency)]))
+    cost = time.perf_counter() - begin
+    latencies.sort()
+    report(
+        f"render_template x{concurrency} 并发",
+        renders=len(latencies),
+        throughput=f"{len(latencies) / cost:.2f}/s",
+        p50=f"{latencies[len(latencies) // 2]:.1f}ms",
+        p99=f"{latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]:.1f}ms",
+    )
+    report("各阶段平均用时 (ms)", **{k: f"{v:.1f}" for k, v in engine.stats.summary().items()})
+    await engine.stop()
+    await shutdown_browser()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 16, int(sys.argv[2]) if len(sys.argv) > 2 else 5))
@@ -0,0 +1,55 @@
+"""Render 后处理格式对比
+
+对已渲染的模板图片（默认取 Render 缓存目录中的文件，也可通过参数指定 PNG 文件）比较
+PNG / WebP / JPEG 的编码耗时与输出大小。
+
+    poetry run python benchmarks/bench_render_postprocess.py [image.png ...]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+from _utils import report, init_nonebot
+
+ROUNDS = 5
+
+
+def main(files: list[Path]) -> None:
+    init_nonebot("nonebot_plugin_render")
+
+    from PIL import Image, UnidentifiedImageError
+    from nonebot_plugin_render.cache import cache_dir
+    from nonebot_plugin_render.config import config
+    from nonebot_plugin_render.postprocess import process_image
+
+    if not files:
+        files = [path for path in cache_dir.iterdir() if path.is_file()]
+    totals: dict[str, list[float]] = {}
+    for path in files:
+        image = path.read_bytes()
+        try:
+            with Image.open(path) as img:
+                if img.format != "PNG":
+                    continue
+                size = img.size
+        except UnidentifiedImageError:
+            continue
+        for image_format in ("png", "webp", "jpeg"):
+            for scale in (1.0, 0.75):
+                begin = time.perf_counter()
+                for _ in range(ROUNDS):
+                    output = process_image(image, scale, image_format, config.render_output_quality)  # type: ignore
+                cost = (time.perf_counter() - begin) / ROUNDS * 1000
+                name = f"{image_format}@{scale}"
+                totals.setdefault(name, [0, 0, 0])
+                totals[name][0] += cost
+                totals[name][1] += len(output)
+                totals[name][2] += 1
+                report(f"{path.name[:16]} {size[0]}x{size[1]} {name}", encode=f"{cost:.1f}ms", size=len(output))
+    for name, (cost, size, count) in totals.items():
+        report(f"平均 {name}", encode=f"{cost / count:.1f}ms", size=f"{size / count / 1024:.1f}KiB")
+
+
+if __name__ == "__main__":
+    main([Path(arg) for arg in sys.argv[1:]])
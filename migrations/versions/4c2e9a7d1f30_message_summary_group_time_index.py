@@ -0,0 +1,42 @@
+"""add (group_id, timestamp) index to GroupMessage
+
+迁移 ID: 4c2e9a7d1f30
+父迁移: b357abbaba3a
+创建时间: 2026-10-18 16:30:00.000000
+
+群消息按群与时间范围查询，过期消息按时间批量删除，为其添加 (group_id, timestamp) 联合索引。
+
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "4c2e9a7d1f30"
+down_revision: str | Sequence[str] | None = "b357abbaba3a"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+TABLE_NAME = "nonebot_plugin_message_summary_groupmessage"
+INDEX_NAME = "ix_nonebot_plugin_message_summary_groupmessage_group_id_timestamp"
+
+
+def upgrade(name: str = "") -> None:
+    if name:
+        return
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(TABLE_NAME):
+        return
+    if INDEX_NAME not in [index["name"] for index in inspector.get_indexes(TABLE_NAME)]:
+        op.create_index(INDEX_NAME, TABLE_NAME, ["group_id", "timestamp"], unique=False)
+
+
+def downgrade(name: str = "") -> None:
+    if name:
+        return
+    inspector = sa.inspect(op.get_bind())
+    if INDEX_NAME in [index["name"] for index in inspector.get_indexes(TABLE_NAME)]:
+        op.drop_index(INDEX_NAME, table_name=TABLE_NAME)
@@ -0,0 +1,74 @@
+"""add OnlineTimeDaily rollup table
+
+迁移 ID: 7b3e1d9c5a42
+父迁移: 4c2e9a7d1f30
+创建时间: 2026-10-18 17:00:00.000000
+
+新增用户每日在线时长汇总表，并由现有的在线时段记录回填。
+
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Sequence
+from datetime import date, datetime, time, timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "7b3e1d9c5a42"
+down_revision: str | Sequence[str] | None = "4c2e9a7d1f30"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+TABLE_NAME = "nonebot_plugin_online_timer_onlinetimedaily"
+RECORD_TABLE_NAME = "nonebot_plugin_online_timer_onlinetimerecord"
+
+
+def upgrade(name: str = "") -> None:
+    if name:
+        return
+    daily_table = op.create_table(
+        TABLE_NAME,
+        sa.Column("user_id", sa.String(length=128), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("seconds", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint("user_id", "day", name=op.f("pk_nonebot_plugin_online_timer_onlinetimedaily")),
+        info={"bind_key": "nonebot_plugin_online_timer"},
+    )
+    with op.batch_alter_table(TABLE_NAME, schema=None) as batch_op:
+        batch_op.create_index(batch_op.f("ix_nonebot_plugin_online_timer_onlinetimedaily_day"), ["day"], unique=False)
+
+    bind = op.get_bind()
+    if not sa.inspect(bind).has_table(RECORD_TABLE_NAME):
+        return
+    record_table = sa.table(
+        RECORD_TABLE_NAME,
+        sa.column("user_id", sa.String),
+        sa.column("start_time", sa.DateTime),
+        sa.column("end_time", sa.DateTime),
+    )
+    daily_seconds: defaultdict[tuple[str, date], float] = defaultdict(float)
+    for user_id, start_time, end_time in bind.execute(
+        sa.select(record_table.c.user_id, record_table.c.start_time, record_table.c.end_time)
+    ):
+        # 按自然日拆分在线时段
+        while start_time < end_time:
+            next_day = datetime.combine(start_time.date() + timedelta(days=1), time())
+            daily_seconds[user_id, start_time.date()] += (min(end_time, next_day) - start_time).total_seconds()
+            start_time = next_day
+    if daily_seconds:
+        op.bulk_insert(
+            daily_table,
+            [{"user_id": user_id, "day": day, "seconds": seconds} for (user_id, day), seconds in daily_seconds.items()],
+        )
+
+
+def downgrade(name: str = "") -> None:
+    if name:
+        return
+    with op.batch_alter_table(TABLE_NAME, schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_nonebot_plugin_online_timer_onlinetimedaily_day"))
+
+    op.drop_table(TABLE_NAME)
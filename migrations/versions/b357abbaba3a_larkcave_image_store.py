@@ -0,0 +1,99 @@
+"""Move larkcave images from database to content-addressed image store
+
+迁移 ID: b357abbaba3a
+父迁移: 0841fcf990e5
+创建时间: 2026-10-18 16:10:00.000000
+
+此迁移为 nonebot_plugin_larkcave_imagedata 表添加 digest 列，
+将 image_data 列中的图片解压后以 SHA-256 摘要为文件名写入本地图片存储
+（images/<摘要前 2 位>/<摘要第 3-4 位>/<摘要>），随后删除 image_data 列。
+
+"""
+
+from __future__ import annotations
+
+import hashlib
+import zlib
+from collections.abc import Sequence
+from pathlib import Path
+
+from alembic import op
+import sqlalchemy as sa
+from nonebot_plugin_localstore import get_data_dir
+
+revision: str = "b357abbaba3a"
+down_revision: str | Sequence[str] | None = "0841fcf990e5"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def get_image_path(digest: str) -> Path:
+    return get_data_dir("nonebot_plugin_larkcave").joinpath("images", digest[:2], digest[2:4], digest)
+
+
+def upgrade(name: str = "") -> None:
+    if name:
+        return
+
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("nonebot_plugin_larkcave_imagedata"):
+        return
+
+    # 1. 添加 digest 列
+    with op.batch_alter_table("nonebot_plugin_larkcave_imagedata", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("digest", sa.String(length=64), nullable=True))
+        batch_op.create_index(batch_op.f("ix_nonebot_plugin_larkcave_imagedata_digest"), ["digest"], unique=False)
+
+    # 2. 逐张读取图片写入图片存储（避免一次性将所有图片载入内存）
+    table = sa.Table("nonebot_plugin_larkcave_imagedata", sa.MetaData(), autoload_with=bind)
+    image_ids = bind.execute(sa.select(table.c.id).where(table.c.image_data.is_not(None))).scalars().all()
+    for image_id in image_ids:
+        image_data = bind.execute(sa.select(table.c.image_data).where(table.c.id == image_id)).scalar_one()
+        try:
+            image_bytes = zlib.decompress(image_data)
+        except zlib.error:
+            image_bytes = image_data
+        digest = hashlib.sha256(image_bytes).hexdigest()
+        path = get_image_path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(image_bytes)
+        bind.execute(table.update().where(table.c.id == image_id).values(digest=digest))
+
+    # 3. 删除 image_data 列
+    with op.batch_alter_table("nonebot_plugin_larkcave_imagedata", schema=None) as batch_op:
+        batch_op.drop_column("image_data")
+
+
+def downgrade(name: str = "") -> None:
+    if name:
+        return
+
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("nonebot_plugin_larkcave_imagedata"):
+        return
+
+    # 1. 添加 image_data 列
+    with op.batch_alter_table("nonebot_plugin_larkcave_imagedata", schema=None) as batch_op:
+        if bind.dialect.name == "mysql":
+            from sqlalchemy.dialects.mysql import LONGBLOB
+
+            batch_op.add_column(sa.Column("image_data", LONGBLOB(), nullable=True))
+        else:
+            batch_op.add_column(sa.Column("image_data", sa.LargeBinary(), nullable=True))
+
+    # 2. 将图片存储中的图片压缩后写回数据库（图片文件保留在本地）
+    table = sa.Table("nonebot_plugin_larkcave_imagedata", sa.MetaData(), autoload_with=bind)
+    rows = bind.execute(sa.select(table.c.id, table.c.digest).where(table.c.digest.is_not(None))).all()
+    for image_id, digest in rows:
+        path = get_image_path(digest)
+        if path.exists():
+            image_data = zlib.compress(path.read_bytes())
+            bind.execute(table.update().where(table.c.id == image_id).values(image_data=image_data))
+
+    # 3. 删除 digest 列
+    with op.batch_alter_table("nonebot_plugin_larkcave_imagedata", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_nonebot_plugin_larkcave_imagedata_digest"))
+        batch_op.drop_column("digest")
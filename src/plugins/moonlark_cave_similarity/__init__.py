@@ -0,0 +1,63 @@
+#  Moonlark - A new ChatBot
+#  Copyright (C) 2026  Moonlark Development Team
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ##############################################################################
+
+"""回声洞文本相似度比较
+
+由 nonebot_plugin_larkcave 的工作进程执行。工作进程通过 forkserver / spawn 启动，不会初始化 NoneBot，
+因此本模块不能依赖 NoneBot 或任何插件。
+"""
+
+import difflib
+import re
+from typing import Optional
+
+
+class ImageOnlyCave(Exception):
+    pass
+
+
+def parse_text(text: str) -> str:
+    result = re.search(r"\[\[Img:\d+\.\d+]]]", text)
+    if result:
+        return parse_text(text.replace(result.group(0), ""))
+    elif not text:
+        raise ImageOnlyCave()
+    else:
+        return text
+
+
+def get_similarity(posting: str, origin: str, threshold: float = 0.0) -> float:
+    matcher = difflib.SequenceMatcher(None, origin, posting)
+    # real_quick_ratio 与 quick_ratio 均为 ratio 的上界，不满足时无需计算完整的 ratio
+    if matcher.real_quick_ratio() < threshold or matcher.quick_ratio() < threshold:
+        return 0
+    return matcher.ratio()
+
+
+def get_cave_similarity(posting: str, content: str, threshold: float = 0.0) -> float:
+    try:
+        return get_similarity(posting, parse_text(content), threshold)
+    except ImageOnlyCave:
+        return 0
+
+
+def find_similar_cave(posting: str, caves: list[tuple[int, str]], threshold: float) -> Optional[tuple[int, float]]:
+    """返回 caves 中第一个与 posting 相似度达到 threshold 的回声洞 ID 及相似度（在进程池中执行）"""
+    for cave_id, content in caves:
+        if (similarity := get_cave_similarity(posting, content, threshold)) >= threshold:
+            return cave_id, similarity
+    return None
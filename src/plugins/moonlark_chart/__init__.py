@@ -0,0 +1,224 @@
+#  Moonlark - A new ChatBot
+#  Copyright (C) 2026  Moonlark Development Team
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ##############################################################################
+
+"""Moonlark 图表绘制
+
+图表以只包含数据的 dataclass 描述，由 nonebot_plugin_render 的工作进程绘制。
+工作进程通过 forkserver / spawn 启动，不会初始化 NoneBot，因此本模块不能依赖 NoneBot 或任何插件。
+"""
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import datetime
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Literal, Optional
+
+import matplotlib
+import matplotlib.dates as mdates
+from matplotlib import font_manager
+from matplotlib.axes import Axes
+from matplotlib.figure import Figure
+
+FONT_PATH = Path("src/static/SarasaGothicSC-Regular.ttf")
+FONT_NAME = "Sarasa Gothic SC"
+
+
+@dataclass
+class Chart(ABC):
+    """图表描述
+
+    只包含数据与已解析好的文本，由工作进程使用 Figure 对象接口绘制，各 *_kwargs 原样传给对应的 matplotlib 方法。
+    """
+
+    figsize: tuple[float, float] = (10, 6)
+    dpi: int = 100
+    title: str = ""
+    title_kwargs: dict[str, Any] = field(default_factory=dict)
+    suptitle: str = ""
+    suptitle_kwargs: dict[str, Any] = field(default_factory=dict)
+    xlabel: str = ""
+    ylabel: str = ""
+    label_kwargs: dict[str, Any] = field(default_factory=dict)
+    facecolor: Optional[str] = None
+    # ax.grid 的参数，为 None 时不绘制网格
+    grid: Optional[dict[str, Any]] = None
+    xtick_kwargs: dict[str, Any] = field(default_factory=dict)
+    hide_spines: bool = False
+    # ax.legend 的参数，为 None 时不绘制图例
+    legend: Optional[dict[str, Any]] = None
+    tight_layout: bool = True
+    bbox_inches: Optional[str] = "tight"
+
+    @abstractmethod
+    def plot(self, ax: Axes) -> None:
+        pass
+
+    def render(self) -> bytes:
+        """绘制图表并返回 PNG 数据（在工作进程中执行）"""
+        fig = Figure(figsize=self.figsize)
+        ax = fig.subplots()
+        if self.facecolor:
+            fig.patch.set_facecolor(self.facecolor)
+            ax.set_facecolor(self.facecolor)
+        self.plot(ax)
+        if self.suptitle:
+            fig.suptitle(self.suptitle, **self.suptitle_kwargs)
+        if self.title:
+            ax.set_title(self.title, **self.title_kwargs)
+        if self.xlabel:
+            ax.set_xlabel(self.xlabel, **self.label_kwargs)
+        if self.ylabel:
+            ax.set_ylabel(self.ylabel, **self.label_kwargs)
+        if self.xtick_kwargs:
+            for label in ax.get_xticklabels():
+                label.set(**self.xtick_kwargs)
+        if self.grid is not None:
+            ax.grid(**self.grid)
+            ax.set_axisbelow(True)
+        if self.hide_spines:
+            for spine in ax.spines.values():
+                spine.set_visible(False)
+        if self.legend is not None:
+            ax.legend(**self.legend)
+        if self.tight_layout:
+            fig.tight_layout()
+        buf = BytesIO()
+        fig.savefig(buf, format="png", dpi=self.dpi, bbox_inches=self.bbox_inches)
+        return buf.getvalue()
+
+
+@dataclass
+class TextChart(Chart):
+    """只显示一行居中文字的图表（用于无数据提示）"""
+
+    text: str = ""
+    fontsize: int = 16
+
+    def plot(self, ax: Axes) -> None:
+        ax.text(0.5, 0.5, self.text, ha="center", va="center", transform=ax.transAxes, fontsize=self.fontsize)
+        ax.axis("off")
+
+
+@dataclass
+class LineChart(Chart):
+    """以时间为横轴的折线图"""
+
+    x: list[datetime] = field(default_factory=list)
+    y: list[float] = field(default_factory=list)
+    line_kwargs: dict[str, Any] = field(default_factory=dict)
+    # 各数据点的填充颜色，同时用作数值标注的边框颜色
+    point_colors: Optional[list[str]] = None
+    # 在数据点上方标注数值
+    annotate_kwargs: Optional[dict[str, Any]] = None
+    # 水平参考线（如平均值）
+    hline: Optional[float] = None
+    hline_kwargs: dict[str, Any] = field(default_factory=dict)
+    # 折线下方填充区域的参数，为 None 时不填充
+    fill_kwargs: Optional[dict[str, Any]] = None
+    ylim: Optional[tuple[float, float]] = None
+    date_format: str = "%H:%M"
+    date_locator: Literal["day", "minute"] = "minute"
+    date_interval: int = 60
+
+    def plot(self, ax: Axes) -> None:
+        x = mdates.date2num(self.x)
+        lines = ax.plot(x, self.y, **self.line_kwargs)
+        if self.point_colors is not None:
+            # plot 不接受逐点的 markerfacecolor，改为在折线上叠加同样大小的散点
+            lines[0].set_markerfacecolor("none")
+            ax.scatter(
+                x,
+                self.y,
+                c=self.point_colors,
+                s=self.line_kwargs.get("markersize", 6) ** 2,
+                edgecolors=self.line_kwargs.get("markeredgecolor"),
+                linewidths=self.line_kwargs.get("markeredgewidth"),
+                zorder=self.line_kwargs.get("zorder", 2) + 1,
+            )
+        if self.hline is not None:
+            ax.axhline(y=self.hline, **self.hline_kwargs)
+        if self.fill_kwargs is not None:
+            ax.fill_between(x, self.y, **self.fill_kwargs)
+        if self.ylim is not None:
+            ax.set_ylim(*self.ylim)
+        ax.xaxis.set_major_formatter(mdates.DateFormatter(self.date_format))
+        if self.date_locator == "day":
+            ax.xaxis.set_major_locator(mdates.DayLocator(interval=self.date_interval))
+        else:
+            ax.xaxis.set_major_locator(mdates.MinuteLocator(interval=self.date_interval))
+        if self.annotate_kwargs is not None:
+            colors = self.point_colors or [None] * len(self.y)
+            for x_value, y_value, color in zip(x, self.y, colors):
+                kwargs = dict(self.annotate_kwargs)
+                if color is not None and "bbox" in kwargs:
+                    kwargs["bbox"] = {**kwargs["bbox"], "edgecolor": color}
+                ax.annotate(str(y_value), (x_value, y_value), **kwargs)
+
+
+@dataclass
+class BarChart(Chart):
+    """纵向柱状图"""
+
+    labels: list[str] = field(default_factory=list)
+    values: list[float] = field(default_factory=list)
+    bar_kwargs: dict[str, Any] = field(default_factory=dict)
+
+    def plot(self, ax: Axes) -> None:
+        ax.bar(self.labels, self.values, **self.bar_kwargs)
+
+
+@dataclass
+class HorizontalBarChart(Chart):
+    """横向柱状图，第一项位于最上方，可在柱子末端标注数值、在起始处标注徽标（如排名）"""
+
+    labels: list[str] = field(default_factory=list)
+    values: list[float] = field(default_factory=list)
+    colors: Optional[list[str]] = None
+    show_values: bool = True
+    badges: Optional[list[str]] = None
+    badge_bbox: dict[str, Any] = field(
+        default_factory=lambda: {"boxstyle": "round,pad=0.3", "facecolor": "white", "alpha": 0.7}
+    )
+
+    def plot(self, ax: Axes) -> None:
+        bars = ax.barh(range(len(self.labels)), self.values, color=self.colors)
+        ax.set_yticks(range(len(self.labels)))
+        ax.set_yticklabels(self.labels)
+        offset = max(self.values, default=0) * 0.01
+        for i, bar in enumerate(bars):
+            y = bar.get_y() + bar.get_height() / 2
+            if self.show_values:
+                ax.text(bar.get_width() + offset, y, f"{self.values[i]}", va="center", ha="left", fontweight="bold")
+            if self.badges is not None:
+                ax.text(offset, y, self.badges[i], va="center", ha="left", fontweight="bold", bbox=self.badge_bbox)
+        ax.invert_yaxis()
+
+
+def setup_font() -> None:
+    """注册中文字体并设为默认字体"""
+    if FONT_NAME in matplotlib.rcParams["font.sans-serif"]:
+        return
+    font_manager.fontManager.addfont(FONT_PATH)
+    matplotlib.rcParams["font.sans-serif"] = [FONT_NAME]
+    matplotlib.rcParams["axes.unicode_minus"] = False
+
+
+def prewarm() -> None:
+    """工作进程的初始化函数：注册字体并绘制一次含中文的图表，预先加载字体与渲染器"""
+    setup_font()
+    TextChart(figsize=(1, 1), text="预热", dpi=50).render()
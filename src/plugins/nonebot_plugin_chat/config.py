@@ -37,6 +37,8 @@ class Config(BaseModel):
     # Moonlark 所在地区的经纬度，不填写则不启用所在地每日天气
     moonlark_latitude: Optional[float] = None
     moonlark_longitude: Optional[float] = None
+    # 组装提示词时同时进行的查询（用户信息、好感度、文本等）数量上限
+    prompt_fetch_concurrency: int = 8
 
     @field_validator("moonlark_latitude", "moonlark_longitude", mode="before")
     @classmethod
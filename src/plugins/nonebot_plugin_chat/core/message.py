@@ -21,8 +21,9 @@ import copy
 import json
 from datetime import datetime
 
-from sqlalchemy import delete, select
+from sqlalchemy import delete, insert, or_, select, update
 
+from ..utils.prompt_context import PromptContext
 from ..utils.timing_stats import timing_stats_manager
 
 if TYPE_CHECKING:
@@ -45,6 +46,11 @@ class MessageQueue:
         self.last_events_summary_time: Optional[datetime] = None
         self.last_thought: Optional[str] = None
         self.last_response: Optional[Any] = None
+        # 已写入数据库的消息高水位：消息数量与首尾消息对象，用于判断此后是否只在末尾追加了消息
+        self.persisted_count = 0
+        self.persisted_head: Optional[OpenAIMessage] = None
+        self.persisted_tail: Optional[OpenAIMessage] = None
+        self.persisted_trace_id: Optional[str] = None
 
     @property
     def messages(self) -> list[OpenAIMessage]:
@@ -57,7 +63,7 @@ class MessageQueue:
         if not messages or get_role(messages[0]) != "system":
             messages.insert(0, await self.processor.generate_system_prompt())
             if inject_session_info:
-                session_info = await self.processor.generate_session_info()
+                session_info = await self.processor.generate_session_info(PromptContext(self.processor.session))
                 if session_info:
                     messages.insert(1, generate_message(session_info, "user"))
         fetcher = await MessageFetcher.create(
@@ -68,6 +74,7 @@ class MessageQueue:
             pre_function_call=self.processor.send_function_call_feedback,
             post_function_call=self.processor.send_function_call_result,
             reasoning_effort="medium",
+            stream=True,
         )
         fetcher.session.set_custom_trace_id(self.trace_id)
         return fetcher
@@ -88,30 +95,45 @@ class MessageQueue:
         else:
             return {"content": str(message), "role": "user"}
 
-    def _serialize_messages(self) -> list[str]:
-        serialized = [self._serialize_message(msg) for msg in self.messages]
+    def _serialize_messages(self, messages: Optional[list[OpenAIMessage]] = None) -> list[str]:
+        serialized = [self._serialize_message(msg) for msg in (self.messages if messages is None else messages)]
         return [json.dumps(msg, ensure_ascii=False) for msg in serialized]
 
+    def _mark_persisted(self, messages: list[OpenAIMessage]) -> None:
+        self.persisted_count = len(messages)
+        self.persisted_head = messages[0] if messages else None
+        self.persisted_tail = messages[-1] if messages else None
+
+    def _is_append_only(self, messages: list[OpenAIMessage]) -> bool:
+        """自上次保存以来，消息列表是否只在末尾追加了新消息"""
+        count = self.persisted_count
+        return (
+            count > 0
+            and len(messages) >= count
+            and messages[0] is self.persisted_head
+            and messages[count - 1] is self.persisted_tail
+        )
+
     async def restore_from_db(self) -> None:
         try:
             session_id = self.processor.session.session_id
             earliest_time = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
 
+            restored_messages = []
+            restored_trace_id = None
             async with get_session() as db_session:
-                cache = await db_session.scalars(
-                    select(MessageQueueCache)
+                result = await db_session.stream(
+                    select(MessageQueueCache.message_json, MessageQueueCache.trace_id)
                     .where(MessageQueueCache.updated_time >= earliest_time, MessageQueueCache.group_id == session_id)
                     .order_by(MessageQueueCache.message_id)
                 )
-                cache_list = list(cache)
-
-            restored_messages = [json.loads(msg.message_json) for msg in cache_list]
+                async for message_json, trace_id in result:
+                    restored_messages.append(json.loads(message_json))
+                    restored_trace_id = restored_trace_id or trace_id
 
-            for msg in cache_list:
-                if msg.trace_id:
-                    self.trace_id = msg.trace_id
-                    logger.info(f"已从数据库恢复群 {session_id} 的 trace_id: {self.trace_id}")
-                    break
+            if restored_trace_id:
+                self.trace_id = restored_trace_id
+                logger.info(f"已从数据库恢复群 {session_id} 的 trace_id: {self.trace_id}")
 
             logger.info(f"已从数据库恢复群 {session_id} 的消息队列，共 {len(restored_messages)} 条消息")
 
@@ -142,6 +164,8 @@ class MessageQueue:
                         logger.info(f"群 {session_id} 的 system prompt 验证通过")
                         self.fetcher = await self._create_fetcher(inject_session_info=False)
                         self.fetcher.session.messages = restored_messages
+                        self._mark_persisted(restored_messages)
+                        self.persisted_trace_id = self.trace_id
             else:
                 context_reset = True
 
@@ -155,6 +179,7 @@ class MessageQueue:
             self.fetcher.session.messages.clear()
         self.fetcher = None
         self.created_at = datetime.now()
+        self._mark_persisted([])
         async with get_session() as session:
             await session.execute(delete(MessageQueueCache).where(MessageQueueCache.group_id == group_id))
             await session.commit()
@@ -172,27 +197,63 @@ class MessageQueue:
             await session.commit()
 
     async def save_to_db(self) -> None:
+        """
+        将消息队列追加写入数据库
+
+        消息列表自上次保存以来只在末尾追加时，只序列化并写入新增的消息；
+        否则（上下文被清空、裁剪或重建）按消息哈希一次性查出已保存的消息，只写入缺失的部分。
+        """
         try:
             async with self.fetcher_lock:
                 group_id = self.processor.session.session_id
+                messages = list(self.messages)
                 async with get_session() as session:
-                    for msg in self._serialize_messages():
-                        sha256 = hashlib.sha256(msg.encode())
-                        result = await session.scalar(
-                            select(MessageQueueCache).where(MessageQueueCache.message_hash == sha256.digest())
+                    if self._is_append_only(messages):
+                        pending = [
+                            (msg, hashlib.sha256(msg.encode()).digest())
+                            for msg in self._serialize_messages(messages[self.persisted_count :])
+                        ]
+                    else:
+                        hashed = {
+                            hashlib.sha256(msg.encode()).digest(): msg for msg in self._serialize_messages(messages)
+                        }
+                        saved: set[bytes] = set()
+                        if hashed:
+                            saved.update(
+                                await session.scalars(
+                                    select(MessageQueueCache.message_hash).where(
+                                        MessageQueueCache.group_id == group_id,
+                                        MessageQueueCache.message_hash.in_(list(hashed)),
+                                    )
+                                )
+                            )
+                        pending = [(msg, digest) for digest, msg in hashed.items() if digest not in saved]
+                    if self.persisted_trace_id != self.trace_id:
+                        await session.execute(
+                            update(MessageQueueCache)
+                            .where(
+                                MessageQueueCache.group_id == group_id,
+                                or_(MessageQueueCache.trace_id.is_(None), MessageQueueCache.trace_id != self.trace_id),
+                            )
+                            .values(trace_id=self.trace_id)
                         )
-                        if result is not None:
-                            result.trace_id = self.trace_id
-                            continue
-                        cache = MessageQueueCache(
-                            group_id=group_id,
-                            trace_id=self.trace_id,
-                            message_json=msg,
-                            message_hash=sha256.digest(),
-                            updated_time=self.created_at,
+                    if pending:
+                        await session.execute(
+                            insert(MessageQueueCache),
+                            [
+                                {
+                                    "group_id": group_id,
+                                    "trace_id": self.trace_id,
+                                    "message_json": msg,
+                                    "message_hash": digest,
+                                    "updated_time": self.created_at,
+                                }
+                                for msg, digest in pending
+                            ],
                         )
-                        session.add(cache)
                     await session.commit()
+                self._mark_persisted(messages)
+                self.persisted_trace_id = self.trace_id
         except Exception as e:
             logger.exception(e)
 
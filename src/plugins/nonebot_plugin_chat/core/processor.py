@@ -26,13 +26,14 @@ from nonebot_plugin_chat.utils.group import LinkParser
 from nonebot_plugin_chat.utils.token_bucket import TokenBucket
 
 from ..config import config
-from ..models import ChatGroup, Sticker, UserProfile
+from ..models import ChatGroup, Sticker
 from ..types import CachedMessage
 from ..utils.ai_agent import AskAISession
 from ..utils.emoji import QQ_EMOJI_MAP
 from ..utils.image import query_image_content
 from ..utils.message import MessageParser, generate_message_string
 from ..utils.note_manager import get_context_notes
+from ..utils.prompt_context import PromptContext
 from ..utils.status_manager import get_status_manager
 from ..utils.sticker_manager import get_sticker_manager
 from ..utils.timing_stats import timing_stats_manager
@@ -193,11 +194,11 @@ class MessageProcessor:
         # 添加 reaction
         if not self.session.is_napcat_bot():
             return
-        user_messages = [msg for msg in self.session.cached_messages if msg.get("user_id") == user_id]
+        user_messages = self.session.cached_messages.get_user_messages(user_id, 10)
         if user_messages:
             messages_text = "\n".join(
                 f"ID: {msg.get('message_id')}, Time: {msg.get('send_time').strftime('%H:%M:%S')}, Content: {msg.get('content')}"
-                for msg in user_messages[-10:]
+                for msg in user_messages
             )
             if score > 0:
                 reaction_id = config.judge_reaction_config.add
@@ -278,11 +279,13 @@ class MessageProcessor:
         self.consecutive_message_count = 0
 
         item = self.session.message_queue.pop(0)
+        # 本轮提示词组装共用的查询上下文
+        context = PromptContext(self.session)
 
         if item[0] == "event":
             # 处理事件类型队列项
             event_prompt, trigger_mode = item[1]  # type: ignore
-            additional_info = await self.generate_event_additional_info()
+            additional_info = await self.generate_event_additional_info(context)
             content = await self.session.text(
                 "prompt.event_template",
                 datetime.now().strftime("%H:%M:%S"),
@@ -332,7 +335,7 @@ class MessageProcessor:
                 "to_me": mentioned,
                 "triggered_reply": False,
             }
-            await self.process_messages(msg_dict)
+            await self.process_messages(msg_dict, context)
             self.session.cached_messages.append(msg_dict)
             await self.session.on_cache_posted()
             trigger_mode = "all" if mentioned else "probability"
@@ -587,13 +590,12 @@ class MessageProcessor:
         """记录回应用时（从 reply_message_id 对应的消息到发送回复的时间）"""
         # 如果提供了 reply_message_id，查找对应的消息
         if reply_message_id is not None:
-            for msg in self.session.cached_messages:
-                if msg.get("message_id") == reply_message_id and not msg.get("self", False):
-                    send_time = msg.get("send_time")
-                    if send_time is not None:
-                        reply_time_ms = (datetime.now() - send_time).total_seconds() * 1000
-                        timing_stats_manager.record_reply_time(self.session.session_id, reply_time_ms)
-                    return
+            msg = self.session.cached_messages.get_by_message_id(reply_message_id)
+            if msg is not None and not msg.get("self", False):
+                send_time = msg.get("send_time")
+                if send_time is not None:
+                    reply_time_ms = (datetime.now() - send_time).total_seconds() * 1000
+                    timing_stats_manager.record_reply_time(self.session.session_id, reply_time_ms)
 
     async def apply_unlimited_tokens(self, reason: str, message_count: int) -> str:
         if self.session.get_session_type() != "group":
@@ -644,7 +646,7 @@ class MessageProcessor:
             content.append({"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{image_base64}"}})
         await self.openai_messages.append_user_message(content)
 
-    async def process_messages(self, msg_dict: CachedMessage) -> None:
+    async def process_messages(self, msg_dict: CachedMessage, context: PromptContext) -> None:
         async with get_session() as session:
             r = await session.get(ChatGroup, {"group_id": self.session.session_id})
 
@@ -666,7 +668,7 @@ class MessageProcessor:
 
             if not self.blocked:
                 msg_str = generate_message_string(msg_dict)
-                msg_str += await self.generate_additional_prompt(msg_str, msg_dict["user_id"])
+                msg_str += await self.generate_additional_prompt(msg_str, msg_dict["user_id"], context)
                 msg_dict["mq_text"] = msg_str
                 await self.append_user_message(msg_str, msg_dict["images"])
                 # print(self.openai_messages.messages)
@@ -699,52 +701,6 @@ class MessageProcessor:
                 l.append(str(msg.content))
         return l
 
-    async def _get_user_profiles(self) -> list[str]:
-        """根据昵称获取用户的 profile 信息"""
-        profiles = []
-        seen_nicknames: set[str] = set()
-        async with get_session() as session:
-            for msg in self.session.cached_messages:
-                if msg["self"] or msg["nickname"] in seen_nicknames:
-                    continue
-                seen_nicknames.add(msg["nickname"])
-                nickname = msg["nickname"]
-                user_id = msg["user_id"]  # 使用主账户ID用于数据库查询
-                if not (profile := await session.get(UserProfile, {"user_id": user_id})):
-                    profile = await self.session.text("prompt_group.user_profile_not_found")
-                    is_profile_found = False
-                else:
-                    profile = profile.profile_content
-                    is_profile_found = True
-                if isinstance(self.session.bot, OB11Bot):
-                    try:
-                        member_info = await self.session.get_user_info(user_id)
-                    except Exception:
-                        member_info = None
-                else:
-                    member_info = None
-                user = await get_user(user_id)
-                fav = user.get_display_fav()
-                fav_level = await user.get_fav_level()
-                if member_info:
-                    profiles.append(
-                        await self.session.text(
-                            "prompt_group.group_member_info",
-                            nickname,
-                            member_info["role"],
-                            member_info["sex"],
-                            fav,
-                            fav_level,
-                            datetime.fromtimestamp(member_info["join_time"]).strftime("%Y-%m-%d"),
-                            profile,
-                        ),
-                    )
-                elif fav > 0 or is_profile_found:
-                    profiles.append(
-                        await self.session.text("prompt_group.member_info", nickname, fav, fav_level, profile),
-                    )
-        return profiles
-
     async def generate_sticker_recommendations(self) -> AsyncGenerator[str, None]:
         chat_history = "\n".join(self.get_message_content_list())
         emotion_type = get_status_manager().get_status()[0].value
@@ -769,52 +725,66 @@ class MessageProcessor:
                         yield f"- {sticker.id}: {sticker.description}"
                         break
 
-    async def generate_note_text(self, notes) -> str:
-        async def format_note(note):
+    async def generate_note_text(self, notes, context: PromptContext) -> str:
+        async def format_note(note) -> str:
             created_time = datetime.fromtimestamp(note.created_time).strftime("%y-%m-%d")
-            return await self.session.text("prompt.note.format", note.content, note.id, created_time)
+            return await context.text("prompt.note.format", note.content, note.id, created_time)
 
-        note_lines = [await format_note(note) for note in notes]
+        note_lines = await context.gather(*(format_note(note) for note in notes))
         note_lines = await self.filter_info_lines(note_lines)
-        return "\n".join(note_lines) if notes else await self.session.text("prompt.note.none")
+        return "\n".join(note_lines) if notes else await context.text("prompt.note.none")
 
-    async def generate_additional_prompt(self, message_str: str, sender_id: str) -> str:
-        note_manager = await get_context_notes(self.session.session_id)
-        sender = await get_user(sender_id)
-        notes, notes_from_other_group = await note_manager.filter_note(message_str)
-        notes.extend(notes_from_other_group)
+    async def generate_state_text(self, context: PromptContext) -> str:
         status_manager = get_status_manager()
         mood, mood_reason = status_manager.get_status()
-        mood_text = await self.session.text(f"status.mood.{mood.value}")
-        from .ego import moonlark_main
-
-        current_time = await self.session.text("prompt_group.time", datetime.now().isoformat())
-        state = await self.session.text(
+        return await context.text(
             "prompt_group.state",
-            mood_text,
+            await context.text(f"status.mood.{mood.value}"),
             status_manager.get_mood_retention(),
             mood_reason,
         )
 
-        tiredness = round(moonlark_main.sleep_controller.tiredness * 100)
-
-        pending_notes_text = self._get_pending_notes_text()
-
-        return await get_message_text(
-            "chat_message.md.jinja",
-            current_time=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            token=round(self.token_bucket.get(), 2) if self.session.get_session_type() == "group" else None,
-            nickname=sender.get_nickname(),
-            display_fav=sender.get_display_fav(),
-            fav_level=await sender.get_fav_level(),
-            note_text=await self.generate_note_text(notes),
-            tiredness=tiredness,
-            state=state,
-            pending_notes=pending_notes_text or None,
-        )
+    async def generate_additional_prompt(self, message_str: str, sender_id: str, context: PromptContext) -> str:
+        from .ego import moonlark_main
+
+        async def get_note_text() -> str:
+            async with context.stage("additional_prompt.notes"):
+                note_manager = await get_context_notes(self.session.session_id)
+                notes, notes_from_other_group = await note_manager.filter_note(message_str)
+                return await self.generate_note_text(notes + notes_from_other_group, context)
+
+        async def get_sender_info() -> tuple[str, int, str]:
+            async with context.stage("additional_prompt.sender"):
+                sender, fav_level = await context.gather(context.get_user(sender_id), context.get_fav_level(sender_id))
+                return sender.get_nickname(), sender.get_display_fav(), fav_level
+
+        async def get_state() -> str:
+            async with context.stage("additional_prompt.state"):
+                return await self.generate_state_text(context)
+
+        async with context.stage("additional_prompt"):
+            note_text, (nickname, display_fav, fav_level), state = await context.gather(
+                get_note_text(), get_sender_info(), get_state()
+            )
+            return await get_message_text(
+                "chat_message.md.jinja",
+                current_time=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                token=round(self.token_bucket.get(), 2) if self.session.get_session_type() == "group" else None,
+                nickname=nickname,
+                display_fav=display_fav,
+                fav_level=fav_level,
+                note_text=note_text,
+                tiredness=round(moonlark_main.sleep_controller.tiredness * 100),
+                state=state,
+                pending_notes=self._get_pending_notes_text() or None,
+            )
 
     async def filter_info_lines(self, lines: list[str]) -> list[str]:
-        return [line for line in lines if not await self.is_additional_info_line_showed(line)]
+        if not lines:
+            return []
+        async with self.openai_messages.fetcher_lock:
+            message_texts = self._get_normalized_message_texts()
+        return [line for line in lines if not self._is_line_in_texts(self._normalize_line(line), message_texts)]
 
     def _normalize_line(self, text: str) -> str:
         """归一化行文本：去除时间戳前缀并解码 HTML 实体"""
@@ -824,48 +794,44 @@ class MessageProcessor:
             result = result.split("] ", 1)[1]
         return html.unescape(result)
 
+    def _get_normalized_message_texts(self) -> list[str]:
+        """获取消息队列中所有文本内容（已归一化）"""
+        texts = []
+        for message in self.openai_messages.messages:
+            content = message.get("content") if isinstance(message, dict) else getattr(message, "content", None)
+            if content is None:
+                continue
+            if isinstance(content, str):
+                texts.append(self._normalize_line(content))
+            elif isinstance(content, list):
+                for part in content:
+                    text = part.get("text") if isinstance(part, dict) else getattr(part, "text", None)
+                    if text and isinstance(text, str):
+                        texts.append(self._normalize_line(text))
+        return texts
+
+    @staticmethod
+    def _is_line_in_texts(norm_line: str, texts: list[str]) -> bool:
+        return any(norm_line in text for text in texts)
+
     async def is_additional_info_line_showed(self, line: str) -> bool:
-        norm_line = self._normalize_line(line)
         async with self.openai_messages.fetcher_lock:
-            for message in self.openai_messages.messages:
-                content = message.get("content") if isinstance(message, dict) else getattr(message, "content", None)
-                if content is None:
-                    continue
-                if isinstance(content, str):
-                    if norm_line in self._normalize_line(content):
-                        return True
-                elif isinstance(content, list):
-                    for part in content:
-                        text = part.get("text") if isinstance(part, dict) else getattr(part, "text", None)
-                        if text and isinstance(text, str) and norm_line in self._normalize_line(text):
-                            return True
-        return False
+            return self._is_line_in_texts(self._normalize_line(line), self._get_normalized_message_texts())
 
-    async def generate_event_additional_info(self) -> str:
+    async def generate_event_additional_info(self, context: PromptContext) -> str:
         """生成事件的 additional_info，包含 token 和当前状态"""
         from .ego import moonlark_main
 
-        status_manager = get_status_manager()
-        mood, mood_reason = status_manager.get_status()
-        mood_text = await self.session.text(f"status.mood.{mood.value}")
-
-        state = await self.session.text(
-            "prompt_group.state",
-            mood_text,
-            status_manager.get_mood_retention(),
-            mood_reason,
-        )
-
-        tiredness = round(moonlark_main.sleep_controller.tiredness * 100)
-
-        pending_notes_text = self._get_pending_notes_text()
-
-        return await self.session.text(
-            "prompt.event_additional_info",
-            round(self.token_bucket.get(), 2),
-            state,
-            tiredness,
-        ) + (f"\n待定笔记:\n{pending_notes_text}" if pending_notes_text else "")
+        async with context.stage("event_additional_info"):
+            state = await self.generate_state_text(context)
+            tiredness = round(moonlark_main.sleep_controller.tiredness * 100)
+            pending_notes_text = self._get_pending_notes_text()
+            return await context.text(
+                "prompt.event_additional_info",
+                round(self.token_bucket.get(), 2),
+                state,
+                tiredness,
+            ) + (f"\n待定笔记:\n{pending_notes_text}" if pending_notes_text else "")
 
     async def get_interaction_mode(self) -> str:
         async with get_session() as db_session:
@@ -886,7 +852,7 @@ class MessageProcessor:
             interaction_mode=await self.get_interaction_mode(),
         )
 
-    async def generate_session_info(self) -> str:
+    async def generate_session_info(self, context: PromptContext) -> str:
         """生成会话信息（紧随 system prompt 注入，仅在会话创建/重置时生成）
 
         包含：会话名称、当前日期与星期、所在地每日天气（已配置时）、
@@ -894,22 +860,26 @@ class MessageProcessor:
         """
         try:
             from ..utils.weather import get_daily_weather_text, get_weekday_text
+            from .ego.moonlark_main import moonlark_main
+
+            is_group = self.session.get_session_type() == "group"
+            # 会话名称、天气与此前的事件互相独立，并发获取
+            async with context.stage("session_info"):
+                session_name, weather_text, session_context = await context.gather(
+                    context.limit(self.session.get_session_name()) if is_group else asyncio.sleep(0),
+                    context.limit(get_daily_weather_text()),
+                    context.limit(moonlark_main.get_session_context(self.session.session_id)),
+                )
 
             parts = []
-            if self.session.get_session_type() == "group":
-                session_name = (await self.session.get_session_name()) or "未知名称群聊"
-                parts.append(f"会话名称：{session_name}")
+            if is_group:
+                parts.append(f"会话名称：{session_name or '未知名称群聊'}")
             now = datetime.now()
             parts.append(f"当前日期：{now.strftime('%Y-%m-%d')} {get_weekday_text(now)}")
-            weather_text = await get_daily_weather_text()
             if weather_text:
                 parts.append(f"今日天气：{weather_text}")
-
-            from .ego.moonlark_main import moonlark_main
-
-            context = await moonlark_main.get_session_context(self.session.session_id)
-            if context:
-                parts.append(context)
+            if session_context:
+                parts.append(session_context)
             return "\n\n".join(parts)
         except Exception as e:
             logger.debug(f"生成会话信息失败: {e}")
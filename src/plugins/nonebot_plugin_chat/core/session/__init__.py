@@ -5,6 +5,8 @@ from nonebot import get_driver, logger
 from nonebot.adapters import Bot
 from nonebot_plugin_alconna import Target
 from nonebot_plugin_larklang.__main__ import get_group_language
+from nonebot_plugin_larkuser import on_user_snapshot_updated
+from nonebot_plugin_larkuser.utils.snapshot import UserSnapshot
 from nonebot_plugin_orm import get_session
 from sqlalchemy import delete
 from ...models import MessageQueueCache
@@ -15,6 +17,13 @@ from .private import PrivateSession
 groups: dict[str, BaseSession] = {}
 
 
+@on_user_snapshot_updated
+def _(snapshot: UserSnapshot) -> None:
+    # 好感度变化时同步到各会话的缓存消息好感度之和
+    for session in groups.values():
+        session.cached_messages.set_user_fav(snapshot.user_id, snapshot.favorability)
+
+
 def get_session_directly(session_id: str) -> BaseSession:
     """
     获取指定会话对象
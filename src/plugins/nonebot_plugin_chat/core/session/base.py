@@ -15,10 +15,11 @@ from nonebot_plugin_orm import get_session
 from sqlalchemy import delete
 
 from nonebot_plugin_chat.lang import lang
-from nonebot_plugin_chat.types import AdapterUserInfo, CachedMessage, PendingInteraction, RuaAction
+from nonebot_plugin_chat.types import AdapterUserInfo, PendingInteraction, RuaAction
 from nonebot_plugin_chat.utils.trigger import calculate_trigger_probability
 
 from ...models import Timer
+from .message_cache import CachedMessageStore
 
 # 消息队列项类型定义
 MessageQueueItem: TypeAlias = (
@@ -63,7 +64,7 @@ class BaseSession(ABC):
         self.bot = bot
         self.lang_str = lang_str
         self.tool_calls_history = []
-        self.cached_messages: list[CachedMessage] = []
+        self.cached_messages = CachedMessageStore(self.CACHED_MESSAGE_CAPACITY)
         self.message_cache_counter = 0
         self.ghot_coefficient = 1
         self.accumulated_text_length = 0  # 累计文本长度
@@ -77,6 +78,9 @@ class BaseSession(ABC):
         self.processor = MessageProcessor(self)
         self.message_queue = SessionQueue(self.processor.notify_message_queued)
 
+    # 缓存消息的最大条数
+    CACHED_MESSAGE_CAPACITY = 50
+
     # interest 衰减配置
     INTEREST_HALF_LIFE = 420  # 半衰期（秒），默认 7 分钟
     INTEREST_CENTER = 0.5  # 回正中心值
@@ -128,9 +132,7 @@ class BaseSession(ABC):
         # 计算好感度系数
         favorability_coefficient = 1.0
         if len(self.cached_messages) > 0:
-            avg_fav = sum(
-                [(await get_user(msg["user_id"])).get_fav() for msg in self.cached_messages if not msg["self"]],
-            ) / len(self.cached_messages)
+            avg_fav = self.cached_messages.get_average_fav()
             logger.debug(f"{avg_fav=}")
             favorability_coefficient = 1 + 0.8 * (1 - math.e ** (-5 * avg_fav))
 
@@ -200,14 +202,13 @@ class BaseSession(ABC):
     async def calculate_ghot_coefficient(self) -> None:
         pass
 
-    def clean_cached_message(self) -> None:
-        if len(self.cached_messages) > 50:
-            self.cached_messages = self.cached_messages[-50:]
-
     async def on_cache_posted(self) -> None:
         self.message_cache_counter += 1
+        # 以发送者当前的好感度更新缓存中的好感度之和（用户数据通常已在快照缓存中）
+        message = self.cached_messages[-1]
+        if not message["self"]:
+            self.cached_messages.set_user_fav(message["user_id"], (await get_user(message["user_id"])).get_fav())
         await self.calculate_ghot_coefficient()
-        self.clean_cached_message()
         self.last_activate = datetime.now()
         from ..ego.moonlark_main import moonlark_main
 
@@ -261,11 +262,7 @@ class BaseSession(ABC):
         pass
 
     async def _get_users_in_cached_message(self) -> dict[str, str]:
-        users = {}
-        for message in self.cached_messages:
-            if not message["self"]:
-                users[message["nickname"]] = message.get("platform_user_id", message["user_id"])
-        return users
+        return self.cached_messages.get_users()
 
     @abstractmethod
     async def get_users(self) -> dict[str, str]:
@@ -451,25 +448,11 @@ class BaseSession(ABC):
         include_self_message: bool = False,
         exclude_content_prefixes: Optional[tuple[str, ...]] = None,
     ) -> str:
-        messages = []
-        for message in self.cached_messages:
-            # 根据 include_self_message 参数决定是否包含自己的消息
-            if not include_self_message and message.get("self", False):
-                continue
-            content = message.get("content", "")
-            if exclude_content_prefixes and content.startswith(exclude_content_prefixes):
-                continue
-            messages.append(
-                f"[{message['send_time'].strftime('%H:%M:%S')}][{message['nickname']}]: {content}",
-            )
-        # 只返回最近的 length 条消息
-        return "\n".join(messages[-length:])
+        return self.cached_messages.get_string(length, include_self_message, exclude_content_prefixes)
 
     async def handle_recall(self, message_id: str) -> None:
-        for message in self.cached_messages:
-            if message["message_id"] == message_id:
-                message_content = message["content"]
-                break
+        if message := self.cached_messages.get_by_message_id(message_id):
+            message_content = message["content"]
         else:
             message_content = await self.text("recall_fetch_failed")
 
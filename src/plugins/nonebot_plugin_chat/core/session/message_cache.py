@@ -0,0 +1,154 @@
+#  Moonlark - A new ChatBot
+#  Copyright (C) 2026  Moonlark Development Team
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ##############################################################################
+
+from collections import deque
+from itertools import islice
+from typing import Iterator, Optional, overload
+
+from nonebot_plugin_chat.types import CachedMessage
+
+
+def render_cached_message(message: CachedMessage) -> str:
+    """渲染一条缓存消息在聊天记录中的文本"""
+    return f"[{message['send_time'].strftime('%H:%M:%S')}][{message['nickname']}]: {message.get('content', '')}"
+
+
+class CachedMessageStore:
+    """固定容量的会话消息缓存
+
+    超出容量时最早的消息被淘汰；同时维护按消息 ID、用户 ID 与昵称的索引，
+    以及每条消息渲染后的聊天记录文本，使查找与生成最近聊天记录无需遍历整个缓存。
+    此外按用户记录好感度，滚动维护所有非自身消息的发送者好感度之和。
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self._messages: deque[CachedMessage] = deque()
+        self._lines: deque[str] = deque()
+        self._by_message_id: dict[str, CachedMessage] = {}
+        self._by_user_id: dict[str, deque[CachedMessage]] = {}
+        self._by_nickname: dict[str, deque[CachedMessage]] = {}
+        self._user_favs: dict[str, float] = {}
+        self._fav_sum = 0.0
+
+    @staticmethod
+    def _index_add(index: dict[str, deque[CachedMessage]], key: str, message: CachedMessage) -> None:
+        index.setdefault(key, deque()).append(message)
+
+    @staticmethod
+    def _index_evict(index: dict[str, deque[CachedMessage]], key: str, message: CachedMessage) -> None:
+        # 淘汰的总是整个缓存中最早的消息，因此也是其所在索引中最早的一条
+        if (messages := index.get(key)) and messages[0] is message:
+            messages.popleft()
+            if not messages:
+                del index[key]
+
+    def append(self, message: CachedMessage) -> None:
+        if len(self._messages) >= self.capacity:
+            self._evict()
+        self._messages.append(message)
+        self._lines.append(render_cached_message(message))
+        if message["message_id"]:
+            self._by_message_id[message["message_id"]] = message
+        if not message["self"]:
+            self._index_add(self._by_user_id, message["user_id"], message)
+            self._index_add(self._by_nickname, message["nickname"], message)
+            self._fav_sum += self._user_favs.get(message["user_id"], 0.0)
+
+    def _evict(self) -> None:
+        message = self._messages.popleft()
+        self._lines.popleft()
+        if self._by_message_id.get(message["message_id"]) is message:
+            del self._by_message_id[message["message_id"]]
+        if not message["self"]:
+            self._fav_sum -= self._user_favs.get(message["user_id"], 0.0)
+            self._index_evict(self._by_user_id, message["user_id"], message)
+            self._index_evict(self._by_nickname, message["nickname"], message)
+            if message["user_id"] not in self._by_user_id:
+                self._user_favs.pop(message["user_id"], None)
+        if not self._messages:
+            # 缓存清空时归零，避免浮点误差累积
+            self._fav_sum = 0.0
+
+    def set_user_fav(self, user_id: str, fav: float) -> None:
+        """更新用户的好感度，用户不在缓存中时忽略"""
+        if (messages := self._by_user_id.get(user_id)) is None:
+            return
+        self._fav_sum += len(messages) * (fav - self._user_favs.get(user_id, 0.0))
+        self._user_favs[user_id] = fav
+
+    def get_average_fav(self) -> float:
+        """非自身消息发送者的好感度之和除以缓存消息总数"""
+        return self._fav_sum / len(self._messages) if self._messages else 0.0
+
+    def get_by_message_id(self, message_id: str) -> Optional[CachedMessage]:
+        return self._by_message_id.get(message_id)
+
+    def get_user_messages(self, user_id: str, length: Optional[int] = None) -> list[CachedMessage]:
+        """获取某个用户（不含自身）最近的 length 条消息，按时间顺序排列"""
+        messages = self._by_user_id.get(user_id, ())
+        if length is None or length >= len(messages):
+            return list(messages)
+        return list(islice(messages, len(messages) - length, None))
+
+    def get_users(self) -> dict[str, str]:
+        """获取缓存中出现过的用户昵称到平台用户 ID 的映射"""
+        return {
+            nickname: messages[-1].get("platform_user_id", messages[-1]["user_id"])
+            for nickname, messages in self._by_nickname.items()
+        }
+
+    def get_string(
+        self,
+        length: int = 50,
+        include_self_message: bool = False,
+        exclude_content_prefixes: Optional[tuple[str, ...]] = None,
+    ) -> str:
+        """从最新的消息向前取出至多 length 条符合条件的消息，生成聊天记录文本"""
+        lines = []
+        for message, line in zip(reversed(self._messages), reversed(self._lines)):
+            if len(lines) >= length:
+                break
+            if not include_self_message and message.get("self", False):
+                continue
+            if exclude_content_prefixes and message.get("content", "").startswith(exclude_content_prefixes):
+                continue
+            lines.append(line)
+        return "\n".join(reversed(lines))
+
+    @overload
+    def __getitem__(self, index: int) -> CachedMessage: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[CachedMessage]: ...
+
+    def __getitem__(self, index: int | slice) -> CachedMessage | list[CachedMessage]:
+        if isinstance(index, slice):
+            return list(self._messages)[index]
+        return self._messages[index]
+
+    def __iter__(self) -> Iterator[CachedMessage]:
+        return iter(self._messages)
+
+    def __reversed__(self) -> Iterator[CachedMessage]:
+        return reversed(self._messages)
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def __bool__(self) -> bool:
+        return bool(self._messages)
@@ -172,6 +172,19 @@ class CommandHandler:
         global_reply = f"{global_stats.avg_reply_time_ms:.2f}ms" if global_stats.avg_reply_time_ms else "N/A"
         global_reply_count = global_stats.reply_count
 
+        prompt_stages = "\n".join(
+            [
+                await lang.text(
+                    "command.stats.prompt_stage",
+                    self.user_id,
+                    stage,
+                    f"{global_stats.get_avg_prompt_stage_time_ms(stage):.2f}ms",
+                    count,
+                )
+                for stage, count in sorted(global_stats.prompt_stage_count.items())
+            ]
+        ) or await lang.text("command.stats.prompt_stage_empty", self.user_id)
+
         await lang.finish(
             "command.stats.result",
             self.user_id,
@@ -183,6 +196,7 @@ class CommandHandler:
             global_fetch_count,
             global_reply,
             global_reply_count,
+            prompt_stages,
         )
 
     async def handle_block(self) -> None:
@@ -8,8 +8,10 @@ driver = get_driver()
 @driver.on_startup
 async def _init_sticker_hashes():
     from .utils.hash_initializer import initialize_sticker_hashes
+    from .utils.sticker_similarity import load_sticker_hash_index
 
     await initialize_sticker_hashes()
+    await load_sticker_hash_index()
 
 
 @driver.on_startup
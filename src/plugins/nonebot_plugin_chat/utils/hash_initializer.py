@@ -22,7 +22,7 @@ from nonebot_plugin_orm import get_session
 from sqlalchemy import select
 
 from ..models import Sticker
-from .sticker_similarity import calculate_perceptual_hash
+from .sticker_similarity import add_sticker_hash, calculate_perceptual_hash
 from .sticker_manager import classify_meme
 
 
@@ -53,6 +53,7 @@ async def _check_and_update_sticker_hashes() -> None:
                 if p_hash:
                     # 更新数据库
                     sticker.p_hash = p_hash
+                    add_sticker_hash(sticker.id, p_hash)
                     success_count += 1
                     logger.debug(f"[Chat] 已计算表情包 {sticker.id} 的 pHash: {p_hash}")
                 else:
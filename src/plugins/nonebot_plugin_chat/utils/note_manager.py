@@ -15,22 +15,133 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 # ##############################################################################
 
+import asyncio
 from datetime import datetime, timedelta
 import json
 import re
 from typing import TYPE_CHECKING, List, Optional
 
-from nonebot import logger
+from nonebot import get_driver, logger
 from nonebot_plugin_apscheduler import scheduler
 from nonebot_plugin_chat.types import AvailableNote, NoteCheckResult
+from nonebot_plugin_larkutils import AhoCorasick
 from nonebot_plugin_openai.utils.chat import fetch_message
 from nonebot_plugin_openai.utils.message import generate_message, get_messages
 from nonebot_plugin_orm import get_session
-from sqlalchemy import select
+from sqlalchemy import delete, select
 
 from ..models import Note
 
 
+def parse_keywords(keywords_str: str) -> List[str]:
+    """Parse keywords string, supporting both space and comma separators for backward compatibility"""
+    if not keywords_str:
+        return []
+    # Support both space and comma separators (existing data uses space, docs mentioned comma)
+    return [k.strip() for k in re.split(r"[\s,]+", keywords_str) if k.strip()]
+
+
+class NoteIndex:
+    """
+    In-memory keyword index of all notes
+
+    Keywords of every note are kept in a single Aho-Corasick automaton, so matching a chat history
+    against the notes of all contexts takes one pass over the text. Only note ids and keywords are
+    kept in memory; matched notes are loaded from the database by id.
+    """
+
+    def __init__(self) -> None:
+        self.automaton = AhoCorasick()
+        # keyword -> ids of notes with this keyword
+        self.keyword_notes: dict[str, set[int]] = {}
+        # note id -> (context id, keywords, expire time)
+        self.notes: dict[int, tuple[str, list[str], Optional[datetime]]] = {}
+        # context id -> ids of notes without keywords (always matched in their own context)
+        self.unconditional_notes: dict[str, set[int]] = {}
+        self.loaded = False
+        self.lock = asyncio.Lock()
+
+    def add(self, note_id: int, context_id: str, keywords: str, expire_time: Optional[datetime]) -> None:
+        """Add a note to the index, replacing the previous entry of the same note"""
+        self.remove(note_id)
+        keyword_list = parse_keywords(keywords)
+        self.notes[note_id] = (context_id, keyword_list, expire_time)
+        if not keywords:
+            self.unconditional_notes.setdefault(context_id, set()).add(note_id)
+        for keyword in keyword_list:
+            if keyword not in self.keyword_notes:
+                self.keyword_notes[keyword] = set()
+                self.automaton.add(keyword)
+            self.keyword_notes[keyword].add(note_id)
+
+    def remove(self, note_id: int) -> None:
+        if (entry := self.notes.pop(note_id, None)) is None:
+            return
+        context_id, keyword_list, _ = entry
+        if note_id in self.unconditional_notes.get(context_id, ()):
+            self.unconditional_notes[context_id].discard(note_id)
+            if not self.unconditional_notes[context_id]:
+                del self.unconditional_notes[context_id]
+        for keyword in keyword_list:
+            note_ids = self.keyword_notes.get(keyword)
+            if note_ids is None:
+                continue
+            note_ids.discard(note_id)
+            if not note_ids:
+                del self.keyword_notes[keyword]
+                self.automaton.discard(keyword)
+
+    def remove_expired(self, current_time: datetime, context_id: Optional[str] = None) -> None:
+        for note_id in [
+            note_id
+            for note_id, (note_context_id, _, expire_time) in self.notes.items()
+            if expire_time is not None
+            and expire_time <= current_time
+            and (context_id is None or note_context_id == context_id)
+        ]:
+            self.remove(note_id)
+
+    def match(self, context_id: str, text: str, include_expired: bool = False) -> tuple[list[int], list[int]]:
+        """
+        Find notes whose keywords appear in text
+
+        Returns:
+            Ids of matched notes in this context (including notes without keywords)
+            and ids of matched notes from other contexts
+        """
+        current_time = datetime.now()
+        note_ids = set(self.unconditional_notes.get(context_id, ()))
+        for keyword in self.automaton.find_all(text):
+            note_ids.update(self.keyword_notes[keyword])
+        notes: list[int] = []
+        notes_from_other_contexts: list[int] = []
+        for note_id in sorted(note_ids):
+            note_context_id, _, expire_time = self.notes[note_id]
+            if not include_expired and expire_time is not None and expire_time <= current_time:
+                continue
+            (notes if note_context_id == context_id else notes_from_other_contexts).append(note_id)
+        return notes, notes_from_other_contexts
+
+    async def load(self) -> None:
+        async with self.lock:
+            if self.loaded:
+                return
+            async with get_session() as session:
+                result = await session.execute(select(Note.id, Note.context_id, Note.keywords, Note.expire_time))
+                for note_id, context_id, keywords, expire_time in result.tuples():
+                    self.add(note_id, context_id, keywords, expire_time)
+            self.loaded = True
+            logger.info(f"Loaded {len(self.notes)} notes into note index")
+
+
+note_index = NoteIndex()
+
+
+@get_driver().on_startup
+async def _() -> None:
+    await note_index.load()
+
+
 class NoteManager:
     """Note management system for creating, reading, updating, and deleting notes"""
 
@@ -72,6 +183,7 @@ class NoteManager:
             await session.commit()
             await session.refresh(note)
 
+        note_index.add(note.id, note.context_id, note.keywords, note.expire_time)
         return note
 
     async def get_notes(self, include_expired: bool = False, except_current_context: bool = False) -> List[Note]:
@@ -149,8 +261,10 @@ class NoteManager:
                 else:
                     note.expire_time = current_time + timedelta(hours=expire_hours)
 
+            keywords, expire_time = note.keywords, note.expire_time
             await session.commit()
-            return True
+        note_index.add(note_id, self.context_id, keywords, expire_time)
+        return True
 
     async def delete_note(self, note_id: int) -> bool:
         """
@@ -169,7 +283,8 @@ class NoteManager:
 
             await session.delete(note)
             await session.commit()
-            return True
+        note_index.remove(note_id)
+        return True
 
     async def delete_expired_notes(self) -> int:
         """
@@ -179,54 +294,30 @@ class NoteManager:
             Number of notes deleted
         """
         current_time = datetime.now()
-        deleted_count = 0
 
         async with get_session() as session:
-            # Find expired notes
-            query = select(Note).where(
-                Note.context_id == self.context_id, Note.expire_time.is_not(None), Note.expire_time <= current_time
+            result = await session.execute(
+                delete(Note).where(
+                    Note.context_id == self.context_id, Note.expire_time.is_not(None), Note.expire_time <= current_time
+                )
             )
-            result = await session.scalars(query)
-            expired_notes = result.all()
-
-            # Delete expired notes
-            for note in expired_notes:
-                await session.delete(note)
-                deleted_count += 1
-
-            if deleted_count > 0:
-                await session.commit()
-
-        return deleted_count
+            await session.commit()
 
-    def _parse_keywords(self, keywords_str: str) -> List[str]:
-        """Parse keywords string, supporting both space and comma separators for backward compatibility"""
-        if not keywords_str:
-            return []
-        # Support both space and comma separators (existing data uses space, docs mentioned comma)
-        return [k.strip() for k in re.split(r"[\s,]+", keywords_str) if k.strip()]
+        note_index.remove_expired(current_time, self.context_id)
+        return result.rowcount
 
     async def filter_note(self, chat_history: str, include_expired: bool = False) -> tuple[List[Note], list[Note]]:
-        notes = []
-        for note in await self.get_notes(include_expired):
-            if not note.keywords:
-                notes.append(note)
-                continue
-            keywords = self._parse_keywords(note.keywords)
-            for keyword in keywords:
-                if keyword in chat_history:
-                    notes.append(note)
-                    break
-        notes_from_other_groups = []
-        for note in await self.get_notes(include_expired, except_current_context=True):
-            if not note.keywords:
-                continue
-            keywords = self._parse_keywords(note.keywords)
-            for keyword in keywords:
-                if keyword in chat_history:
-                    notes_from_other_groups.append(note)
-                    break
-        return notes, notes_from_other_groups
+        await note_index.load()
+        note_ids, other_note_ids = note_index.match(self.context_id, chat_history, include_expired)
+        if not (note_ids or other_note_ids):
+            return [], []
+        async with get_session() as session:
+            result = await session.scalars(select(Note).where(Note.id.in_(note_ids + other_note_ids)))
+            notes = {note.id: note for note in result}
+        return (
+            [notes[note_id] for note_id in note_ids if note_id in notes],
+            [notes[note_id] for note_id in other_note_ids if note_id in notes],
+        )
 
 
 # Helper function to get notes for a context
@@ -252,23 +343,15 @@ async def cleanup_expired_notes() -> int:
         Number of notes deleted
     """
     current_time = datetime.now()
-    deleted_count = 0
 
     async with get_session() as session:
-        # Find all expired notes
-        query = select(Note).where(Note.expire_time.is_not(None), Note.expire_time <= current_time)
-        result = await session.scalars(query)
-        expired_notes = result.all()
-
-        # Delete expired notes
-        for note in expired_notes:
-            await session.delete(note)
-            deleted_count += 1
-
-        if deleted_count > 0:
-            await session.commit()
+        result = await session.execute(
+            delete(Note).where(Note.expire_time.is_not(None), Note.expire_time <= current_time)
+        )
+        await session.commit()
 
-    return deleted_count
+    note_index.remove_expired(current_time)
+    return result.rowcount
 
 
 if TYPE_CHECKING:
@@ -0,0 +1,80 @@
+#  Moonlark - A new ChatBot
+#  Copyright (C) 2026  Moonlark Development Team
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ##############################################################################
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any, AsyncGenerator, Awaitable, Callable, Hashable, TypeVar
+
+from nonebot_plugin_larkuser import get_user
+from nonebot_plugin_larkuser.user.base import MoonlarkUser
+
+from ..config import config
+from .timing_stats import timing_stats_manager
+
+if TYPE_CHECKING:
+    from ..core.session.base import BaseSession
+
+T = TypeVar("T")
+
+
+class PromptContext:
+    """单轮提示词组装的查询上下文
+
+    同一轮中对同一用户或文本键的查询只执行一次，之后直接复用结果；
+    互相独立的查询通过 gather 并发执行，同时进行的查询数量受信号量限制。
+    各阶段的耗时通过 timing_stats_manager 记录。
+    """
+
+    def __init__(self, session: "BaseSession") -> None:
+        self.session = session
+        self.semaphore = asyncio.Semaphore(config.prompt_fetch_concurrency)
+        self.tasks: dict[Hashable, asyncio.Future[Any]] = {}
+
+    async def limit(self, awaitable: Awaitable[T]) -> T:
+        async with self.semaphore:
+            return await awaitable
+
+    def memo(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> "asyncio.Future[T]":
+        """返回 key 对应查询的结果，本轮中首次请求时才会执行 factory"""
+        if (task := self.tasks.get(key)) is None:
+            task = self.tasks[key] = asyncio.ensure_future(self.limit(factory()))
+        return task
+
+    async def gather(self, *awaitables: Awaitable[Any]) -> list[Any]:
+        return list(await asyncio.gather(*awaitables))
+
+    def get_user(self, user_id: str) -> "asyncio.Future[MoonlarkUser]":
+        return self.memo(("user", user_id), lambda: get_user(user_id))
+
+    async def get_fav_level(self, user_id: str) -> str:
+        user = await self.get_user(user_id)
+        return await self.memo(("fav_level", user_id), user.get_fav_level)
+
+    def text(self, key: str, *args: Any) -> "asyncio.Future[str]":
+        return self.memo(("text", key, *args), lambda: self.session.text(key, *args))
+
+    @asynccontextmanager
+    async def stage(self, name: str) -> AsyncGenerator[None, None]:
+        """记录一个组装阶段的耗时"""
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            timing_stats_manager.record_prompt_stage_time(
+                self.session.session_id, name, (time.perf_counter() - begin) * 1000
+            )
@@ -34,7 +34,7 @@ from nonebot_plugin_openai.utils.message import generate_message, get_message
 from sqlalchemy import select
 
 from ..models import Sticker
-from .sticker_similarity import calculate_hash_async, check_sticker_duplicate
+from .sticker_similarity import add_sticker_hash, calculate_hash_async, check_sticker_duplicate, remove_sticker_hash
 
 
 # 表情包分类结果类型
@@ -293,6 +293,7 @@ class StickerManager:
             session.add(sticker)
             await session.commit()
             await session.refresh(sticker)
+            add_sticker_hash(sticker.id, sticker.p_hash)
 
         return sticker
 
@@ -384,6 +385,7 @@ class StickerManager:
 
             await session.delete(sticker)
             await session.commit()
+            remove_sticker_hash(sticker_id)
             return True
 
     async def get_all_stickers(self, limit: int = 100) -> List[Sticker]:
@@ -21,11 +21,18 @@ from typing import Optional, Tuple
 
 import imagehash
 from PIL import Image
-from nonebot_plugin_orm import AsyncSession, async_scoped_session
+from nonebot import logger
+from nonebot_plugin_larkutils import HammingIndex, get_max_distance, parse_hex_hash
+from nonebot_plugin_orm import AsyncSession, async_scoped_session, get_session
 from sqlalchemy import select
 
 from ..models import Sticker
 
+# 已存储表情包感知哈希的索引（表情包 ID -> 哈希）
+sticker_hash_index: HammingIndex[int] = HammingIndex()
+_index_lock = asyncio.Lock()
+_index_loaded = False
+
 
 def calculate_perceptual_hash(image_data: bytes) -> str:
     """
@@ -72,6 +79,30 @@ def compare_hash(hash1: str, hash2: str) -> float:
         return 0.0
 
 
+def add_sticker_hash(sticker_id: int, p_hash: Optional[str]) -> None:
+    """将表情包的感知哈希加入索引"""
+    sticker_hash_index.add_hex(sticker_id, p_hash)
+
+
+def remove_sticker_hash(sticker_id: int) -> None:
+    """从索引中移除已删除的表情包"""
+    sticker_hash_index.remove(sticker_id)
+
+
+async def load_sticker_hash_index() -> None:
+    """从数据库载入表情包感知哈希索引（只读取 p_hash，不读取图片数据）"""
+    global _index_loaded
+    async with _index_lock:
+        if _index_loaded:
+            return
+        async with get_session() as session:
+            result = await session.execute(select(Sticker.id, Sticker.p_hash).where(Sticker.p_hash != None))
+            for sticker_id, p_hash in result.tuples():
+                add_sticker_hash(sticker_id, p_hash)
+        _index_loaded = True
+        logger.info(f"[Chat] 已载入 {len(sticker_hash_index)} 个表情包的感知哈希")
+
+
 async def check_sticker_duplicate(
     image_data: bytes, session: async_scoped_session | AsyncSession, similarity_threshold: float = 0.98
 ) -> Tuple[bool, Optional[Sticker], float]:
@@ -89,23 +120,18 @@ async def check_sticker_duplicate(
     # 在线程池中计算感知哈希（避免阻塞事件循环）
     posting_hash = await asyncio.get_running_loop().run_in_executor(None, calculate_perceptual_hash, image_data)
 
-    if not posting_hash:
+    if (value := parse_hex_hash(posting_hash, sticker_hash_index.bits)) is None:
         # 无法计算哈希，视为不重复
         return False, None, 0.0
 
-    # 获取所有已存储表情包的哈希值
-    sticker_list = (await session.scalars(select(Sticker).where(Sticker.p_hash != None))).all()
-
-    # 比较哈希值
-    for sticker in sticker_list:
-        if not sticker.p_hash:
+    await load_sticker_hash_index()
+    max_distance = get_max_distance(similarity_threshold, sticker_hash_index.bits)
+    for sticker_id, distance in sticker_hash_index.search(value, max_distance):
+        sticker = await session.get(Sticker, sticker_id)
+        if sticker is None:
+            remove_sticker_hash(sticker_id)
             continue
-
-        similarity = compare_hash(posting_hash, sticker.p_hash)
-
-        # 相似度达到阈值则视为重复
-        if similarity >= similarity_threshold:
-            return True, sticker, similarity
+        return True, sticker, 1 - distance / sticker_hash_index.bits
 
     return False, None, 0.0
 
@@ -15,7 +15,7 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 # ##############################################################################
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional
 from datetime import datetime
 from nonebot.log import logger
@@ -36,6 +36,10 @@ class SessionTimingStats:
     # 抓取开始时间（用于计算抓取用时）
     fetch_start_time: Optional[datetime] = None
 
+    # 提示词组装各阶段用时统计，key 为阶段名称
+    total_prompt_stage_time_ms: dict[str, float] = field(default_factory=dict)
+    prompt_stage_count: dict[str, int] = field(default_factory=dict)
+
     def record_fetch_time(self, time_ms: float) -> None:
         """记录一次抓取用时"""
         self.total_fetch_time_ms += time_ms
@@ -48,6 +52,17 @@ class SessionTimingStats:
         self.reply_count += 1
         logger.debug(f"[TimingStats] Reply time recorded: {time_ms:.2f}ms, count: {self.reply_count}")
 
+    def record_prompt_stage_time(self, stage: str, time_ms: float) -> None:
+        """记录一次提示词组装阶段用时"""
+        self.total_prompt_stage_time_ms[stage] = self.total_prompt_stage_time_ms.get(stage, 0.0) + time_ms
+        self.prompt_stage_count[stage] = self.prompt_stage_count.get(stage, 0) + 1
+
+    def get_avg_prompt_stage_time_ms(self, stage: str) -> Optional[float]:
+        """提示词组装阶段的平均用时（毫秒）"""
+        if not (count := self.prompt_stage_count.get(stage)):
+            return None
+        return self.total_prompt_stage_time_ms[stage] / count
+
     def start_fetch(self) -> None:
         """开始抓取计时"""
         self.fetch_start_time = datetime.now()
@@ -81,6 +96,8 @@ class SessionTimingStats:
         self.total_reply_time_ms = 0.0
         self.reply_count = 0
         self.fetch_start_time = None
+        self.total_prompt_stage_time_ms.clear()
+        self.prompt_stage_count.clear()
 
 
 class TimingStatsManager:
@@ -140,6 +157,13 @@ class TimingStatsManager:
 
         logger.info(f"[TimingStats] Session {session_id}: reply took {reply_time_ms:.2f}ms")
 
+    def record_prompt_stage_time(self, session_id: str, stage: str, time_ms: float) -> None:
+        """记录提示词组装阶段用时"""
+        self._get_session_stats(session_id).record_prompt_stage_time(stage, time_ms)
+        self._global_stats.record_prompt_stage_time(stage, time_ms)
+
+        logger.debug(f"[TimingStats] Session {session_id}: prompt stage {stage} took {time_ms:.2f}ms")
+
     def get_session_stats(self, session_id: str) -> Optional[SessionTimingStats]:
         """获取指定会话的统计数据"""
         return self._stats.get(session_id)
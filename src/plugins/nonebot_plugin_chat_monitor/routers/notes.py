@@ -78,6 +78,7 @@ async def create_note(request: Request):
     """创建新笔记"""
     await verify_admin_request(request)
     from nonebot_plugin_chat.models import Note
+    from nonebot_plugin_chat.utils.note_manager import note_index
 
     body = await request.json()
     context_id = body.get("context_id", "chat-monitor")
@@ -102,6 +103,7 @@ async def create_note(request: Request):
         db_session.add(note)
         await db_session.commit()
         await db_session.refresh(note)
+    note_index.add(note.id, note.context_id, note.keywords, note.expire_time)
 
     return {
         "id": note.id,
@@ -118,6 +120,7 @@ async def update_note(note_id: int, request: Request):
     """更新笔记"""
     await verify_admin_request(request)
     from nonebot_plugin_chat.models import Note
+    from nonebot_plugin_chat.utils.note_manager import note_index
 
     body = await request.json()
     async with get_session() as db_session:
@@ -134,6 +137,7 @@ async def update_note(note_id: int, request: Request):
             note.expire_time = datetime.fromtimestamp(datetime.now().timestamp() + h * 3600) if h and h > 0 else None
         await db_session.commit()
         await db_session.refresh(note)
+    note_index.add(note.id, note.context_id, note.keywords, note.expire_time)
 
     return {
         "id": note.id,
@@ -150,6 +154,7 @@ async def delete_note(note_id: int, request: Request):
     """删除笔记"""
     await verify_admin_request(request)
     from nonebot_plugin_chat.models import Note
+    from nonebot_plugin_chat.utils.note_manager import note_index
 
     async with get_session() as db_session:
         note = await db_session.get(Note, note_id)
@@ -157,4 +162,5 @@ async def delete_note(note_id: int, request: Request):
             raise HTTPException(status_code=404, detail="Note not found")
         await db_session.delete(note)
         await db_session.commit()
+    note_index.remove(note_id)
     return {"deleted": True, "id": note_id}
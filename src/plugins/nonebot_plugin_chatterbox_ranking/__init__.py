@@ -13,6 +13,7 @@ require("nonebot_plugin_larkutils")
 require("nonebot_plugin_larkuser")
 require("nonebot_plugin_larklang")
 require("nonebot_plugin_orm")
+require("nonebot_plugin_render")
 require("nonebot_plugin_alconna")
 
 from . import __main__
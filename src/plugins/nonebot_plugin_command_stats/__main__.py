@@ -24,7 +24,7 @@ from nonebot.adapters import Event
 from nonebot.matcher import Matcher
 from nonebot_plugin_alconna import on_alconna, Alconna, Args, Arparma, UniMessage
 from nonebot_plugin_orm import get_session
-from nonebot_plugin_larkutils import get_user_id
+from nonebot_plugin_larkutils import get_user_id, telemetry
 from nonebot_plugin_larklang import LangHelper
 from nonebot_plugin_render import render_template
 from sqlalchemy import select, func, desc, distinct
@@ -82,19 +82,12 @@ async def record_command_usage(matcher: Matcher, state: T_State, event: Event) -
     except Exception:
         group_id = None
 
-    # 写入数据库（used_at 由数据库 server_default 自动填充）
-    try:
-        async with get_session() as session:
-            usage = CommandUsage(
-                command=command_name,
-                user_id=user_id,
-                group_id=group_id,
-            )
-            session.add(usage)
-            await session.commit()
-            logger.info(f"[CommandStats] Recorded: /{command_name} by {user_id} in {group_id}")
-    except Exception as e:
-        logger.warning(f"[CommandStats] Failed to record command usage: {e}")
+    # 放入遥测队列批量写入，used_at 取调用时刻而非写入时刻
+    telemetry.add_event(
+        CommandUsage,
+        {"command": command_name, "user_id": user_id, "group_id": group_id, "used_at": datetime.now()},
+    )
+    logger.info(f"[CommandStats] Queued: /{command_name} by {user_id} in {group_id}")
 
 
 # ============================================================
@@ -104,6 +97,7 @@ async def record_command_usage(matcher: Matcher, state: T_State, event: Event) -
 
 async def get_command_ranking(days: int = 7, limit: int = 10) -> list[dict]:
     """获取近N天热门指令排行"""
+    await telemetry.flush()
     cutoff = datetime.now() - timedelta(days=days)
 
     async with get_session() as session:
@@ -134,6 +128,7 @@ async def get_command_ranking(days: int = 7, limit: int = 10) -> list[dict]:
 
 async def get_total_stats(days: int = 7) -> dict:
     """获取总体统计数据"""
+    await telemetry.flush()
     cutoff = datetime.now() - timedelta(days=days)
 
     async with get_session() as session:
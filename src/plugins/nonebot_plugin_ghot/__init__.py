@@ -14,6 +14,7 @@ require("nonebot_plugin_message_summary")
 require("nonebot_plugin_larkutils")
 require("nonebot_plugin_larklang")
 require("nonebot_plugin_orm")
+require("nonebot_plugin_render")
 require("nonebot_plugin_alconna")
 
 from .function import get_group_hot_score
@@ -1,7 +1,6 @@
 from typing import Tuple
-from nonebot_plugin_orm import get_scoped_session
 
-from .utils.score import get_group_hot_score as _get_group_hot_score
+from .utils.score import get_group_heat_scores
 
 
 async def get_group_hot_score(group_id: str) -> Tuple[int, int, int]:
@@ -14,7 +13,4 @@ async def get_group_hot_score(group_id: str) -> Tuple[int, int, int]:
     Returns:
         Tuple of (1min_score, 5min_score, 15min_score)
     """
-    session = get_scoped_session()
-    s = await _get_group_hot_score(group_id, session)
-    await session.close()
-    return s
+    return get_group_heat_scores(group_id)
@@ -1,9 +1,9 @@
+import asyncio
 import colorsys
-from datetime import timedelta
+from datetime import datetime, timedelta
 import io
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
 from nonebot_plugin_orm import async_scoped_session
+from nonebot_plugin_render import LineChart, render_chart
 from nonebot_plugin_message_summary.models import GroupMessage
 from sqlalchemy import select
 
@@ -49,30 +49,25 @@ async def render_line_cheat(session: async_scoped_session, user_id: str, group_i
         current_time += interval
 
     # Create the chart
-    plt.figure(figsize=(12, 6))
-    plt.plot(time_points, heat_scores, marker="o", linestyle="-", linewidth=2, markersize=4)
-    plt.title(await lang.text("history.title", user_id))
-    plt.xlabel(await lang.text("history.xlabel", user_id))
-    plt.ylabel(await lang.text("history.ylabel", user_id))
-    plt.grid(True, alpha=0.3)
-
-    # Format x-axis as time
-    plt.gca().xaxis.set_major_formatter(mdates.DateFormatter("%H:%M"))
-    plt.gca().xaxis.set_major_locator(mdates.MinuteLocator(interval=60))
-    plt.xticks(rotation=45)
-
-    # Set y-axis limits
-    plt.ylim(0, round(max(heat_scores) // 10 * 10 + 10))
-
-    # Adjust layout to prevent label cutoff
-    plt.tight_layout()
-
-    # Save to bytes
-    buf = io.BytesIO()
-    plt.savefig(buf, format="png", dpi=300, bbox_inches="tight")
-    buf.seek(0)
-    plt.close()
-    return buf.getvalue()
+    return await render_chart(
+        LineChart(
+            figsize=(12, 6),
+            dpi=300,
+            x=time_points,
+            y=heat_scores,
+            line_kwargs={"marker": "o", "linestyle": "-", "linewidth": 2, "markersize": 4},
+            title=await lang.text("history.title", user_id),
+            xlabel=await lang.text("history.xlabel", user_id),
+            ylabel=await lang.text("history.ylabel", user_id),
+            grid={"visible": True, "alpha": 0.3},
+            # Format x-axis as time
+            date_format="%H:%M",
+            date_locator="minute",
+            date_interval=60,
+            xtick_kwargs={"rotation": 45},
+            ylim=(0, round(max(heat_scores) // 10 * 10 + 10)),
+        )
+    )
 
 
 from PIL import Image, ImageDraw, ImageFont
@@ -111,6 +106,27 @@ async def render_heat_cheat(session: async_scoped_session, user_id: str, group_i
         time_cursor += timedelta(minutes=1)
     origin_max_score = max(heat_scores)
     max_score = get_next_tens(origin_max_score)
+    title = await lang.text("heat_c.title", user_id)
+    user_id_text = await lang.text("heat_c.gid", user_id, group_id)
+    interval_text = await lang.text(
+        "heat_c.interval", user_id, f"{(time_interval[1] - time_interval[0]).total_seconds() / 3600:.1f}"
+    )
+    max_text = await lang.text("heat_c.max", user_id, origin_max_score, max_score)
+    # PIL 绘制为同步操作，放到线程中执行以免阻塞事件循环
+    return await asyncio.to_thread(
+        draw_heat_timeline, heat_scores, max_score, time_interval, title, user_id_text, interval_text, max_text
+    )
+
+
+def draw_heat_timeline(
+    heat_scores: list[int],
+    max_score: int,
+    time_interval: tuple[datetime, datetime],
+    title: str,
+    user_id_text: str,
+    interval_text: str,
+    max_text: str,
+) -> bytes:
     # Create Image
     image_width = 600
     image_height = 270
@@ -134,26 +150,22 @@ async def render_heat_cheat(session: async_scoped_session, user_id: str, group_i
         small_font = ImageFont.load_default()
 
     # Draw title
-    title = await lang.text("heat_c.title", user_id)
     draw.text((20, 20), title, fill=text_color, font=title_font)
 
     # Draw user ID
-    user_id_text = await lang.text("heat_c.gid", user_id, group_id)
     draw.text((20, 60), user_id_text, fill=text_color, font=small_font)
 
     # Draw statistics
     stats_y = 90
     draw.text(
         (20, stats_y),
-        await lang.text(
-            "heat_c.interval", user_id, f"{(time_interval[1] - time_interval[0]).total_seconds() / 3600:.1f}"
-        ),
+        interval_text,
         fill=text_color,
         font=text_font,
     )
     draw.text(
         (20, stats_y + 25),
-        await lang.text("heat_c.max", user_id, origin_max_score, max_score),
+        max_text,
         fill=text_color,
         font=text_font,
     )
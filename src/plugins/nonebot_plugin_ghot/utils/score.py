@@ -1,9 +1,16 @@
+import math
+from collections import deque
 from datetime import datetime, timedelta
+from nonebot import get_driver
 from sqlalchemy import select
-from nonebot_plugin_orm import async_scoped_session
+from nonebot_plugin_orm import async_scoped_session, get_session
 from nonebot_plugin_message_summary.models import GroupMessage
+from nonebot_plugin_message_summary.recorder import on_message_recorded
 from ..config import config
 
+# 热度计算的时间窗口（秒）：1、5、15 分钟
+TIME_WINDOWS = (60, 300, 900)
+
 
 async def calculate_heat_score(
     messages_timestamps: list[datetime], current_time: datetime, delta_t: int, r_max: float = 10.0
@@ -43,10 +50,123 @@ async def calculate_heat_score(
     return score
 
 
+class HeatWindow:
+    """单个时间窗口内按秒分桶的消息计数
+
+    线性衰减权重之和 W = Σ(1 - (now - t_i) / Δ) = N - (N * now - Σt_i) / Δ，
+    因此只需维护窗口内的消息数 N 与发送时间之和 Σt_i。
+    """
+
+    def __init__(self, delta_t: int) -> None:
+        self.delta_t = delta_t
+        self.buckets: deque[list[int]] = deque()  # [秒级时间戳, 消息数]
+        self.count = 0
+        self.time_sum = 0
+
+    def add(self, second: int) -> None:
+        self.expire(second)
+        if self.buckets and self.buckets[-1][0] == second:
+            self.buckets[-1][1] += 1
+        else:
+            self.buckets.append([second, 1])
+        self.count += 1
+        self.time_sum += second
+
+    def expire(self, now: float) -> None:
+        while self.buckets and now - self.buckets[0][0] > self.delta_t:
+            second, count = self.buckets.popleft()
+            self.count -= count
+            self.time_sum -= second * count
+
+    def get_weight(self, now: float) -> float:
+        self.expire(now)
+        if not self.count:
+            return 0.0
+        return self.count - (self.count * now - self.time_sum) / self.delta_t
+
+
+class GroupHeat:
+    """群聊热度的滑动窗口累加器"""
+
+    def __init__(self) -> None:
+        self.windows = [HeatWindow(delta_t) for delta_t in TIME_WINDOWS]
+
+    def add(self, timestamp: datetime) -> None:
+        second = math.floor(timestamp.timestamp())
+        for window in self.windows:
+            window.add(second)
+
+    def expire(self, now: float) -> bool:
+        """清除各窗口中已过期的消息，返回是否所有窗口均已为空"""
+        for window in self.windows:
+            window.expire(now)
+        return not any(window.count for window in self.windows)
+
+    def get_scores(self, current_time: datetime) -> tuple[int, int, int]:
+        now = current_time.timestamp()
+        scores = []
+        for window in self.windows:
+            max_weight = config.ghot_max_message_rate * window.delta_t
+            scores.append(min(round(window.get_weight(now) / max_weight * 10000), 10000) if max_weight else 0)
+        return tuple(scores)
+
+
+# 群 ID -> 热度累加器，只包含最近 15 分钟内有消息记录的群
+group_heats: dict[str, GroupHeat] = {}
+# 上次清理 group_heats 的时间戳
+last_pruned = 0.0
+
+
+def prune_group_heats(now: float) -> None:
+    """移除所有窗口均已为空的群"""
+    global last_pruned
+    last_pruned = now
+    for group_id in [group_id for group_id, heat in group_heats.items() if heat.expire(now)]:
+        del group_heats[group_id]
+
+
+@on_message_recorded
+def record_group_message(group_id: str, timestamp: datetime) -> None:
+    if (heat := group_heats.get(group_id)) is None:
+        heat = group_heats[group_id] = GroupHeat()
+    heat.add(timestamp)
+    # 没有人查询的群只会在这里被清理，每个最长窗口周期清理一次
+    if (now := timestamp.timestamp()) - last_pruned > max(TIME_WINDOWS):
+        prune_group_heats(now)
+
+
+@get_driver().on_startup
+async def _() -> None:
+    start_time = datetime.now() - timedelta(seconds=max(TIME_WINDOWS))
+    async with get_session() as session:
+        result = await session.execute(
+            select(GroupMessage.group_id, GroupMessage.timestamp)
+            .where(GroupMessage.timestamp >= start_time)
+            .order_by(GroupMessage.timestamp)
+        )
+        for group_id, timestamp in result:
+            record_group_message(group_id, timestamp)
+
+
+def get_group_heat_scores(group_id: str) -> tuple[int, int, int]:
+    if (heat := group_heats.get(group_id)) is None:
+        return 0, 0, 0
+    return heat.get_scores(datetime.now())
+
+
+def get_all_group_heat_scores() -> dict[str, tuple[int, int, int]]:
+    current_time = datetime.now()
+    prune_group_heats(current_time.timestamp())
+    return {group_id: heat.get_scores(current_time) for group_id, heat in group_heats.items()}
+
+
 async def get_group_hot_score(group_id: str, session: async_scoped_session) -> tuple[int, int, int]:
     """
     Get group heat scores for 1, 5, and 15 minute windows.
 
+    Scores are answered from the in-memory accumulator fed by the message recorder,
+    the session argument is kept for compatibility and is not used.
+
     Args:
         group_id: Group ID
         session: Database session
@@ -54,26 +174,4 @@ async def get_group_hot_score(group_id: str, session: async_scoped_session) -> t
     Returns:
         Tuple of (1min_score, 5min_score, 15min_score)
     """
-    # Get current time
-    current_time = datetime.now()
-
-    # Calculate time windows
-    time_windows = [60, 300, 900]  # 1, 5, 15 minutes in seconds
-
-    # Get messages for this group within the last 15 minutes (longest window)
-    start_time = current_time - timedelta(seconds=900)
-    result = await session.scalars(
-        select(GroupMessage).where(GroupMessage.group_id == group_id).where(GroupMessage.timestamp >= start_time)
-    )
-    messages = result.all()
-
-    # Extract timestamps
-    timestamps = [msg.timestamp for msg in messages]
-
-    # Calculate scores for each time window
-    scores = []
-    for delta_t in time_windows:
-        score = await calculate_heat_score(timestamps, current_time, delta_t, config.ghot_max_message_rate)
-        scores.append(score)
-
-    return tuple(scores)
+    return get_group_heat_scores(group_id)
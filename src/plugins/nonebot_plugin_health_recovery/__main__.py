@@ -4,6 +4,7 @@ from nonebot.log import logger
 from nonebot_plugin_apscheduler import scheduler
 from nonebot_plugin_larkuser.models import UserData
 from nonebot_plugin_larkuser.user.base import DOWN_DURATION, MAX_HEALTH, REVIVE_HEALTH
+from nonebot_plugin_larkuser.utils.snapshot import invalidate_user
 from nonebot_plugin_last_seen.models import LastSeenRecord
 from nonebot_plugin_orm import get_session
 from sqlalchemy import select
@@ -22,6 +23,7 @@ async def recover_health() -> None:
     active_threshold = now - timedelta(hours=1)
     recovered = 0
     revived = 0
+    updated: list[str] = []
     async with get_session() as session:
         last_seen_map = {
             record.user_id: record.last_seen
@@ -36,6 +38,7 @@ async def recover_health() -> None:
                     user.health = REVIVE_HEALTH
                     user.downed_at = None
                     revived += 1
+                    updated.append(user.user_id)
                 continue
             last_seen = last_seen_map.get(user.user_id)
             if last_seen is None or last_seen < active_threshold:
@@ -43,5 +46,7 @@ async def recover_health() -> None:
             if user.health < MAX_HEALTH:
                 user.health = min(user.health + RECOVERY_AMOUNT, MAX_HEALTH)
                 recovered += 1
+                updated.append(user.user_id)
         await session.commit()
+    invalidate_user(*updated)
     logger.info(f"[health_recovery] 本次恢复 {recovered} 名用户的 HP，复活 {revived} 名倒地用户")
@@ -8,7 +8,7 @@ from nonebot_plugin_render import render_template
 from nonebot_plugin_larkutils.jrrp import get_luck_value
 from nonebot_plugin_larkutils import get_user_id, get_group_id
 from .__main__ import jrrp
-from nonebot_plugin_larkuser import get_user
+from nonebot_plugin_larkuser import get_user, get_users, prefetch_avatars
 from nonebot_plugin_chat.core.session import post_group_event
 
 
@@ -22,13 +22,15 @@ async def get_user_list() -> AsyncGenerator[tuple[str, int], None]:
 async def get_rank(sender_id: str, reverse: bool = False) -> NoReturn:
     data = sorted([data async for data in get_user_list()], key=lambda x: x[1], reverse=not reverse)
     templates = {}
+    luckiest_users = await get_users([user_id for user_id, _ in data[:3]])
+    await prefetch_avatars(luckiest_users.values())
     for i in range(min(3, len(data))):
         user_id = data[i][0]
-        user = await get_user(user_id)
+        user = luckiest_users[user_id]
         templates[f"luckiest_{i + 1}"] = {
             "user_id": user_id,
             "value": data[i][1],
-            "avatar": user.get_base64_avatar(),
+            "avatar": await user.get_base64_avatar(),
             "nickname": user.get_nickname(),
         }
     i = 0
@@ -82,6 +84,7 @@ async def get_rank(sender_id: str, reverse: bool = False) -> NoReturn:
         dict(
             [(key, await lang.text(f"template.{key}", user_id)) for key in ["reverse_title", "unregistered", "title"]]
         ),
+        result_cache=True,
     )
     await jrrp.finish(UniMessage().image(raw=image))
 
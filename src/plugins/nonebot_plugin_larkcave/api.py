@@ -16,58 +16,79 @@
 # ##############################################################################
 
 import base64
+import mimetypes
 from fastapi import Query, Request
 import traceback
 
 from fastapi import HTTPException
+from fastapi.responses import FileResponse
 from nonebot.log import logger
 from nonebot import get_app
 from nonebot_plugin_orm import get_session, get_scoped_session
-from sqlalchemy import func, select
+from sqlalchemy import select
 from typing import AsyncGenerator, Optional
 
 from .types import RandomCaveResponse, Image
 from .utils.cave import get_cave
+from .utils.cave_pool import cave_pool
 from nonebot_plugin_larkuser import get_user
 from .models import ImageData, CaveData
 from .utils.decoder import get_image
+from .utils.image_store import get_image_path
 from .config import config
 
 app = get_app()
 
 
-async def get_image_data(cave_id: int) -> AsyncGenerator[Image, None]:
+async def get_image_data(cave_id: int, include_data: bool = True) -> AsyncGenerator[Image, None]:
     """
     获取回声洞图片列表（生成器）
     :param cave_id: 所属回声洞 ID
+    :param include_data: 是否附带 Base64 编码的图片数据
     """
     session = get_scoped_session()
     for image in await session.scalars(select(ImageData).where(ImageData.belong == cave_id)):
         try:
-            data = await get_image(str(image.id), session)
-            yield Image(id=float(image.id), name=str(image.name), data=base64.b64encode(data.data).decode())
+            data = Image(id=float(image.id), name=str(image.name), url=f"/api/cave/image/{image.id}")
+            if include_data:
+                data["data"] = base64.b64encode((await get_image(str(image.id), session)).data).decode()
+            yield data
         except Exception as e:
             logger.error(f"获取 CAVE 图片信息失败 ({image.id=}, {e=}): {traceback.format_exc()}")
     await session.close()
 
 
+@app.get("/api/cave/image/{image_id}")
+async def _(image_id: float) -> FileResponse:
+    async with get_session() as session:
+        image = await session.get(ImageData, image_id)
+        if image is None or image.digest is None:
+            raise HTTPException(status_code=404, detail="图片不存在")
+        path = get_image_path(image.digest)
+        name = str(image.name)
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="图片不存在")
+    # 图片按内容寻址，同一 ID 的内容不会改变
+    return FileResponse(
+        path,
+        media_type=mimetypes.guess_type(name)[0] or "application/octet-stream",
+        headers={"Cache-Control": "public, max-age=31536000, immutable"},
+    )
+
+
 @app.get("/api/cave/random")
 async def _(
     _: Request,
     max_line_count: Optional[int] = Query(default=None),
     single_image_only: bool = Query(default=False),
+    include_data: bool = Query(default=True),
 ) -> RandomCaveResponse:
-    statement = select(CaveData).where(CaveData.public == 1)
-    if single_image_only:
-        statement = statement.where(CaveData.content.regexp_match(r"^(\[\[Img:[0-9]+(\.[0-9]+)?\]\]\])$"))
-    if max_line_count is not None:
-        statement = statement.where(
-            func.char_length(CaveData.content) - func.char_length(func.replace(CaveData.content, "\n", "")) + 1
-            <= max_line_count
-        )
-    statement = statement.order_by(func.random()).limit(1)
+    pool = cave_pool.single_image if single_image_only else cave_pool.all
+    predicate = (
+        (lambda cave_id: cave_pool.line_counts[cave_id] <= max_line_count) if max_line_count is not None else None
+    )
     async with get_session() as session:
-        cave = await session.scalar(statement)
+        cave = await cave_pool.pick(session, pool, predicate)
         if not cave:
             raise HTTPException(status_code=404, detail="没有符合条件的 CAVE")
         return {
@@ -75,12 +96,12 @@ async def _(
             "content": str(cave.content),
             "time": cave.time.timestamp(),
             "author": (await get_user(cave.author)).get_nickname(),
-            "images": [img async for img in get_image_data(cave.id)],
+            "images": [img async for img in get_image_data(cave.id, include_data)],
         }
 
 
 @app.get("/api/cave/index/{cave_id}")
-async def _(request: Request, cave_id: int) -> RandomCaveResponse:
+async def _(request: Request, cave_id: int, include_data: bool = Query(default=True)) -> RandomCaveResponse:
     async with get_session() as session:
         cave = await session.get(CaveData, {"id": cave_id})
         if cave is None:
@@ -90,6 +111,6 @@ async def _(request: Request, cave_id: int) -> RandomCaveResponse:
             content=str(cave.content),
             time=cave.time.timestamp(),
             author=(await get_user(cave.author)).get_nickname(),
-            images=[img async for img in get_image_data(cave.id)],
+            images=[img async for img in get_image_data(cave.id, include_data)],
         )
     return data
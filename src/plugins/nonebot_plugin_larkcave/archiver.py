@@ -15,7 +15,9 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 # ##############################################################################
 
+import asyncio
 import json
+import shutil
 from datetime import datetime
 import traceback
 
@@ -28,6 +30,10 @@ import aiofiles
 import time
 
 from nonebot_plugin_larkcave.models import CaveData, ImageData, RemovedCave
+from nonebot_plugin_larkcave.utils.cave_pool import cave_pool
+from nonebot_plugin_larkcave.utils.image_index import remove_image_hashes
+from nonebot_plugin_larkcave.utils.image_store import get_image_path, remove_image
+from nonebot_plugin_larkcave.utils.similarity.text import remove_cave_text
 from nonebot_plugin_larkcave.utils.comment.get import get_comment_list
 
 data_dir = get_data_dir("nonebot_plugin_cave_archive")
@@ -65,13 +71,19 @@ async def archive_cave(cave_id: int, session: AsyncSession) -> None:
         )
     await session.delete(cave_data)
     await session.commit()
+    remove_cave_text(cave_id)
+    cave_pool.discard(cave_id)
     images = (await session.scalars(select(ImageData).where(ImageData.belong == cave_id))).all()
+    image_ids = [image.id for image in images]
+    digests = {image.digest for image in images if image.digest is not None}
     for image in images:
-        if image.image_data is not None:
-            async with aiofiles.open(path.joinpath(f"{image.id}_{image.name}"), "wb") as f:
-                await f.write(image.image_data)
+        if image.digest is not None and (source := get_image_path(image.digest)).exists():
+            await asyncio.to_thread(shutil.copyfile, source, path.joinpath(f"{image.id}_{image.name}"))
         await session.delete(image)
-        await session.commit()
+    await session.commit()
+    for digest in digests:
+        await remove_image(digest, session)
+    remove_image_hashes(image_ids)
     logger.success(f"已归档回声洞 {cave_id} 于 {path.as_posix()}")
     await session.close()
 
@@ -25,6 +25,7 @@ from nonebot_plugin_larkcave.config import config
 from sqlalchemy.exc import NoResultFound
 from datetime import datetime, timedelta
 from nonebot_plugin_larkcave.utils.decoder import decode_cave
+from nonebot_plugin_larkcave.utils.cave_pool import cave_pool
 
 
 @cave.assign("remove.comment.comment_id")
@@ -80,4 +81,5 @@ async def _(
     post_time = cave_data.time.strftime("%Y-%m-%dT%H:%M:%S")
     await (await decode_cave(cave_data, session, user_id)).send()
     await session.commit()
+    cave_pool.discard(cave_id)
     await lang.finish("remove.success", user_id, cave_id, post_time, config.cave_restore_date, cave_id)
@@ -20,6 +20,7 @@ from nonebot_plugin_larkcave.models import CaveData, RemovedCave
 from nonebot_plugin_orm import async_scoped_session
 from nonebot_plugin_larkutils import get_user_id, is_user_superuser
 from nonebot_plugin_larkcave.__main__ import cave
+from nonebot_plugin_larkcave.utils.cave_pool import cave_pool
 from sqlalchemy.exc import NoResultFound
 
 
@@ -36,8 +37,10 @@ async def _(
     if not ((user_id == cave_data.author and not data.superuser) or is_superuser):
         await lang.finish("restore.no_permission", user_id)
         await cave.finish()
+    content = cave_data.content
     await session.delete(data)
     await session.commit()
     cave_data.public = True
     await session.commit()
+    cave_pool.add(cave_id, content)
     await lang.finish("restore.success", user_id, cave_id)
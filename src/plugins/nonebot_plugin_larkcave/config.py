@@ -8,6 +8,10 @@ class Config(BaseModel):
     cave_need_review: bool = False
     cave_user_cd: float = 10.0
     cave_maximum_similarity: float = 0.75
+    # 是否使用 MinHash/LSH 文本索引筛选查重候选，关闭后与所有回声洞逐一比较
+    cave_text_index: bool = True
+    # 文本相似度比较使用的进程数
+    cave_similarity_workers: int = 2
     cave_restore_date: int = 7
     cave_message_list_length: int = 20
 
@@ -14,13 +14,10 @@
 #  You should have received a copy of the GNU Affero General Public License
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 # ##############################################################################
+from moonlark_cave_similarity import ImageOnlyCave
 from nonebot_plugin_larkcave.models import CaveData
 
 
-class ImageOnlyCave(Exception):
-    pass
-
-
 class ReviewFailed(Exception):
     def __init__(self, reason: str, *args: object) -> None:
         super().__init__(*args)
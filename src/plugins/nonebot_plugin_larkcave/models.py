@@ -1,15 +1,11 @@
 from datetime import datetime
-from sqlalchemy import String, Text, Double, LargeBinary
+from sqlalchemy import String, Text, Double
 from nonebot_plugin_orm import Model
 from sqlalchemy.orm import Mapped, mapped_column
 from pydantic import BaseModel
 
 from .config import config
 
-from sqlalchemy.dialects.mysql import LONGBLOB
-
-CompatibleBlob = LargeBinary().with_variant(LONGBLOB(), "mysql")
-
 
 class CaveData(Model):
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -24,7 +20,8 @@ class ImageData(Model):
     name: Mapped[str] = mapped_column(Text())
     belong: Mapped[int]
     p_hash: Mapped[str] = mapped_column(String(64), nullable=True)
-    image_data: Mapped[bytes] = mapped_column(CompatibleBlob, nullable=True)
+    # 图片内容的 SHA-256 摘要，图片本体位于图片存储中（见 utils/image_store.py）
+    digest: Mapped[str] = mapped_column(String(64), nullable=True, index=True)
 
 
 class CaveImagePromptConfig(Model):
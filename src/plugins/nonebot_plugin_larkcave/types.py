@@ -16,7 +16,7 @@
 # ##############################################################################
 
 from typing import Literal
-from typing_extensions import TypedDict
+from typing_extensions import NotRequired, TypedDict
 from typing_extensions import TypedDict as ExtensionTypedDict
 
 from nonebot_plugin_larkcave.models import CaveData
@@ -42,8 +42,11 @@ class CaveMessage(TypedDict):
 
 class Image(ExtensionTypedDict):
     id: float
-    data: str
     name: str
+    # 图片地址（/api/cave/image/{id}）
+    url: str
+    # Base64 编码的图片数据，请求时指定 include_data=false 则不返回
+    data: NotRequired[str]
 
 
 class RandomCaveResponse(ExtensionTypedDict):
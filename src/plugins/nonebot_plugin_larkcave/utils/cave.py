@@ -19,30 +19,20 @@ import datetime
 import random
 
 from nonebot_plugin_orm import AsyncSession, async_scoped_session
-from sqlalchemy import func, or_, select
 from sqlalchemy.exc import NoResultFound
 
 from ..lang import lang
 from ..models import CaveData
+from .cave_pool import cave_pool, is_keyword_content
 from .comment import add_cave_message, get_comments
 from .cool_down import on_use
 from .decoder import decode_cave
 
-THURSDAY_KEYWORDS = ("星期四", "50", "KFC")
-
 
 async def _random_keyword_cave(
     session: async_scoped_session | AsyncSession, require_keywords: bool | None = None
 ) -> CaveData | None:
-    stmt = select(CaveData).where(CaveData.public)
-    if require_keywords is not None:
-        conditions = [CaveData.content.ilike(f"%{kw}%") for kw in THURSDAY_KEYWORDS]
-        if require_keywords:
-            stmt = stmt.where(or_(*conditions), ~CaveData.content.ilike("%[[Img%"))
-        else:
-            stmt = stmt.where(~or_(*conditions))
-    result = await session.execute(stmt.order_by(func.random()).limit(1))
-    return result.scalar_one_or_none()
+    return await cave_pool.pick(session, cave_pool.get_pool(require_keywords))
 
 
 async def get_cave(session: async_scoped_session | AsyncSession) -> CaveData:
@@ -63,10 +53,7 @@ async def get_cave(session: async_scoped_session | AsyncSession) -> CaveData:
     cave = await _random_keyword_cave(session)
     if cave is None:
         raise IndexError
-    contains_any = (
-        any(kw.lower() in cave.content.lower() for kw in THURSDAY_KEYWORDS) and "[[img" not in cave.content.lower()
-    )
-    if contains_any and random.random() < 0.5:
+    if is_keyword_content(cave.content) and random.random() < 0.5:
         cave = await _random_keyword_cave(session) or cave
     return cave
 
@@ -0,0 +1,168 @@
+#  Moonlark - A new ChatBot
+#  Copyright (C) 2026  Moonlark Development Team
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ##############################################################################
+
+import asyncio
+import random
+import re
+from typing import Callable, Optional
+
+from nonebot import get_driver, logger
+from nonebot_plugin_orm import AsyncSession, get_session
+from sqlalchemy import select
+
+from ..models import CaveData
+
+THURSDAY_KEYWORDS = ("星期四", "50", "KFC")
+SINGLE_IMAGE_PATTERN = re.compile(r"\[\[Img:[0-9]+(\.[0-9]+)?\]\]\]")
+
+
+class IdPool:
+    """支持 O(1) 增删与随机抽取的 ID 集合"""
+
+    def __init__(self) -> None:
+        self.ids: list[int] = []
+        self.positions: dict[int, int] = {}
+
+    def add(self, item: int) -> None:
+        if item in self.positions:
+            return
+        self.positions[item] = len(self.ids)
+        self.ids.append(item)
+
+    def discard(self, item: int) -> None:
+        if (position := self.positions.pop(item, None)) is None:
+            return
+        last = self.ids.pop()
+        if last != item:
+            self.ids[position] = last
+            self.positions[last] = position
+
+    def choice(self) -> Optional[int]:
+        return random.choice(self.ids) if self.ids else None
+
+    def __contains__(self, item: int) -> bool:
+        return item in self.positions
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def is_keyword_content(content: str) -> bool:
+    """回声洞是否包含星期四关键词且不含图片"""
+    content = content.lower()
+    return any(kw.lower() in content for kw in THURSDAY_KEYWORDS) and "[[img" not in content
+
+
+def has_keyword(content: str) -> bool:
+    content = content.lower()
+    return any(kw.lower() in content for kw in THURSDAY_KEYWORDS)
+
+
+class CavePool:
+    """公开回声洞的 ID 池
+
+    all 为全部公开回声洞；keyword 为包含星期四关键词且不含图片的回声洞；
+    other 为不包含任何关键词的回声洞（包含关键词且含图片的回声洞只出现在 all 中）。
+    另外记录每个回声洞的行数与是否为单张图片，供 API 筛选使用。
+    """
+
+    def __init__(self) -> None:
+        self.all = IdPool()
+        self.keyword = IdPool()
+        self.other = IdPool()
+        self.single_image = IdPool()
+        self.line_counts: dict[int, int] = {}
+        self.loaded = False
+        self.lock = asyncio.Lock()
+
+    def add(self, cave_id: int, content: str) -> None:
+        self.all.add(cave_id)
+        if is_keyword_content(content):
+            self.keyword.add(cave_id)
+        elif not has_keyword(content):
+            self.other.add(cave_id)
+        if SINGLE_IMAGE_PATTERN.fullmatch(content):
+            self.single_image.add(cave_id)
+        self.line_counts[cave_id] = content.count("\n") + 1
+
+    def discard(self, cave_id: int) -> None:
+        for pool in (self.all, self.keyword, self.other, self.single_image):
+            pool.discard(cave_id)
+        self.line_counts.pop(cave_id, None)
+
+    def get_pool(self, require_keywords: Optional[bool] = None) -> IdPool:
+        if require_keywords is None:
+            return self.all
+        return self.keyword if require_keywords else self.other
+
+    def choice(
+        self, pool: IdPool, predicate: Optional[Callable[[int], bool]] = None, attempts: int = 16
+    ) -> Optional[int]:
+        """从 pool 中随机抽取满足 predicate 的 ID，多次抽取未命中时退化为在内存中筛选"""
+        if predicate is None:
+            return pool.choice()
+        for _ in range(attempts):
+            if (cave_id := pool.choice()) is None:
+                return None
+            if predicate(cave_id):
+                return cave_id
+        matched = [cave_id for cave_id in pool.ids if predicate(cave_id)]
+        return random.choice(matched) if matched else None
+
+    async def pick(
+        self,
+        session: AsyncSession,
+        pool: IdPool,
+        predicate: Optional[Callable[[int], bool]] = None,
+    ) -> Optional[CaveData]:
+        """随机抽取一个回声洞并按主键读取"""
+        await self.load(session)
+        while (cave_id := self.choice(pool, predicate)) is not None:
+            cave = await session.get(CaveData, {"id": cave_id})
+            if cave is not None and cave.public:
+                return cave
+            # ID 池与数据库不一致（例如回声洞已被归档），移除后重新抽取
+            self.discard(cave_id)
+        return None
+
+    def clear(self) -> None:
+        """清空 ID 池，下次抽取时将重新从数据库载入"""
+        self.all = IdPool()
+        self.keyword = IdPool()
+        self.other = IdPool()
+        self.single_image = IdPool()
+        self.line_counts.clear()
+        self.loaded = False
+
+    async def load(self, session: AsyncSession) -> None:
+        async with self.lock:
+            if self.loaded:
+                return
+            result = await session.execute(select(CaveData.id, CaveData.content).where(CaveData.public))
+            for cave_id, content in result.tuples():
+                self.add(cave_id, content)
+            self.loaded = True
+            logger.info(f"已载入 {len(self.all)} 个公开回声洞")
+
+
+cave_pool = CavePool()
+
+
+@get_driver().on_startup
+async def _() -> None:
+    async with get_session() as session:
+        await cave_pool.load(session)
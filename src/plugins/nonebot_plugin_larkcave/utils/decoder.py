@@ -17,7 +17,6 @@
 
 import re
 import traceback
-import zlib
 
 from nonebot import logger
 from nonebot_plugin_alconna import Image, Text, UniMessage
@@ -26,14 +25,15 @@ from nonebot_plugin_orm import async_scoped_session
 from nonebot_plugin_larkuser import get_user
 from ..lang import lang
 from ..models import CaveData, ImageData, CaveImage
+from .image_store import read_image
 
 
 async def get_image(image_id: str, session: async_scoped_session) -> CaveImage:
     logger.debug(f"获取图片: {image_id}")
     image_data = await session.get_one(ImageData, float(image_id))
-    if image_data.image_data is None:
+    if image_data.digest is None:
         raise ValueError(f"图片数据为空: {image_id}")
-    return CaveImage(id_=image_data.id, data=zlib.decompress(image_data.image_data), name=image_data.name)
+    return CaveImage(id_=image_data.id, data=await read_image(image_data.digest), name=image_data.name)
 
 
 async def get_image_by_match(match: str, session: async_scoped_session) -> CaveImage:
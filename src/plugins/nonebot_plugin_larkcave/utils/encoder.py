@@ -17,7 +17,7 @@
 
 import time
 from ..models import ImageData
-import zlib
+from .image_store import save_image
 from nonebot_plugin_orm import async_scoped_session
 import io
 import imagehash
@@ -43,11 +43,17 @@ async def encode_text(text: str) -> str:
     return text.replace("[", "&#91;").replace("]", "&#93;")
 
 
-async def encode_image(cave_id: int, name: str, data: bytes, session: async_scoped_session) -> str:
+async def encode_image(
+    cave_id: int, name: str, data: bytes, session: async_scoped_session
+) -> tuple[str, tuple[float, str]]:
+    """
+    编码图片并写入图片存储
+    :return: 编码后的文本，以及待提交后写入索引的 (图片 ID, 感知哈希)
+    """
     image_id = time.time()
     # 计算感知哈希
     p_hash = calculate_perceptual_hash(data)
-    # 将压缩后的图片数据存入数据库
-    compressed_data = zlib.compress(data)
-    session.add(ImageData(id=image_id, name=name, belong=cave_id, p_hash=p_hash, image_data=compressed_data))
-    return f"[[Img:{image_id}]]]"
+    # 将图片写入图片存储，数据库中只记录摘要
+    digest = await save_image(data)
+    session.add(ImageData(id=image_id, name=name, belong=cave_id, p_hash=p_hash, digest=digest))
+    return f"[[Img:{image_id}]]]", (image_id, p_hash)
@@ -16,13 +16,13 @@
 # ##############################################################################
 
 import asyncio
-import zlib
 from nonebot import logger
 from nonebot_plugin_orm import async_scoped_session, get_session
 from sqlalchemy import select
 
 from ..models import ImageData
 from .encoder import calculate_perceptual_hash
+from .image_store import read_image
 
 
 async def _check_and_update_hashes() -> None:
@@ -47,12 +47,12 @@ async def _check_and_update_hashes() -> None:
         for image_data in images_without_hash:
             try:
                 # 从数据库读取图片数据
-                if image_data.image_data is None:
+                if image_data.digest is None:
                     logger.warning(f"图片数据为空: ID {image_data.id}")
                     fail_count += 1
                     continue
 
-                image_bytes = zlib.decompress(image_data.image_data)
+                image_bytes = await read_image(image_data.digest)
 
                 # 计算感知哈希
                 p_hash = calculate_perceptual_hash(image_bytes)
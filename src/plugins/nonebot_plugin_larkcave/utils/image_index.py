@@ -0,0 +1,64 @@
+#  Moonlark - A new ChatBot
+#  Copyright (C) 2026  Moonlark Development Team
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ##############################################################################
+
+import asyncio
+from typing import Iterable, Optional
+
+from nonebot import get_driver, logger
+from nonebot_plugin_larkutils import HammingIndex
+from nonebot_plugin_orm import get_session
+from sqlalchemy import select
+
+from ..models import ImageData
+
+# 已存储图片感知哈希的索引（图片 ID -> 哈希），以及图片所属的回声洞
+image_hash_index: HammingIndex[float] = HammingIndex()
+image_belong: dict[float, int] = {}
+_index_lock = asyncio.Lock()
+_index_loaded = False
+
+
+def add_image_hash(image_id: float, belong: int, p_hash: Optional[str]) -> None:
+    """将新存储的图片加入感知哈希索引"""
+    if image_hash_index.add_hex(image_id, p_hash):
+        image_belong[image_id] = belong
+
+
+def remove_image_hashes(image_ids: Iterable[float]) -> None:
+    """从感知哈希索引中移除已删除的图片"""
+    for image_id in image_ids:
+        image_hash_index.remove(image_id)
+        image_belong.pop(image_id, None)
+
+
+async def load_image_hash_index() -> None:
+    """从数据库载入感知哈希索引（只读取 p_hash，不读取图片数据）"""
+    global _index_loaded
+    async with _index_lock:
+        if _index_loaded:
+            return
+        async with get_session() as session:
+            result = await session.execute(select(ImageData.id, ImageData.belong, ImageData.p_hash))
+            for image_id, belong, p_hash in result.tuples():
+                add_image_hash(image_id, belong, p_hash)
+        _index_loaded = True
+        logger.info(f"已载入 {len(image_hash_index)} 张回声洞图片的感知哈希")
+
+
+@get_driver().on_startup
+async def _() -> None:
+    await load_image_hash_index()
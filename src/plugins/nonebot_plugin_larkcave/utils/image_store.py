@@ -0,0 +1,80 @@
+#  Moonlark - A new ChatBot
+#  Copyright (C) 2026  Moonlark Development Team
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ##############################################################################
+
+import asyncio
+import hashlib
+import os
+import uuid
+from pathlib import Path
+
+import aiofiles
+from nonebot_plugin_localstore import get_data_dir
+from nonebot_plugin_orm import AsyncSession, async_scoped_session
+from sqlalchemy import func, select
+
+from ..models import ImageData
+
+# 图片以内容的 SHA-256 摘要为文件名存放，按摘要前两级前缀分目录，相同内容只存储一份
+store_dir = get_data_dir("nonebot_plugin_larkcave").joinpath("images")
+
+
+def get_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def get_image_path(digest: str) -> Path:
+    return store_dir.joinpath(digest[:2], digest[2:4], digest)
+
+
+def _write_image(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # 先写入临时文件再替换，避免并发写入或中断时留下不完整的文件
+    temp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        temp_path.write_bytes(data)
+        os.replace(temp_path, path)
+    finally:
+        temp_path.unlink(missing_ok=True)
+
+
+async def save_image(data: bytes) -> str:
+    """
+    将图片写入图片存储
+    :param data: 图片的字节数据
+    :return: 图片的摘要
+    """
+    digest = get_digest(data)
+    path = get_image_path(digest)
+    if not path.exists():
+        await asyncio.to_thread(_write_image, path, data)
+    return digest
+
+
+async def read_image(digest: str) -> bytes:
+    async with aiofiles.open(get_image_path(digest), "rb") as f:
+        return await f.read()
+
+
+async def remove_image(digest: str, session: async_scoped_session | AsyncSession) -> None:
+    """
+    在没有图片记录引用该摘要时删除图片文件
+    :param digest: 图片的摘要
+    :param session: 数据库会话（调用前应已提交对图片记录的删除）
+    """
+    if await session.scalar(select(func.count()).select_from(ImageData).where(ImageData.digest == digest)):
+        return
+    get_image_path(digest).unlink(missing_ok=True)
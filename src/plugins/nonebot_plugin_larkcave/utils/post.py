@@ -31,12 +31,16 @@ from sqlalchemy import select, func
 
 from ..__main__ import cave
 from ..exceptions import ReviewFailed, EmptyImage, DuplicateCave
+from ..config import config
 from ..lang import lang
 
 from ..models import CaveData
+from .cave_pool import cave_pool
 from .checker import check_cave
 from .decoder import decode_cave
 from .encoder import encode_text, encode_image
+from .image_index import add_image_hash
+from .similarity.text import add_cave_text
 
 lock = asyncio.Lock()
 
@@ -77,21 +81,24 @@ async def post_cave(
                 flat_content.extend(seg)
             else:
                 flat_content.append(seg)
-        parsed_content = " ".join(
-            [
-                (
-                    (await encode_text(seg.text))
-                    if isinstance(seg, Text)
-                    else (
-                        await encode_image(
-                            cave_id, seg.name, cast(bytes, await image_fetch(event, bot, state, seg)), session
-                        )
-                    )
-                )
-                for seg in flat_content
-            ]
-        )
+        encoded: list[str] = []
+        image_hashes: list[tuple[float, str]] = []
+        for seg in flat_content:
+            if isinstance(seg, Text):
+                encoded.append(await encode_text(seg.text))
+                continue
+            text, image_hash = await encode_image(
+                cave_id, seg.name, cast(bytes, await image_fetch(event, bot, state, seg)), session
+            )
+            encoded.append(text)
+            image_hashes.append(image_hash)
+        parsed_content = " ".join(encoded)
         session.add(CaveData(id=cave_id, author=user_id, time=datetime.now(), content=parsed_content))
         await session.commit()
+        add_cave_text(cave_id, parsed_content)
+        for image_id, p_hash in image_hashes:
+            add_image_hash(image_id, cave_id, p_hash)
+        if not config.cave_need_review:
+            cave_pool.add(cave_id, parsed_content)
 
     await lang.finish("add.posted", user_id, cave_id, reply_message=True)
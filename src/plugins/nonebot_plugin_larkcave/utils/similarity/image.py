@@ -1,11 +1,12 @@
 import asyncio
 from nonebot_plugin_orm import async_scoped_session
-from sqlalchemy import select
 from ...types import CheckPassedResult, CheckFailedResult, CheckResult
 from ..encoder import calculate_perceptual_hash
+from ..image_index import image_hash_index, image_belong, load_image_hash_index, remove_image_hashes
+from nonebot_plugin_larkutils import get_max_distance, parse_hex_hash
 import imagehash
 
-from nonebot_plugin_larkcave.models import CaveData, ImageData
+from nonebot_plugin_larkcave.models import CaveData
 
 
 def compare_hash(hash1: str, hash2: str) -> float:
@@ -41,23 +42,18 @@ async def check_image(posting: bytes, session: async_scoped_session, name: str)
     # 计算待投稿图片的感知哈希
     posting_hash = await asyncio.get_running_loop().run_in_executor(None, calculate_perceptual_hash, posting)
 
-    if not posting_hash:
+    if (value := parse_hex_hash(posting_hash, image_hash_index.bits)) is None:
         # 无法计算哈希，直接通过
         return CheckPassedResult(passed=True)
 
-    # 获取所有已存储图片的哈希值
-    image_data_list = (await session.scalars(select(ImageData))).all()
-
-    # 比较哈希值
-    for image_data in image_data_list:
-        if not image_data.p_hash:
+    await load_image_hash_index()
+    # 相似度阈值设为 0.98
+    for image_id, distance in image_hash_index.search(value, get_max_distance(0.98, image_hash_index.bits)):
+        cave = await session.get(CaveData, {"id": image_belong[image_id]})
+        if cave is None:
+            # 图片所属的回声洞已不存在（例如投稿未能提交），从索引中移除
+            remove_image_hashes([image_id])
             continue
-
-        similarity = compare_hash(posting_hash, image_data.p_hash)
-
-        # 相似度阈值设为 0.98
-        if similarity >= 0.98:
-            cave = await session.get_one(CaveData, {"id": image_data.belong})
-            return CheckFailedResult(passed=False, similar_cave=cave, similarity=similarity)
+        return CheckFailedResult(passed=False, similar_cave=cave, similarity=1 - distance / image_hash_index.bits)
 
     return CheckPassedResult(passed=True)
@@ -1,47 +1,116 @@
-import re
-from typing import AsyncGenerator
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from moonlark_cave_similarity import ImageOnlyCave, find_similar_cave, parse_text
+from nonebot import get_driver, logger
+from nonebot_plugin_orm import async_scoped_session, get_session
+from sqlalchemy import select
 
-from ...exceptions import ImageOnlyCave
 from ...config import config
 from ...types import CheckPassedResult, CheckFailedResult, CheckResult
 from ...models import CaveData
-from nonebot_plugin_orm import async_scoped_session
-import difflib
-from sqlalchemy import select
+from ..text_index import MinHashLSH
 
+text_index = MinHashLSH()
+_index_lock = asyncio.Lock()
+_index_loaded = False
+_executor: Optional[ProcessPoolExecutor] = None
 
-async def get_public_cave_list(session: async_scoped_session) -> AsyncGenerator[CaveData, None]:
-    cave_list = (await session.scalars(select(CaveData.id))).all()
-    for cave_id in cave_list:
-        yield await session.get_one(CaveData, {"id": cave_id})
 
+async def find_similar_cave_in_pool(posting: str, caves: list[tuple[int, str]]) -> Optional[tuple[int, float]]:
+    """将候选回声洞按顺序分块交给进程池比较，返回顺序最靠前的相似回声洞"""
+    global _executor
+    if not caves:
+        return None
+    if _executor is None:
+        # 机器人进程是多线程的，fork 出的子进程可能继承被其他线程持有的锁而死锁，
+        # 因此从单线程的 forkserver（不支持时使用 spawn）启动工作进程
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("forkserver")
+            context.set_forkserver_preload(["moonlark_cave_similarity"])
+        else:
+            context = multiprocessing.get_context("spawn")
+        _executor = ProcessPoolExecutor(config.cave_similarity_workers, mp_context=context)
+    loop = asyncio.get_running_loop()
+    size = -(-len(caves) // config.cave_similarity_workers)
+    results = await asyncio.gather(
+        *[
+            loop.run_in_executor(
+                _executor, find_similar_cave, posting, caves[i : i + size], config.cave_maximum_similarity
+            )
+            for i in range(0, len(caves), size)
+        ]
+    )
+    return next((result for result in results if result is not None), None)
 
-def parse_text(text: str) -> str:
-    result = re.search(r"\[\[Img:\d+\.\d+]]]", text)
-    if result:
-        return parse_text(text.replace(result.group(0), ""))
-    elif not text:
-        raise ImageOnlyCave()
-    else:
-        return text
 
+def add_cave_text(cave_id: int, content: str) -> None:
+    """将回声洞加入文本索引，纯图片回声洞不会被加入"""
+    try:
+        text_index.add(cave_id, text_index.get_signature(parse_text(content)))
+    except ImageOnlyCave:
+        pass
 
-async def get_similarity(posting: str, origin: str) -> float:
-    return difflib.SequenceMatcher(None, origin, posting).ratio()
 
+def remove_cave_text(cave_id: int) -> None:
+    text_index.remove(cave_id)
 
-async def get_cave_similarity(posting: str, cave: CaveData) -> float:
-    try:
-        return await get_similarity(posting, parse_text(cave.content))
-    except ImageOnlyCave:
-        return 0
 
+async def load_text_index() -> None:
+    """载入文本索引：先读取持久化的签名，再为数据库中新增的回声洞计算签名"""
+    global _index_loaded
+    async with _index_lock:
+        if _index_loaded:
+            return
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, text_index.load)
+        async with get_session() as session:
+            cave_ids = set(await session.scalars(select(CaveData.id)))
+            for cave_id in set(text_index.signatures) - cave_ids:
+                remove_cave_text(cave_id)
+            # 纯图片回声洞没有签名，每次载入时都会重新读取，但只读取这些回声洞的内容
+            missing = list(cave_ids - set(text_index.signatures))
+            for i in range(0, len(missing), 500):
+                result = await session.execute(
+                    select(CaveData.id, CaveData.content).where(CaveData.id.in_(missing[i : i + 500]))
+                )
+                for cave_id, content in result.tuples():
+                    add_cave_text(cave_id, content)
+        await loop.run_in_executor(None, text_index.save)
+        _index_loaded = True
+        logger.info(f"已载入 {len(text_index.signatures)} 个回声洞的文本索引")
 
-async def compare_cave_content(posting: str, cave: CaveData) -> CheckResult:
-    if (similarity := await get_cave_similarity(posting, cave)) >= config.cave_maximum_similarity:
-        return CheckFailedResult(passed=False, similarity=similarity, similar_cave=cave)
-    else:
-        return CheckPassedResult(passed=True)
+
+@get_driver().on_startup
+async def _() -> None:
+    if config.cave_text_index:
+        await load_text_index()
+
+
+@get_driver().on_shutdown
+async def _() -> None:
+    if _index_loaded:
+        text_index.save()
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def get_candidate_caves(content: str, session: async_scoped_session) -> list[tuple[int, str]]:
+    """获取需要与投稿比较的回声洞（按 ID 排序），启用文本索引时只返回 LSH 候选"""
+    if not config.cave_text_index:
+        result = await session.execute(select(CaveData.id, CaveData.content).order_by(CaveData.id))
+        return list(result.tuples())
+    await load_text_index()
+    candidates = sorted(text_index.query(text_index.get_signature(content)))
+    caves = []
+    for i in range(0, len(candidates), 500):
+        result = await session.execute(
+            select(CaveData.id, CaveData.content).where(CaveData.id.in_(candidates[i : i + 500]))
+        )
+        caves.extend(result.tuples())
+    return sorted(caves)
 
 
 async def check_text_content(posting: str, session: async_scoped_session) -> CheckResult:
@@ -49,7 +118,8 @@ async def check_text_content(posting: str, session: async_scoped_session) -> Che
         content = parse_text(posting)
     except ImageOnlyCave:
         return CheckPassedResult(passed=True)
-    async for cave in get_public_cave_list(session):
-        if not (result := await compare_cave_content(content, cave))["passed"]:
-            return result
-    return CheckPassedResult(passed=True)
+    if (result := await find_similar_cave_in_pool(content, await get_candidate_caves(content, session))) is None:
+        return CheckPassedResult(passed=True)
+    cave_id, similarity = result
+    cave = await session.get_one(CaveData, {"id": cave_id})
+    return CheckFailedResult(passed=False, similarity=similarity, similar_cave=cave)
@@ -0,0 +1,112 @@
+#  Moonlark - A new ChatBot
+#  Copyright (C) 2026  Moonlark Development Team
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ##############################################################################
+import zlib
+from typing import Iterable
+
+import numpy as np
+from nonebot import logger
+from nonebot_plugin_localstore import get_data_dir
+
+# 2^31 - 1，保证 a * hash + b 在 uint64 范围内不溢出
+PRIME = (1 << 31) - 1
+SHINGLE_SIZE = 2
+
+index_file = get_data_dir("nonebot_plugin_larkcave").joinpath("text_index.npz")
+
+
+def get_shingles(text: str) -> set[str]:
+    if len(text) <= SHINGLE_SIZE:
+        return {text}
+    return {text[i : i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+class MinHashLSH:
+    """基于字符 shingle 的 MinHash 签名与 LSH 分桶索引
+
+    签名分为 bands 段，任意一段完全相同的两段文本即互为候选。
+    Jaccard 相似度为 s 的两段文本成为候选的概率为 1 - (1 - s ^ rows) ^ bands。
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 64, seed: int = 0x6C61726B) -> None:
+        if num_perm % bands:
+            raise ValueError(f"签名长度 {num_perm} 无法均分为 {bands} 段")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, PRIME, num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, PRIME, num_perm, dtype=np.uint64)
+        self.signatures: dict[int, np.ndarray] = {}
+        self.buckets: list[dict[bytes, set[int]]] = [{} for _ in range(bands)]
+
+    @property
+    def params(self) -> np.ndarray:
+        return np.array([self.num_perm, self.bands, self.seed, SHINGLE_SIZE], dtype=np.int64)
+
+    def get_signature(self, text: str) -> np.ndarray:
+        hashes = np.fromiter((zlib.crc32(shingle.encode()) for shingle in get_shingles(text)), dtype=np.uint64).reshape(
+            -1, 1
+        )
+        return ((hashes * self.a + self.b) % PRIME).min(axis=0).astype(np.uint32)
+
+    def _get_band_keys(self, signature: np.ndarray) -> Iterable[bytes]:
+        for band in range(self.bands):
+            yield signature[band * self.rows : (band + 1) * self.rows].tobytes()
+
+    def add(self, key: int, signature: np.ndarray) -> None:
+        self.remove(key)
+        self.signatures[key] = signature
+        for bucket, band_key in zip(self.buckets, self._get_band_keys(signature)):
+            bucket.setdefault(band_key, set()).add(key)
+
+    def remove(self, key: int) -> None:
+        if (signature := self.signatures.pop(key, None)) is None:
+            return
+        for bucket, band_key in zip(self.buckets, self._get_band_keys(signature)):
+            keys = bucket[band_key]
+            keys.discard(key)
+            if not keys:
+                del bucket[band_key]
+
+    def query(self, signature: np.ndarray) -> set[int]:
+        candidates: set[int] = set()
+        for bucket, band_key in zip(self.buckets, self._get_band_keys(signature)):
+            if keys := bucket.get(band_key):
+                candidates.update(keys)
+        return candidates
+
+    def save(self) -> None:
+        keys = np.fromiter(self.signatures.keys(), dtype=np.int64, count=len(self.signatures))
+        signatures = np.array(list(self.signatures.values()), dtype=np.uint32).reshape(-1, self.num_perm)
+        with index_file.open("wb") as f:
+            np.savez(f, params=self.params, keys=keys, signatures=signatures)
+
+    def load(self) -> bool:
+        """从文件载入签名，参数不一致或文件损坏时返回 False"""
+        if not index_file.exists():
+            return False
+        try:
+            with np.load(index_file) as data:
+                if not np.array_equal(data["params"], self.params):
+                    return False
+                for key, signature in zip(data["keys"].tolist(), data["signatures"]):
+                    self.add(key, signature)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"读取回声洞文本索引失败: {e}")
+            return False
+        return True
@@ -238,6 +238,7 @@ async def menu_category_handler(category: str, user_id: str = get_user_id()) ->
                     {"help_hint": await lang.text("menu.menu_cat_help_hint", user_id)},
                     False,
                     True,
+                    result_cache=True,
                 ),
                 name="image.png",
             )
@@ -1,30 +1,31 @@
-import inspect
 from nonebot.params import Depends
-import json
-from typing import Any, Optional
+from typing import Any, Iterable, Optional
 import random
 from pathlib import Path
 from types import ModuleType
 from typing import NoReturn
 from nonebot import get_driver, get_plugin_by_module_name, get_plugin_config, logger
 from nonebot.matcher import Matcher
-from nonebot_plugin_larkutils import parse_special_user_id
+from nonebot_plugin_larkutils import parse_special_user_id, LRUCache, get_caller_plugin_name
 from .config import Config
 from .exceptions import *
-from .loader import LangLoader
+from .loader import LangLoader, LanguageTable, remove_trailing_blank_lines
 from .models import LanguageData, LanguageKeyCache, DisplaySetting, GroupLanguageSetting
 from nonebot_plugin_orm import get_session, AsyncSession
 from sqlalchemy import select
 import copy
 
 languages = {}
+language_table = LanguageTable({}, {})
 config = get_plugin_config(Config)
 builtin_format = {"__prefix__": config.command_start[0]}
+user_language_cache: LRUCache[str, str] = LRUCache(config.language_cache_size)
+group_language_cache: LRUCache[str, str] = LRUCache(config.language_cache_size)
 
 
 @get_driver().on_startup
 async def load_languages() -> None:
-    global languages
+    global languages, language_table
     async with get_session() as session:
         for item in await session.scalars(select(LanguageKeyCache)):
             await session.delete(item)
@@ -33,6 +34,11 @@ async def load_languages() -> None:
     await loader.init()
     await loader.load()
     languages = copy.deepcopy(loader.get_languages())
+    language_table = loader.get_table()
+
+
+def get_short_plugin_name(plugin_name: str) -> str:
+    return plugin_name[15:] if plugin_name.startswith("nonebot_plugin_") else plugin_name
 
 
 def get_module_name(module: ModuleType | None) -> str | None:
@@ -40,19 +46,14 @@ def get_module_name(module: ModuleType | None) -> str | None:
         return
     if (plugin := get_plugin_by_module_name(module.__name__)) is None:
         return
-    return plugin.name[15:] if plugin.name.startswith("nonebot_plugin_") else plugin.name
+    return get_short_plugin_name(plugin.name)
 
 
-def remove_trailing_blank_lines(text: str) -> str:
-    """删除文本结尾的空行
-
-    YAML 块标量（如 `|`）会在文本末尾保留换行符，导致渲染或发送时出现多余空行。
-    此函数只清理结尾的空行（含仅含空白字符的行），不影响文本中间内容。
-    """
-    lines = text.splitlines()
-    while lines and not lines[-1].strip():
-        lines.pop()
-    return "\n".join(lines)
+def get_caller_module_name(depth: int = 1) -> str | None:
+    """同 get_module_name，但直接解析调用方（depth 为 1 时为调用本函数的函数的调用方）所属插件"""
+    if (plugin_name := get_caller_plugin_name(depth + 1)) is None:
+        return
+    return get_short_plugin_name(plugin_name)
 
 
 def apply_template(language: str, plugin: str, key: str, text: str) -> str:
@@ -62,27 +63,35 @@ def apply_template(language: str, plugin: str, key: str, text: str) -> str:
         return text
 
 
-async def get_text(language: Optional[str], plugin: str, key: str, session: AsyncSession, *args, **kwargs) -> str:
-    expr = select(LanguageKeyCache.text).where(LanguageKeyCache.plugin == plugin, LanguageKeyCache.key == key)
-    if language is not None:
-        expr = expr.where(LanguageKeyCache.language == language)
-    data = (await session.scalars(expr)).first()
-    if data is None:
-        if language is not None:
-            return await get_text(None, plugin, key, session, *args, **kwargs)
-        else:
-            return f"[缺失: {plugin}.{key} ({args}; {kwargs})]"
-    text = random.choice(json.loads(data))
+async def get_text(language: Optional[str], plugin: str, key: str, *args, **kwargs) -> str:
+    texts = None if language is None else language_table.get(language, plugin, key)
+    if texts is None and (texts := language_table.get_fallback(plugin, key)) is None:
+        return f"[缺失: {plugin}.{key} ({args}; {kwargs})]"
+    text = random.choice(texts)
+    if not text.need_format:
+        return text.text
     try:
-        return remove_trailing_blank_lines(text.format(*args, **kwargs, **builtin_format))
+        return remove_trailing_blank_lines(text.text.format(*args, **kwargs, **builtin_format))
     except IndexError:
-        return remove_trailing_blank_lines(text)
+        return remove_trailing_blank_lines(text.text)
 
 
 def get_languages() -> dict[str, LanguageData]:
     return languages
 
 
+def get_default_language() -> str:
+    return config.language_index_order[0]
+
+
+def resolve_language(language: Optional[str]) -> str:
+    if language is None:
+        return "zh_hans"
+    if language not in languages:
+        return get_default_language()
+    return language
+
+
 async def set_user_language(user_id: str, language: str) -> None:
     async with get_session() as session:
         user = await session.get(DisplaySetting, user_id)
@@ -92,23 +101,61 @@ async def set_user_language(user_id: str, language: str) -> None:
             user.language = language
         await session.merge(user)
         await session.commit()
+    user_language_cache.set(user_id, language)
 
 
-async def get_user_language(user_id: str, session: AsyncSession) -> str:
+def get_special_user_language(user_id: str) -> Optional[str]:
     if user_id.startswith("mlsid::") and "--lang" in (args := parse_special_user_id(user_id)):
         lang = args["--lang"]
         if lang == "default":
             lang = "zh_hans"
         return lang
-    async with get_session() as session:
-        user = await session.get(DisplaySetting, user_id)
-        if user is not None:
-            language = user.language
+    return None
+
+
+async def get_user_language(user_id: str, session: Optional[AsyncSession] = None) -> str:
+    if (lang := get_special_user_language(user_id)) is not None:
+        return lang
+    if (language := user_language_cache.get(user_id)) is None:
+        if session is None:
+            async with get_session() as session:
+                language = await session.scalar(
+                    select(DisplaySetting.language).where(DisplaySetting.user_id == user_id)
+                )
         else:
-            language = "zh_hans"
-    if language not in languages:
-        await set_user_language(user_id, language := config.language_index_order[0])
-    return language
+            language = await session.scalar(select(DisplaySetting.language).where(DisplaySetting.user_id == user_id))
+        user_language_cache.set(user_id, language := language or "zh_hans")
+    return resolve_language(language)
+
+
+async def get_user_languages(user_ids: Iterable[str]) -> dict[str, str]:
+    """批量获取用户语言，未缓存的用户仅需一次查询"""
+    result: dict[str, str] = {}
+    missing: list[str] = []
+    for user_id in user_ids:
+        if (lang := get_special_user_language(user_id)) is not None:
+            result[user_id] = lang
+        elif (language := user_language_cache.get(user_id)) is not None:
+            result[user_id] = resolve_language(language)
+        else:
+            missing.append(user_id)
+    if missing:
+        async with get_session() as session:
+            stored = dict(
+                (
+                    await session.execute(
+                        select(DisplaySetting.user_id, DisplaySetting.language).where(
+                            DisplaySetting.user_id.in_(missing)
+                        )
+                    )
+                )
+                .tuples()
+                .all()
+            )
+        for user_id in missing:
+            user_language_cache.set(user_id, language := stored.get(user_id) or "zh_hans")
+            result[user_id] = resolve_language(language)
+    return result
 
 
 async def set_group_language(group_id: str, language: str) -> None:
@@ -121,35 +168,30 @@ async def set_group_language(group_id: str, language: str) -> None:
             group.language = language
         await session.merge(group)
         await session.commit()
+    group_language_cache.set(group_id, language)
 
 
 async def get_group_language(group_id: str) -> str:
     """获取群聊的语言，如果不存在则返回默认语言 zh_hans"""
-    async with get_session() as session:
-        group = await session.get(GroupLanguageSetting, group_id)
-        if group is not None:
-            language = group.language
-        else:
-            language = "zh_hans"
-    if language not in languages:
-        language = config.language_index_order[0]
-    return language
+    if (language := group_language_cache.get(group_id)) is None:
+        async with get_session() as session:
+            language = await session.scalar(
+                select(GroupLanguageSetting.language).where(GroupLanguageSetting.group_id == group_id)
+            )
+        group_language_cache.set(group_id, language := language or "zh_hans")
+    return resolve_language(language)
 
 
 class LangHelper:
 
     def __init__(self, name: str = "") -> None:
-        module = inspect.getmodule(inspect.stack()[1][0])
-        self.plugin_name = name or get_module_name(module) or ""
+        self.plugin_name = name or get_caller_module_name() or ""
         if not self.plugin_name:
             raise InvalidPluginNameException(self.plugin_name)
 
     async def text(self, key: str, user_id: str | int, *args, **kwargs) -> str:
-        session = get_session()
-        language = await get_user_language(str(user_id), session)
-        text = await get_text(language, self.plugin_name, key, session, *args, **kwargs)
-        await session.close()
-        return text
+        language = await get_user_language(str(user_id))
+        return await get_text(language, self.plugin_name, key, *args, **kwargs)
 
     def get_command_helper(self, base_key: Optional[str] = None, **preformated_keys) -> Any:
         async def _get_command_helper() -> "CommandLangHelper":
@@ -6,3 +6,6 @@ class Config(BaseModel):
 
     language_dir: str = "src/lang"
     command_start: list[str] = ["/"]
+    language_index_order: list[str] = ["zh_hans"]
+    # 用户、群聊语言缓存的最大条目数
+    language_cache_size: int = 8192
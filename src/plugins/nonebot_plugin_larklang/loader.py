@@ -1,5 +1,7 @@
 import tomllib
-from typing import Any
+from string import Formatter
+from types import MappingProxyType
+from typing import Any, Mapping, NamedTuple
 from pathlib import Path
 from nonebot_plugin_orm import get_session
 import aiofiles
@@ -11,6 +13,57 @@ import json
 from .models import LanguageData, LanguageKey, LanguageKeyCache
 
 
+class CompiledText(NamedTuple):
+    """预编译的本地化文本
+
+    不含替换字段的文本在加载时即完成格式化与结尾空行清理，运行时可直接返回。
+    """
+
+    text: str
+    need_format: bool
+
+
+def remove_trailing_blank_lines(text: str) -> str:
+    """删除文本结尾的空行
+
+    YAML 块标量（如 `|`）会在文本末尾保留换行符，导致渲染或发送时出现多余空行。
+    此函数只清理结尾的空行（含仅含空白字符的行），不影响文本中间内容。
+    """
+    lines = text.splitlines()
+    while lines and not lines[-1].strip():
+        lines.pop()
+    return "\n".join(lines)
+
+
+def compile_text(text: str) -> CompiledText:
+    try:
+        chunks = list(Formatter().parse(text))
+    except ValueError:
+        # 格式错误的文本保留到运行时再由 str.format 抛出异常，与原行为一致
+        return CompiledText(text, True)
+    if any(field is not None for _, field, _, _ in chunks):
+        return CompiledText(text, True)
+    return CompiledText(remove_trailing_blank_lines("".join(literal for literal, _, _, _ in chunks)), False)
+
+
+class LanguageTable:
+    """只读的进程内本地化表，以 (语言, 插件, 键) 为索引"""
+
+    def __init__(
+        self,
+        keys: Mapping[tuple[str, str, str], tuple[CompiledText, ...]],
+        fallback: Mapping[tuple[str, str], tuple[CompiledText, ...]],
+    ) -> None:
+        self.keys = MappingProxyType(dict(keys))
+        self.fallback = MappingProxyType(dict(fallback))
+
+    def get(self, language: str, plugin: str, key: str) -> tuple[CompiledText, ...] | None:
+        return self.keys.get((language, plugin, key))
+
+    def get_fallback(self, plugin: str, key: str) -> tuple[CompiledText, ...] | None:
+        return self.fallback.get((plugin, key))
+
+
 class KeysParser:
 
     def __init__(self, data: dict[str, dict], format_: Any):
@@ -75,6 +128,8 @@ class LangLoader:
         self.languages: dict[str, LanguageData] = {}
         self.session = get_session()
         self.format = format_
+        self.table: dict[tuple[str, str, str], tuple[CompiledText, ...]] = {}
+        self.fallback: dict[tuple[str, str], tuple[CompiledText, ...]] = {}
 
     async def init(self) -> None:
         for lang in self.lang_list:
@@ -107,7 +162,14 @@ class LangLoader:
 
     async def commit_keys(self, langugage: str, plugin: str, keys: dict[str, LanguageKey]) -> None:
         for key, value in keys.items():
+            compiled = tuple(compile_text(text) for text in value.text)
+            self.table[(langugage, plugin, key)] = compiled
+            self.fallback.setdefault((plugin, key), compiled)
+            # LanguageKeyCache 仅供外部程序读取，Moonlark 自身从 LanguageTable 获取文本
             self.session.add(LanguageKeyCache(language=langugage, plugin=plugin, key=key, text=json.dumps(value.text)))
 
     def get_languages(self) -> dict[str, LanguageData]:
         return self.languages
+
+    def get_table(self) -> LanguageTable:
+        return LanguageTable(self.table, self.fallback)
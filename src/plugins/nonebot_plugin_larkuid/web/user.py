@@ -7,6 +7,7 @@ from nonebot import get_app
 
 from nonebot_plugin_larkuser.models import UserData
 from nonebot_plugin_larkuser.utils.user import get_user
+from nonebot_plugin_larkuser.utils.snapshot import invalidate_user
 from nonebot_plugin_larkutils import review_text
 from ..types import BasicUserResponse, DetailedUserResponse, MessageResponse
 from ..session import get_user_data
@@ -19,7 +20,7 @@ app = cast(FastAPI, get_app())
 async def _(request: Request, avatar: bool = True, user_data: MoonlarkUser = get_user_data()) -> DetailedUserResponse:
     reg_time = user_data.get_register_time()
     return {
-        "avatar": user_data.get_base64_avatar(),
+        "avatar": await user_data.get_base64_avatar() if avatar else None,
         "total_experience": user_data.get_experience(),
         "favorability": user_data.get_fav(),
         "health": user_data.get_health(),
@@ -46,6 +47,7 @@ async def _(
             else:
                 return {"success": False, "message": f"审核未通过: {r['message']}"}
         await session.commit()
+    invalidate_user(user_data.user_id)
     return {"success": True, "message": "执行过程中未出现异常"}
 
 
@@ -58,6 +60,6 @@ async def _(request: Request, user_id: str, avatar: bool = True) -> BasicUserRes
     return {
         "user_id": user_data.user_id,
         "nickname": user_data.get_nickname(),
-        "avatar": user_data.get_base64_avatar() if avatar else None,
+        "avatar": await user_data.get_base64_avatar() if avatar else None,
         "level": user_data.get_level(),
     }
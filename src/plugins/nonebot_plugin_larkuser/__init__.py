@@ -21,7 +21,16 @@ from .matchers import recorder, panel, whoami, register, setnick, getid
 from .matchers import subaccount_admin
 from .utils.matcher import patch_matcher
 from .utils.level import get_level_by_experience
-from .utils.user import get_user, MoonlarkUser, get_registered_users, get_registered_user_list, get_registered_user_ids
+from .utils.user import (
+    get_user,
+    get_users,
+    MoonlarkUser,
+    get_registered_users,
+    get_registered_user_list,
+    get_registered_user_ids,
+)
 from .utils.waiter import prompt
 from .utils.nickname import get_nickname
 from .utils.waiter2 import WaitUserInput
+from .utils.snapshot import invalidate_user, on_user_snapshot_updated
+from .utils.avatar import prefetch_avatars
@@ -6,6 +6,11 @@ class Config(BaseModel):
     """Plugin Config Here"""
 
     user_registered_guest: bool = False
+    # 用户数据快照缓存的最大条目数与有效期（秒）
+    user_cache_size: int = 4096
+    user_cache_ttl: int = 300
+    # 头像内存缓存（解压后）的总大小上限（MiB）
+    user_avatar_cache_size: int = 32
 
 
 config = get_plugin_config(Config)
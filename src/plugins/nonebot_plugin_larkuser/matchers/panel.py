@@ -21,7 +21,7 @@ async def get_user_info(matcher: Matcher, user_id: str) -> None:
             {
                 "nickname": user.get_nickname(),
                 "user_id": await lang.text("panel.uid", user_id, user_id),
-                "avatar": user.get_base64_avatar(),
+                "avatar": await user.get_base64_avatar(),
                 "level": await lang.text(
                     "panel.level",
                     user_id,
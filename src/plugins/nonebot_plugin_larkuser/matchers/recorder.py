@@ -1,5 +1,6 @@
 from ..utils.avatar import is_user_avatar_updated, update_user_avatar
 from ..utils.user import get_user
+from ..utils.snapshot import invalidate_user
 from nonebot import on_message
 from nonebot.log import logger
 from nonebot_plugin_orm import async_scoped_session
@@ -26,7 +27,9 @@ async def _(session: async_scoped_session, user: UserInfo = EventUserInfo()) ->
     except NoResultFound:
         return
     config = json.loads(user_data.config)
+    nickname_updated = False
     if user_data.nickname != user.user_name and not config.get("lock_nickname"):
+        nickname_updated = True
         logger.info(f"用户 {user_data.user_id} 修改了其昵称 ({user_data.nickname} => {user.user_name})")
         user_data.nickname = user.user_name
         config.pop("nick_source", None)  # 清除自动补全标识，标记为通过自身消息更新
@@ -37,6 +40,8 @@ async def _(session: async_scoped_session, user: UserInfo = EventUserInfo()) ->
             await update_user_avatar(user_data.user_id, avatar)
             logger.info(f"注册用户 {user_data.user_id} 更新了其头像")
     await session.commit()
+    if nickname_updated:
+        invalidate_user(user_data.user_id)
 
 
 @on_message(block=False, priority=10, rule=checker_guest).handle()
@@ -26,6 +26,7 @@ from nonebot_plugin_larkutils import get_user_id, review_text
 
 from ..utils.matcher import patch_matcher
 from ..utils.user import get_user
+from ..utils.snapshot import invalidate_user
 from ..models import UserData
 from ..lang import lang
 
@@ -51,6 +52,7 @@ async def _(
             config.pop("nick_source", None)  # 解锁时同时清除自动补全标识
             user.config = json.dumps(config)
             await session.commit()
+        invalidate_user(user_id)
         await lang.finish("setnick.unlocked", user_id)
 
     if len(new_nick) > 27:
@@ -77,5 +79,6 @@ async def _(
         config.pop("nick_source", None)  # 清除自动补全标识，标记为手动设置
         user.config = json.dumps(config)
         await session.commit()
+    invalidate_user(user_id)
 
     await lang.finish("setnick.success", user_id, new_nick)
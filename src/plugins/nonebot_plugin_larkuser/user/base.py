@@ -20,8 +20,10 @@ import base64
 from datetime import datetime, timedelta
 from typing import Optional, TypeAlias, TypeGuard, TypeVar
 from abc import ABC, abstractmethod
+from nonebot.log import logger
 from nonebot_plugin_orm import get_session
 from nonebot_plugin_larkuser.utils.level import get_level_by_experience
+from nonebot_plugin_larkuser.utils.avatar import get_user_avatar, get_user_avatar_sync
 from nonebot_plugin_larkuser.models import UserData
 from nonebot_plugin_larkuser.lang import lang
 
@@ -60,7 +62,9 @@ class MoonlarkUser(ABC):
         self.user_id = user_id
 
         self.register_time: Optional[datetime] = None
-        self.avatar: Optional[bytes] = None
+        # 头像在首次访问时才从缓存或磁盘加载，_avatar_loaded 为 False 表示尚未加载
+        self._avatar: Optional[bytes] = None
+        self._avatar_loaded = True
 
         self.nickname = ""
         self.vimcoin = 0.0
@@ -88,17 +92,36 @@ class MoonlarkUser(ABC):
     def has_nickname(self) -> bool:
         return bool(self.nickname)
 
-    def get_avatar(self) -> Optional[bytes]:
-        return self.avatar
+    @property
+    def avatar(self) -> Optional[bytes]:
+        return self.get_avatar()
+
+    @avatar.setter
+    def avatar(self, avatar: Optional[bytes]) -> None:
+        self._avatar = avatar
+        self._avatar_loaded = True
 
-    def get_base64_avatar(self) -> Optional[str]:
-        avatar = self.get_avatar()
+    async def load_avatar(self) -> Optional[bytes]:
+        """异步加载头像，批量渲染前可使用 prefetch_avatars 并发加载"""
+        if not self._avatar_loaded:
+            self.avatar = await get_user_avatar(self.user_id)
+        return self._avatar
+
+    def get_avatar(self) -> Optional[bytes]:
+        """同步获取头像，未预先加载时会在事件循环中同步读取磁盘，应优先使用 load_avatar"""
+        if not self._avatar_loaded:
+            logger.warning(f"用户 {self.user_id} 的头像未预先加载，将同步读取磁盘，请改用 load_avatar")
+            self.avatar = get_user_avatar_sync(self.user_id)
+        return self._avatar
+
+    async def get_base64_avatar(self) -> Optional[str]:
+        avatar = await self.load_avatar()
         if avatar is None:
             return None
         return base64.b64encode(avatar).decode()
 
-    def has_avatar(self) -> bool:
-        return self.get_avatar() is not None
+    async def has_avatar(self) -> bool:
+        return await self.load_avatar() is not None
 
     def get_fav(self) -> float:
         return self.fav
@@ -22,7 +22,7 @@ from nonebot_plugin_orm import get_session
 from nonebot_plugin_larkuser.exceptions import UserNotRegistered
 from nonebot_plugin_larkuser.models import UserData
 from nonebot_plugin_larkuser.user.base import MoonlarkUser, UnsetValue, _UNSET, _is_set
-from nonebot_plugin_larkuser.utils.avatar import get_user_avatar
+from nonebot_plugin_larkuser.utils.snapshot import UserSnapshot, get_user_snapshot, set_user_snapshot
 from nonebot_plugin_larkutils import get_main_account
 import json
 
@@ -60,8 +60,11 @@ class MoonlarkRegisteredUser(MoonlarkUser):
                 user.config = json.dumps(config)
             if _is_set(downed_at):
                 user.downed_at = downed_at
+            await session.flush()
+            snapshot = UserSnapshot.from_model(user)
             await session.commit()
-        await self.setup_user()
+        set_user_snapshot(snapshot)
+        await self.setup_from_snapshot(snapshot)
 
     async def setup_user_id(self) -> None:
         main_account = await get_main_account(self.user_id)
@@ -71,20 +74,21 @@ class MoonlarkRegisteredUser(MoonlarkUser):
 
     async def setup_user(self) -> None:
         await self.setup_user_id()
-        async with get_session() as session:
-            user = await session.get(UserData, self.user_id)
-            if user is None:
-                self.user_has_nickname = False
-                return
-            self.nickname = user.nickname
-            self.register_time = user.register_time
-            self.vimcoin = user.vimcoin
-            self.experience = user.experience
-            self.health = user.health
-            self.downed_at = user.downed_at
-            self.fav = user.favorability
-            self.avatar = await get_user_avatar(self.user_id)
-            self.config = json.loads(user.config)
+        await self.setup_from_snapshot(await get_user_snapshot(self.user_id))
+
+    async def setup_from_snapshot(self, snapshot: UserSnapshot) -> None:
+        if not snapshot.exists:
+            self.user_has_nickname = False
+            return
+        self.nickname = snapshot.nickname
+        self.register_time = snapshot.register_time
+        self.vimcoin = snapshot.vimcoin
+        self.experience = snapshot.experience
+        self.health = snapshot.health
+        self.downed_at = snapshot.downed_at
+        self.fav = snapshot.favorability
+        self._avatar_loaded = False
+        self.config = json.loads(snapshot.config)
         if not self.nickname:
             self.nickname = f"用户-{self.user_id}"
             self.user_has_nickname = False
@@ -15,19 +15,12 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 # ##############################################################################
 
-from nonebot_plugin_orm import get_session
-from sqlalchemy.exc import NoResultFound
 from nonebot_plugin_larkutils import get_main_account
 
-from nonebot_plugin_larkuser.models import UserData
+from nonebot_plugin_larkuser.utils.snapshot import get_user_snapshot
 
 
 async def is_user_registered(user_id: str, include_subaccount: bool = True):
-    async with get_session() as session:
-        try:
-            if include_subaccount:
-                user_id = await get_main_account(user_id)
-            data = await session.get_one(UserData, {"user_id": user_id})
-            return data.register_time is not None
-        except NoResultFound:
-            return False
+    if include_subaccount:
+        user_id = await get_main_account(user_id)
+    return (await get_user_snapshot(user_id)).is_registered()
@@ -1,13 +1,51 @@
 from nonebot_plugin_localstore import get_cache_dir
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional, TYPE_CHECKING
+import asyncio
 import aiofiles
 import zlib
 import base64
 
+from ..config import config
+
+if TYPE_CHECKING:
+    from ..user.base import MoonlarkUser
+
 cache_dir = get_cache_dir("nonebot_plugin_larkuser")
 
 
+class AvatarCache:
+    """解压后头像的内存 LRU，以总字节数为上限；通过文件 mtime 判断缓存是否过期"""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.used = 0
+        self.data: OrderedDict[str, tuple[Optional[int], Optional[bytes]]] = OrderedDict()
+
+    def get(self, user_id: str, mtime: Optional[int]) -> tuple[bool, Optional[bytes]]:
+        entry = self.data.get(user_id)
+        if entry is None or entry[0] != mtime:
+            return False, None
+        self.data.move_to_end(user_id)
+        return True, entry[1]
+
+    def set(self, user_id: str, mtime: Optional[int], avatar: Optional[bytes]) -> None:
+        self.pop(user_id)
+        self.data[user_id] = (mtime, avatar)
+        self.used += len(avatar or b"")
+        while self.used > self.max_bytes and self.data:
+            _, (_, evicted) = self.data.popitem(last=False)
+            self.used -= len(evicted or b"")
+
+    def pop(self, user_id: str) -> None:
+        if (entry := self.data.pop(user_id, None)) is not None:
+            self.used -= len(entry[1] or b"")
+
+
+avatar_cache = AvatarCache(config.user_avatar_cache_size * 1024 * 1024)
+
+
 def get_encoded_user_id(user_id: str) -> str:
     return base64.b64encode(user_id.encode()).decode()
 
@@ -16,18 +54,50 @@ def get_avatar_file(user_id: str) -> Path:
     return cache_dir.joinpath(f"avatar_{get_encoded_user_id(user_id)}")
 
 
+def get_avatar_mtime(avatar_file: Path) -> Optional[int]:
+    try:
+        return avatar_file.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
 async def get_user_avatar(user_id: str) -> Optional[bytes]:
     avatar_file = get_avatar_file(user_id)
-    if avatar_file.exists():
+    mtime = get_avatar_mtime(avatar_file)
+    hit, avatar = avatar_cache.get(user_id, mtime)
+    if hit:
+        return avatar
+    if mtime is not None:
         async with aiofiles.open(avatar_file, "rb") as f:
-            return zlib.decompress(await f.read())
+            avatar = zlib.decompress(await f.read())
+    avatar_cache.set(user_id, mtime, avatar)
+    return avatar
+
+
+def get_user_avatar_sync(user_id: str) -> Optional[bytes]:
+    """同步版本的 get_user_avatar，仅用于未预先加载头像时的同步访问"""
+    avatar_file = get_avatar_file(user_id)
+    mtime = get_avatar_mtime(avatar_file)
+    hit, avatar = avatar_cache.get(user_id, mtime)
+    if hit:
+        return avatar
+    if mtime is not None:
+        avatar = zlib.decompress(avatar_file.read_bytes())
+    avatar_cache.set(user_id, mtime, avatar)
+    return avatar
 
 
 async def update_user_avatar(user_id: str, avatar: bytes) -> None:
     avatar_file = get_avatar_file(user_id)
     async with aiofiles.open(avatar_file, "wb") as f:
         await f.write(zlib.compress(avatar))
+    avatar_cache.set(user_id, get_avatar_mtime(avatar_file), avatar)
 
 
 async def is_user_avatar_updated(user_id: str, avatar: bytes) -> bool:
     return avatar != await get_user_avatar(user_id)
+
+
+async def prefetch_avatars(users: Iterable["MoonlarkUser"]) -> None:
+    """并发加载一批用户的头像，供排行榜等批量渲染场景使用"""
+    await asyncio.gather(*[user.load_avatar() for user in users])
@@ -34,6 +34,7 @@ from ..exceptions import PromptTimeout
 from ..lang import lang
 from ..models import UserData
 from ..user.utils import is_user_registered
+from .snapshot import invalidate_user
 
 
 async def send_eula_screenshot(user_id: str) -> None:
@@ -85,4 +86,5 @@ async def register_user(session: AsyncSession | async_scoped_session, user_id: s
     )
     await session.merge(u)
     await session.commit()
+    invalidate_user(user_id)
     return d[0]
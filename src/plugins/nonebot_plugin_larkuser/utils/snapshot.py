@@ -0,0 +1,119 @@
+#  Moonlark - A new ChatBot
+#  Copyright (C) 2026  Moonlark Development Team
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ##############################################################################
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Iterable, Optional
+
+from nonebot_plugin_orm import get_session
+from sqlalchemy import select
+
+from nonebot_plugin_larkutils import LRUCache
+from nonebot_plugin_larkuser.config import config
+from nonebot_plugin_larkuser.models import UserData
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """UserData 的只读快照，exists 为 False 时表示数据库中没有该用户"""
+
+    user_id: str
+    exists: bool
+    nickname: str = ""
+    register_time: Optional[datetime] = None
+    experience: int = 0
+    vimcoin: float = 0.0
+    health: float = 100.0
+    downed_at: Optional[datetime] = None
+    favorability: float = 0.0
+    config: str = "{}"
+
+    @classmethod
+    def from_model(cls, user: UserData) -> "UserSnapshot":
+        return cls(
+            user_id=user.user_id,
+            exists=True,
+            nickname=user.nickname,
+            register_time=user.register_time,
+            experience=user.experience,
+            vimcoin=user.vimcoin,
+            health=user.health,
+            downed_at=user.downed_at,
+            favorability=user.favorability,
+            config=user.config,
+        )
+
+    def is_registered(self) -> bool:
+        return self.register_time is not None
+
+
+# 主账号 user_id -> 用户快照，写入 UserData 后需调用 invalidate_user 或 set_user_snapshot
+user_snapshots: LRUCache[str, UserSnapshot] = LRUCache(config.user_cache_size, config.user_cache_ttl)
+# 用户数据写入后的回调，参数为写入后的快照
+snapshot_listeners: list[Callable[[UserSnapshot], None]] = []
+
+
+async def get_user_snapshot(user_id: str) -> UserSnapshot:
+    """获取用户快照（user_id 需为主账号）"""
+    if (snapshot := user_snapshots.get(user_id)) is not None:
+        return snapshot
+    async with get_session() as session:
+        user = await session.get(UserData, user_id)
+        snapshot = UserSnapshot(user_id, False) if user is None else UserSnapshot.from_model(user)
+    user_snapshots.set(user_id, snapshot)
+    return snapshot
+
+
+async def get_user_snapshots(user_ids: Iterable[str]) -> dict[str, UserSnapshot]:
+    """批量获取用户快照，未缓存的用户通过一次 IN 查询获取"""
+    result: dict[str, UserSnapshot] = {}
+    missing: list[str] = []
+    for user_id in user_ids:
+        if (snapshot := user_snapshots.get(user_id)) is not None:
+            result[user_id] = snapshot
+        else:
+            missing.append(user_id)
+    if missing:
+        async with get_session() as session:
+            users = await session.scalars(select(UserData).where(UserData.user_id.in_(missing)))
+            found = {user.user_id: UserSnapshot.from_model(user) for user in users}
+        for user_id in missing:
+            user_snapshots.set(user_id, snapshot := found.get(user_id) or UserSnapshot(user_id, False))
+            result[user_id] = snapshot
+    return result
+
+
+def set_user_snapshot(snapshot: UserSnapshot) -> None:
+    """以刚写入数据库的数据更新快照"""
+    user_snapshots.set(snapshot.user_id, snapshot)
+    for listener in snapshot_listeners:
+        listener(snapshot)
+
+
+def on_user_snapshot_updated(func: Callable[[UserSnapshot], None]) -> Callable[[UserSnapshot], None]:
+    """注册用户数据写入后的回调（同步调用，回调中不应执行耗时操作）"""
+    snapshot_listeners.append(func)
+    return func
+
+
+def invalidate_user(*user_ids: str) -> None:
+    """使用户快照失效，直接修改 UserData 的代码需在提交后调用"""
+    user_snapshots.discard_many(user_ids)
+
+
+def invalidate_all_users() -> None:
+    user_snapshots.clear()
@@ -1,10 +1,12 @@
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Iterable
 from nonebot_plugin_orm import get_session
 from sqlalchemy import select
+from nonebot_plugin_larkutils import get_main_account
 from ..user import *
 from ..config import config
 from ..models import UserData
 from ..user.utils import is_user_registered
+from .snapshot import get_user_snapshots
 
 
 async def get_user(user_id: str) -> MoonlarkUser:
@@ -25,14 +27,34 @@ async def get_user(user_id: str) -> MoonlarkUser:
     return user
 
 
+async def get_users(user_ids: Iterable[str]) -> dict[str, MoonlarkUser]:
+    """
+    批量获取 Moonlark 用户，未缓存的用户数据通过一次查询获取
+    :param user_ids: 用户 ID 列表
+    :return: 用户 ID 到可操作 Moonlark 用户类的映射
+    """
+    main_accounts = {user_id: await get_main_account(user_id) for user_id in dict.fromkeys(user_ids)}
+    snapshots = await get_user_snapshots(dict.fromkeys(main_accounts.values()))
+    users: dict[str, MoonlarkUser] = {}
+    for user_id, main_account in main_accounts.items():
+        if not snapshots[main_account].is_registered():
+            users[user_id] = await get_user(user_id)
+            continue
+        user = MoonlarkRegisteredUser(user_id)
+        user.user_id = main_account
+        user.main_account = False
+        await user.setup_from_snapshot(snapshots[main_account])
+        users[user_id] = user
+    return users
+
+
 async def get_registered_user_ids() -> list[str]:
     async with get_session() as session:
         return list(await session.scalars(select(UserData.user_id).where(UserData.register_time != None)))
 
 
 async def get_registered_users() -> AsyncGenerator[MoonlarkRegisteredUser, None]:
-    for user_id in await get_registered_user_ids():
-        user = await get_user(user_id)
+    for user in (await get_users(await get_registered_user_ids())).values():
         if isinstance(user, MoonlarkRegisteredUser):
             yield user
 
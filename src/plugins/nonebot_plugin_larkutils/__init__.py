@@ -41,5 +41,11 @@ from .url_validator import block_internal_request, is_internal_url, resolve_inte
 from .user_id import parse_special_user_id
 from .file import open_file, FileManager, FileType
 from .jrrp import get_luck_value
+from .cache import LRUCache
+from .buffer import WriteBehindBuffer
+from .telemetry import TelemetryQueue, telemetry
+from .hamming import HammingIndex, get_max_distance, parse_hex_hash
+from .aho_corasick import AhoCorasick
+from .caller import get_caller_frame, get_caller_plugin_name, get_frame_plugin_name
 from .gift_session import get_or_create_session, trigger_gift_event
 from . import mention_cache
@@ -0,0 +1,100 @@
+#  Moonlark - A new ChatBot
+#  Copyright (C) 2026  Moonlark Development Team
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ##############################################################################
+
+from collections import deque
+from typing import Iterable
+
+
+class AhoCorasick:
+    """Aho-Corasick 多模式串匹配自动机
+
+    对所有模式串建立字典树并补全失配指针，单次扫描文本即可找出其中出现的全部模式串，
+    耗时只与文本长度和命中数量有关，与模式串数量无关。
+    模式串变化后自动机在下一次匹配时重新构建。
+    """
+
+    def __init__(self, patterns: Iterable[str] = ()) -> None:
+        self.patterns: set[str] = set()
+        self.goto: list[dict[str, int]] = [{}]
+        self.fail: list[int] = [0]
+        # 每个状态可命中的模式串（包括沿失配指针可达的状态）
+        self.output: list[tuple[str, ...]] = [()]
+        self.dirty = False
+        for pattern in patterns:
+            self.add(pattern)
+
+    def add(self, pattern: str) -> None:
+        if pattern and pattern not in self.patterns:
+            self.patterns.add(pattern)
+            self.dirty = True
+
+    def discard(self, pattern: str) -> None:
+        if pattern in self.patterns:
+            self.patterns.remove(pattern)
+            self.dirty = True
+
+    def build(self) -> None:
+        goto: list[dict[str, int]] = [{}]
+        own_output: list[list[str]] = [[]]
+        for pattern in self.patterns:
+            state = 0
+            for char in pattern:
+                if (next_state := goto[state].get(char)) is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    own_output.append([])
+                state = next_state
+            own_output[state].append(pattern)
+        fail = [0] * len(goto)
+        output: list[tuple[str, ...]] = [()] * len(goto)
+        # 第一层状态的失配指针指向根节点，从第二层开始按广度优先顺序计算
+        queue = deque(goto[0].values())
+        for state in queue:
+            output[state] = tuple(own_output[state])
+        while queue:
+            state = queue.popleft()
+            for char, next_state in goto[state].items():
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = goto[fallback].get(char, 0)
+                output[next_state] = tuple(own_output[next_state]) + output[fail[next_state]]
+                queue.append(next_state)
+        self.goto, self.fail, self.output = goto, fail, output
+        self.dirty = False
+
+    def find_all(self, text: str) -> set[str]:
+        """返回 text 中出现过的全部模式串"""
+        if self.dirty:
+            self.build()
+        goto, fail, output = self.goto, self.fail, self.output
+        found: set[str] = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found.update(output[state])
+        return found
+
+    def __contains__(self, pattern: str) -> bool:
+        return pattern in self.patterns
+
+    def __len__(self) -> int:
+        return len(self.patterns)
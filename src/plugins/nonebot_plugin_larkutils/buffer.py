@@ -0,0 +1,79 @@
+#  Moonlark - A new ChatBot
+#  Copyright (C) 2026  Moonlark Development Team
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ##############################################################################
+
+import asyncio
+from typing import Awaitable, Callable, Generic, Optional, TypeVar
+
+from nonebot.log import logger
+
+T = TypeVar("T")
+
+
+class WriteBehindBuffer(Generic[T]):
+    """延迟批量写入缓冲区
+
+    append 只将数据放入内存缓冲区，首条数据写入后经过 interval 秒（或缓冲区达到 max_size 条时立即）
+    由后台任务调用 writer 一次性写入缓冲区中的全部数据。
+    writer 抛出异常时该批数据会被丢弃并记录日志；使用方应在关闭时调用 flush 写入剩余数据。
+    """
+
+    def __init__(
+        self,
+        writer: Callable[[list[T]], Awaitable[None]],
+        interval: float = 0.3,
+        max_size: int = 500,
+        name: str = "",
+    ) -> None:
+        self.writer = writer
+        self.interval = interval
+        self.max_size = max_size
+        self.name = name or getattr(writer, "__qualname__", "buffer")
+        self.items: list[T] = []
+        self.lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task[None]] = None
+        self._full = asyncio.Event()
+
+    def append(self, item: T) -> None:
+        self.items.append(item)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_later())
+        elif len(self.items) >= self.max_size:
+            self._full.set()
+
+    async def _flush_later(self) -> None:
+        try:
+            await asyncio.wait_for(self._full.wait(), self.interval)
+        except asyncio.TimeoutError:
+            pass
+        self._full.clear()
+        await self.flush()
+        # 写入期间追加的数据由新的任务处理
+        if self.items:
+            self._task = asyncio.create_task(self._flush_later())
+
+    async def flush(self) -> None:
+        async with self.lock:
+            items, self.items = self.items, []
+            if not items:
+                return
+            try:
+                await self.writer(items)
+            except Exception:
+                logger.exception(f"Failed to flush {len(items)} items of {self.name}")
+
+    def __len__(self) -> int:
+        return len(self.items)
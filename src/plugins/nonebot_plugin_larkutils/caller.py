@@ -0,0 +1,51 @@
+#  Moonlark - A new ChatBot
+#  Copyright (C) 2026  Moonlark Development Team
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ##############################################################################
+
+import sys
+from types import CodeType, FrameType
+from typing import Optional
+
+from nonebot import get_plugin_by_module_name
+
+# 代码对象 -> 所属插件名，代码对象在进程内不会改变所属模块，因此可以永久缓存
+_plugin_name_cache: dict[CodeType, Optional[str]] = {}
+
+
+def get_frame_plugin_name(frame: FrameType) -> Optional[str]:
+    """获取栈帧所在代码所属的插件名（如 `nonebot_plugin_larkcave`）"""
+    code = frame.f_code
+    try:
+        return _plugin_name_cache[code]
+    except KeyError:
+        pass
+    module_name = frame.f_globals.get("__name__")
+    plugin = get_plugin_by_module_name(module_name) if module_name else None
+    plugin_name = _plugin_name_cache[code] = plugin.name if plugin is not None else None
+    return plugin_name
+
+
+def get_caller_frame(depth: int = 1) -> FrameType:
+    """获取调用方栈帧，depth 为 1 时表示调用本函数的函数的调用方
+
+    与 `inspect.stack()` 不同，此函数不会构造完整的栈帧列表，也不会读取源码。
+    """
+    return sys._getframe(depth + 1)  # noqa: SLF001
+
+
+def get_caller_plugin_name(depth: int = 1) -> Optional[str]:
+    """获取调用方所属的插件名，depth 含义同 `get_caller_frame`"""
+    return get_frame_plugin_name(sys._getframe(depth + 1))  # noqa: SLF001
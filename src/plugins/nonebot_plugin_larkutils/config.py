@@ -8,6 +8,13 @@ class Config(BaseModel):
     baidu_api_key: str
     baidu_secret_key: str
     superusers: set[str]
+    # 主账号映射缓存容量，为 0 时在启动时载入全部映射（适用于绝大多数部署）
+    subaccount_cache_size: int = 0
+    # 定期与数据库核对主账号映射缓存的间隔（秒），为 0 时不核对
+    subaccount_reconcile_interval: int = 0
+    # 遥测数据（指令使用统计等）批量写入的间隔（秒）与单批最大条数
+    telemetry_flush_interval: float = 1
+    telemetry_flush_size: int = 500
 
 
 config = get_plugin_config(Config)
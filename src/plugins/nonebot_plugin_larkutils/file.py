@@ -14,12 +14,10 @@
 #  You should have received a copy of the GNU Affero General Public License
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 # ##############################################################################
-import inspect
-from types import ModuleType
 from typing import Generic, TypeVar, Optional, Callable
 
-from nonebot import get_plugin_by_module_name
 from nonebot_plugin_localstore import get_config_file, get_cache_file, get_data_file
+from .caller import get_caller_plugin_name
 from enum import Enum
 from pathlib import Path
 import json
@@ -87,22 +85,13 @@ class FileManager(Generic[T]):
             raise
 
 
-def get_module_name(module: ModuleType | None) -> str | None:
-    if module is None:
-        return None
-    if (plugin := get_plugin_by_module_name(module.__name__)) is None:
-        return None
-    return plugin.name
-
-
 T2 = TypeVar("T2")
 
 
 def open_file(
     file_name: str, file_type: FileType, default: T2 = {}, plugin_name: Optional[str] = None
 ) -> FileManager[T2]:
-    module = inspect.getmodule(inspect.stack()[1][0])
-    plugin_name = plugin_name or get_module_name(module) or ""
+    plugin_name = plugin_name or get_caller_plugin_name() or ""
     if not plugin_name:
         raise ValueError("plugin_name cannot be empty")
     file_func = get_file_function(file_type)
@@ -0,0 +1,148 @@
+#  Moonlark - A new ChatBot
+#  Copyright (C) 2026  Moonlark Development Team
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ##############################################################################
+
+from itertools import combinations
+from typing import Generic, Hashable, Iterable, Iterator, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+
+
+def parse_hex_hash(hex_hash: Optional[str], bits: int) -> Optional[int]:
+    """将十六进制的感知哈希转换为整数，长度与 bits 不符或无法解析时返回 None"""
+    if not hex_hash or len(hex_hash) * 4 != bits:
+        return None
+    try:
+        return int(hex_hash, 16)
+    except ValueError:
+        return None
+
+
+def get_max_distance(similarity: float, bits: int) -> int:
+    """将相似度阈值（1 - 汉明距离 / 位数）转换为允许的最大汉明距离"""
+    return int((1 - similarity) * bits + 1e-9)
+
+
+class HammingIndex(Generic[K]):
+    """感知哈希的汉明距离索引（多索引哈希，Multi-Index Hashing）
+
+    将 bits 位的哈希切分为 chunks 段分别建立倒排表。根据抽屉原理，
+    汉明距离不超过 d 的两个哈希至少有一段的距离不超过 d // chunks，
+    因此查询时只需在各段中枚举这一半径内的取值，再对候选项计算完整距离。
+    在 d < chunks 时每段只需一次精确查找，查询代价与索引规模基本无关。
+    """
+
+    # 单段枚举的半径超过该值时，枚举量会超过线性扫描，直接退化为线性扫描
+    MAX_CHUNK_RADIUS = 2
+
+    def __init__(self, bits: int = 256, chunks: int = 8) -> None:
+        if bits % chunks:
+            raise ValueError(f"哈希位数 {bits} 无法均分为 {chunks} 段")
+        self.bits = bits
+        self.chunks = chunks
+        self.chunk_bits = bits // chunks
+        self.chunk_mask = (1 << self.chunk_bits) - 1
+        self.values: dict[K, int] = {}
+        # 各段取值 -> 哈希在该段取此值的 key；绝大多数取值只对应一个 key，此时直接保存 key 以节省内存
+        self.tables: list[dict[int, K | set[K]]] = [{} for _ in range(chunks)]
+
+    def _split(self, value: int) -> Iterator[int]:
+        for i in range(self.chunks):
+            yield (value >> (i * self.chunk_bits)) & self.chunk_mask
+
+    def add(self, key: K, value: int) -> None:
+        if key in self.values:
+            self.remove(key)
+        self.values[key] = value
+        for table, chunk in zip(self.tables, self._split(value)):
+            if (keys := table.get(chunk)) is None:
+                table[chunk] = key
+            elif isinstance(keys, set):
+                keys.add(key)
+            else:
+                table[chunk] = {keys, key}
+
+    def add_hex(self, key: K, hex_hash: Optional[str]) -> bool:
+        """添加十六进制哈希，哈希无效时不添加并返回 False"""
+        if (value := parse_hex_hash(hex_hash, self.bits)) is None:
+            self.remove(key)
+            return False
+        self.add(key, value)
+        return True
+
+    def remove(self, key: K) -> None:
+        if (value := self.values.pop(key, None)) is None:
+            return
+        for table, chunk in zip(self.tables, self._split(value)):
+            keys = table[chunk]
+            if not isinstance(keys, set):
+                del table[chunk]
+                continue
+            keys.discard(key)
+            if len(keys) == 1:
+                table[chunk] = keys.pop()
+
+    def remove_many(self, keys: Iterable[K]) -> None:
+        for key in keys:
+            self.remove(key)
+
+    def clear(self) -> None:
+        self.values.clear()
+        for table in self.tables:
+            table.clear()
+
+    def _get_neighbors(self, chunk: int, radius: int) -> Iterator[int]:
+        for r in range(radius + 1):
+            for positions in combinations(range(self.chunk_bits), r):
+                mask = 0
+                for position in positions:
+                    mask |= 1 << position
+                yield chunk ^ mask
+
+    def _get_candidates(self, value: int, max_distance: int) -> Iterable[K]:
+        radius = max_distance // self.chunks
+        if radius > self.MAX_CHUNK_RADIUS:
+            return self.values.keys()
+        candidates: set[K] = set()
+        for table, chunk in zip(self.tables, self._split(value)):
+            for neighbor in self._get_neighbors(chunk, radius):
+                if (keys := table.get(neighbor)) is None:
+                    continue
+                if isinstance(keys, set):
+                    candidates.update(keys)
+                else:
+                    candidates.add(keys)
+        return candidates
+
+    def search(self, value: int, max_distance: int) -> list[tuple[K, int]]:
+        """查找汉明距离不超过 max_distance 的所有项，按距离升序返回 (key, 距离)"""
+        result = []
+        for key in self._get_candidates(value, max_distance):
+            if (distance := (self.values[key] ^ value).bit_count()) <= max_distance:
+                result.append((key, distance))
+        result.sort(key=lambda item: item[1])
+        return result
+
+    def nearest(self, value: int, max_distance: int) -> Optional[tuple[K, int]]:
+        """查找汉明距离不超过 max_distance 的最近项"""
+        result = self.search(value, max_distance)
+        return result[0] if result else None
+
+    def __contains__(self, key: K) -> bool:
+        return key in self.values
+
+    def __len__(self) -> int:
+        return len(self.values)
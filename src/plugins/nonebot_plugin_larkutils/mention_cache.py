@@ -43,6 +43,7 @@ async def _(
     event: GroupMessageCreateEvent,
 ) -> None:
     from nonebot_plugin_larkuser.models import UserData
+    from nonebot_plugin_larkuser.utils.snapshot import invalidate_user
 
     # 防御性检查：确保是群聊事件
     if not isinstance(event, GroupMessageCreateEvent):
@@ -78,6 +79,7 @@ async def _update_nickname_from_mention(
 ) -> None:
     """根据 mention 中的 username 更新被提及用户的昵称"""
     from nonebot_plugin_larkuser.models import UserData
+    from nonebot_plugin_larkuser.utils.snapshot import invalidate_user
 
     # 解析主账号（处理子账号映射）
     main_user_id = await get_main_account(mentioned_user_id)
@@ -116,3 +118,4 @@ async def _update_nickname_from_mention(
     config[NICK_SOURCE_KEY] = NICK_SOURCE_MENTION
     user_data.config = json.dumps(config)
     await session.commit()
+    invalidate_user(main_user_id)
@@ -18,7 +18,9 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
 from logging import getLogger
+from typing import Optional
 
 import aiofiles
 from nonebot import get_driver
@@ -27,6 +29,8 @@ from nonebot_plugin_orm import get_session
 
 from sqlalchemy import select, delete
 
+from .cache import LRUCache
+from .config import config
 from .models import MainAccountMapping
 
 logger = getLogger(__name__)
@@ -38,31 +42,109 @@ _migration_done = False
 data_file = get_data_dir("nonebot_plugin_larkutils")
 
 
+class MainAccountCache:
+    """主账号映射的进程内缓存
+
+    maxsize 为 0 时载入全部映射并维护「主账号 -> 子账号」反向索引，查询均不访问数据库；
+    否则仅以 LRU 缓存正向查询结果（包括「没有映射」的结果），反向查询仍访问数据库。
+    """
+
+    def __init__(self, maxsize: int = 0) -> None:
+        self.complete = maxsize <= 0
+        self.main_accounts: dict[str, str] = {}
+        self.sub_accounts: dict[str, set[str]] = {}
+        self.lru: LRUCache[str, str] = LRUCache(max(maxsize, 1))
+        self.loaded = False
+        self.lock = asyncio.Lock()
+
+    def get(self, user_id: str) -> Optional[str]:
+        if self.complete:
+            return self.main_accounts.get(user_id, user_id)
+        return self.lru.get(user_id)
+
+    def set(self, user_id: str, main_account: str) -> None:
+        if not self.complete:
+            self.lru.set(user_id, main_account)
+            return
+        self.remove(user_id)
+        self.main_accounts[user_id] = main_account
+        self.sub_accounts.setdefault(main_account, set()).add(user_id)
+
+    def remove(self, user_id: str) -> None:
+        if not self.complete:
+            self.lru.set(user_id, user_id)
+            return
+        main_account = self.main_accounts.pop(user_id, None)
+        if main_account is None:
+            return
+        sub_accounts = self.sub_accounts[main_account]
+        sub_accounts.discard(user_id)
+        if not sub_accounts:
+            del self.sub_accounts[main_account]
+
+    def get_sub_accounts(self, main_account: str) -> Optional[list[str]]:
+        if not self.complete:
+            return None
+        return list(self.sub_accounts.get(main_account, ()))
+
+    def replace(self, mappings: dict[str, str]) -> None:
+        sub_accounts: dict[str, set[str]] = {}
+        for user_id, main_account in mappings.items():
+            sub_accounts.setdefault(main_account, set()).add(user_id)
+        self.main_accounts = mappings
+        self.sub_accounts = sub_accounts
+
+    async def load(self) -> None:
+        """从数据库（重新）载入缓存，LRU 模式下仅清空缓存"""
+        if not self.complete:
+            self.lru.clear()
+            self.loaded = True
+            return
+        async with get_session() as session:
+            result = await session.execute(select(MainAccountMapping.user_id, MainAccountMapping.main_account))
+            mappings = {user_id: main_account for user_id, main_account in result.tuples()}
+        if self.loaded and mappings != self.main_accounts:
+            logger.warning("主账号映射缓存与数据库不一致，已重新载入")
+        self.replace(mappings)
+        self.loaded = True
+
+
+main_account_cache = MainAccountCache(config.subaccount_cache_size)
+
+
 async def set_main_account(user_id: str, main_account: str) -> None:
     """设置子账号对应的主账号映射"""
-    async with get_session() as session:
-        mapping = await session.get(MainAccountMapping, {"user_id": user_id})
-        if mapping is None:
-            mapping = MainAccountMapping(user_id=user_id, main_account=main_account)
-            session.add(mapping)
-        else:
-            mapping.main_account = main_account
-        await session.commit()
+    await _ensure_loaded()
+    # 持有缓存锁，避免与定期核对交错导致写入的映射被旧数据覆盖
+    async with main_account_cache.lock:
+        async with get_session() as session:
+            mapping = await session.get(MainAccountMapping, {"user_id": user_id})
+            if mapping is None:
+                mapping = MainAccountMapping(user_id=user_id, main_account=main_account)
+                session.add(mapping)
+            else:
+                mapping.main_account = main_account
+            await session.commit()
+        main_account_cache.set(user_id, main_account)
 
 
 async def get_main_account(user_id: str) -> str:
     """获取子账号对应的主账号 user_id，如果不存在则返回自身"""
-    await _ensure_migrated()
+    await _ensure_loaded()
+    if (main_account := main_account_cache.get(user_id)) is not None:
+        return main_account
     async with get_session() as session:
         mapping = await session.get(MainAccountMapping, {"user_id": user_id})
-        if mapping is not None:
-            return mapping.main_account
-    return user_id
+        main_account = user_id if mapping is None else mapping.main_account
+    main_account_cache.set(user_id, main_account)
+    return main_account
 
 
 async def get_sub_accounts(main_account: str) -> list[str]:
     """获取指定主账号的所有子账号 user_id 列表"""
-    await _ensure_migrated()
+    await _ensure_loaded()
+    if (sub_accounts := main_account_cache.get_sub_accounts(main_account)) is not None:
+        return sub_accounts
     async with get_session() as session:
         stmt = select(MainAccountMapping.user_id).where(MainAccountMapping.main_account == main_account)
         return list(await session.scalars(stmt))
@@ -70,24 +152,30 @@ async def get_sub_accounts(main_account: str) -> list[str]:
 
 async def remove_main_account(user_id: str) -> None:
     """移除指定子账号的主账号绑定（解绑子账号）"""
-    async with get_session() as session:
-        mapping = await session.get(MainAccountMapping, {"user_id": user_id})
-        if mapping is not None:
-            await session.delete(mapping)
-            await session.commit()
+    await _ensure_loaded()
+    async with main_account_cache.lock:
+        async with get_session() as session:
+            mapping = await session.get(MainAccountMapping, {"user_id": user_id})
+            if mapping is not None:
+                await session.delete(mapping)
+                await session.commit()
+        main_account_cache.remove(user_id)
 
 
 async def remove_all_sub_accounts(main_account: str) -> list[str]:
     """移除指定主账号的所有子账号绑定，返回被移除的子账号 ID 列表"""
-    await _ensure_migrated()
-    async with get_session() as session:
-        stmt = select(MainAccountMapping.user_id).where(MainAccountMapping.main_account == main_account)
-        sub_ids = list(await session.scalars(stmt))
-        if sub_ids:
-            delete_stmt = delete(MainAccountMapping).where(MainAccountMapping.main_account == main_account)
-            await session.execute(delete_stmt)
-            await session.commit()
-    return sub_ids
+    await _ensure_loaded()
+    async with main_account_cache.lock:
+        async with get_session() as session:
+            stmt = select(MainAccountMapping.user_id).where(MainAccountMapping.main_account == main_account)
+            sub_ids = list(await session.scalars(stmt))
+            if sub_ids:
+                delete_stmt = delete(MainAccountMapping).where(MainAccountMapping.main_account == main_account)
+                await session.execute(delete_stmt)
+                await session.commit()
+        for sub_id in sub_ids:
+            main_account_cache.remove(sub_id)
+        return sub_ids
 
 
 async def _migrate_from_files() -> None:
@@ -132,7 +220,43 @@ async def _ensure_migrated() -> None:
         await _migrate_from_files()
 
 
+async def _ensure_loaded() -> None:
+    """确保迁移已完成且主账号映射缓存已载入"""
+    if main_account_cache.loaded:
+        return
+    await _ensure_migrated()
+    async with main_account_cache.lock:
+        if not main_account_cache.loaded:
+            await main_account_cache.load()
+
+
+async def _reconcile_main_account_cache() -> None:
+    """定期与数据库核对缓存，用于多进程部署或数据库被外部修改的情况"""
+    while True:
+        await asyncio.sleep(config.subaccount_reconcile_interval)
+        try:
+            async with main_account_cache.lock:
+                await main_account_cache.load()
+        except Exception as exc:
+            logger.warning("核对主账号映射缓存失败: %s", exc)
+
+
+_reconcile_task: Optional[asyncio.Task] = None
+
+
 @get_driver().on_startup
 async def _() -> None:
-    """在启动时自动迁移旧的文件数据到数据库"""
+    """在启动时自动迁移旧的文件数据到数据库，并载入主账号映射缓存"""
+    global _reconcile_task
     await _migrate_from_files()
+    await _ensure_loaded()
+    if config.subaccount_reconcile_interval > 0:
+        _reconcile_task = asyncio.create_task(_reconcile_main_account_cache())
+
+
+@get_driver().on_shutdown
+async def _() -> None:
+    if _reconcile_task is not None:
+        _reconcile_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await _reconcile_task
@@ -0,0 +1,155 @@
+#  Moonlark - A new ChatBot
+#  Copyright (C) 2026  Moonlark Development Team
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ##############################################################################
+
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from typing_extensions import TypedDict
+
+from nonebot import get_driver
+from nonebot.log import logger
+from nonebot_plugin_orm import Model, get_session
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .buffer import WriteBehindBuffer
+from .config import config
+
+
+@dataclass(frozen=True)
+class CounterKey:
+    model: type[Model]
+    # 定位计数行的主键列与值
+    key: tuple[tuple[str, Any], ...]
+    column: str
+
+
+@dataclass
+class TelemetryItem:
+    model: type[Model]
+    # 事件行的列值，计数器自增时为 None
+    row: Optional[dict[str, Any]] = None
+    counter: Optional[CounterKey] = None
+    amount: int = 0
+
+
+class TelemetryMetrics(TypedDict):
+    pending: int
+    max_pending: int
+    flushes: int
+    written_events: int
+    written_increments: int
+    failed_writes: int
+    last_flush_ms: float
+
+
+class TelemetryQueue:
+    """遥测数据写入队列
+
+    事件处理钩子通过 add_event / increment 将数据放入内存队列后立即返回，不等待数据库。
+    后台定期写入：事件行按表批量插入，同一计数器的多次自增合并为一条 UPDATE ... SET column = column + n。
+    """
+
+    def __init__(self, interval: float, max_size: int) -> None:
+        self.buffer: WriteBehindBuffer[TelemetryItem] = WriteBehindBuffer(self.write, interval, max_size, "telemetry")
+        self.metrics: TelemetryMetrics = {
+            "pending": 0,
+            "max_pending": 0,
+            "flushes": 0,
+            "written_events": 0,
+            "written_increments": 0,
+            "failed_writes": 0,
+            "last_flush_ms": 0,
+        }
+
+    def _append(self, item: TelemetryItem) -> None:
+        self.buffer.append(item)
+        self.metrics["max_pending"] = max(self.metrics["max_pending"], len(self.buffer))
+
+    def add_event(self, model: type[Model], row: dict[str, Any]) -> None:
+        """添加一条事件记录，未给出的列使用数据库默认值"""
+        self._append(TelemetryItem(model, row=row))
+
+    def increment(self, model: type[Model], key: dict[str, Any], column: str, amount: int = 1) -> None:
+        """将 key 所定位的计数行的 column 列增加 amount，行不存在时以 amount 为初始值创建"""
+        self._append(TelemetryItem(model, counter=CounterKey(model, tuple(key.items()), column), amount=amount))
+
+    @staticmethod
+    async def write_model(
+        session: AsyncSession, model: type[Model], rows: list[dict[str, Any]], increments: dict[CounterKey, int]
+    ) -> None:
+        for counter, amount in increments.items():
+            column = getattr(model, counter.column)
+            result = await session.execute(
+                update(model)
+                .where(*[getattr(model, name) == value for name, value in counter.key])
+                .values({column: column + amount})
+            )
+            if result.rowcount == 0:
+                # 写入由缓冲区串行执行，插入新计数行时不会与其他写入冲突
+                session.add(model(**dict(counter.key), **{counter.column: amount}))
+        # 列不同的事件行分开插入，使缺省的列使用数据库默认值
+        groups: defaultdict[tuple[str, ...], list[dict[str, Any]]] = defaultdict(list)
+        for row in rows:
+            groups[tuple(row)].append(row)
+        for group in groups.values():
+            await session.execute(insert(model), group)
+
+    async def write(self, items: list[TelemetryItem]) -> None:
+        begin = time.perf_counter()
+        events: defaultdict[type[Model], list[dict[str, Any]]] = defaultdict(list)
+        increments: defaultdict[type[Model], dict[CounterKey, int]] = defaultdict(dict)
+        for item in items:
+            if item.counter is not None:
+                increments[item.model][item.counter] = increments[item.model].get(item.counter, 0) + item.amount
+            elif item.row is not None:
+                events[item.model].append(item.row)
+        try:
+            async with get_session() as session:
+                for model in {*events, *increments}:
+                    # 每张表在单独的保存点中写入，一张表写入失败不影响其他数据
+                    try:
+                        async with session.begin_nested():
+                            await self.write_model(session, model, events[model], increments[model])
+                    except Exception:
+                        logger.exception(f"Failed to write telemetry of {model.__name__}")
+                        self.metrics["failed_writes"] += 1
+                        continue
+                    self.metrics["written_events"] += len(events[model])
+                    self.metrics["written_increments"] += sum(increments[model].values())
+                await session.commit()
+        except Exception:
+            self.metrics["failed_writes"] += 1
+            raise
+        self.metrics["flushes"] += 1
+        self.metrics["last_flush_ms"] = (time.perf_counter() - begin) * 1000
+
+    def get_metrics(self) -> TelemetryMetrics:
+        return {**self.metrics, "pending": len(self.buffer)}
+
+    async def flush(self) -> None:
+        await self.buffer.flush()
+
+
+telemetry = TelemetryQueue(config.telemetry_flush_interval, config.telemetry_flush_size)
+
+
+@get_driver().on_shutdown
+async def _() -> None:
+    await telemetry.flush()
@@ -1,6 +1,8 @@
 from nonebot import require
 from nonebot.plugin import PluginMetadata
 
+from .config import Config
+
 __plugin_meta__ = PluginMetadata(
     name="nonebot_plugin_last_seen",
     description="记录并检测群员最后上线时间和最后在当前会话上线的时间",
@@ -8,6 +10,7 @@ __plugin_meta__ = PluginMetadata(
     type="application",
     homepage="https://github.com/Moonlark-Dev/Moonlark",
     supported_adapters=None,
+    config=Config,
 )
 
 # Required dependencies
@@ -6,9 +6,7 @@ from nonebot_plugin_alconna import Alconna, Args, on_alconna, Match, At
 from nonebot_plugin_larkuser.utils.nickname import get_nickname
 from nonebot_plugin_larkutils import get_user_id, get_group_id, is_private_message
 from nonebot_plugin_larklang import LangHelper
-from nonebot_plugin_orm import get_session
-from sqlalchemy import select
-from .models import LastSeenRecord
+from .tracker import get_last_seen, update_last_seen
 
 # Initialize language helper
 lang = LangHelper()
@@ -17,52 +15,6 @@ lang = LangHelper()
 GLOBAL_SESSION_ID = "global"
 
 
-async def update_last_seen(user_id: str, session_id: str) -> None:
-    """更新用户的最后上线时间"""
-    async with get_session() as session:
-        # 查询是否已存在记录
-        result = await session.execute(
-            select(LastSeenRecord).where(LastSeenRecord.user_id == user_id, LastSeenRecord.session_id == session_id)
-        )
-        record = result.scalar_one_or_none()
-
-        current_time = datetime.now()
-
-        if record:
-            # 更新现有记录，仅当时间差大于 5 分钟时才更新上次上线时间
-            if (current_time - record.last_seen).total_seconds() >= 300:
-                record.previous_last_seen = record.last_seen
-            record.last_seen = current_time
-        else:
-            # 创建新记录
-            record = LastSeenRecord(user_id=user_id, session_id=session_id, last_seen=current_time)
-            session.add(record)
-
-        await session.commit()
-
-
-async def get_last_seen(user_id: str, session_id: str) -> Optional[datetime]:
-    """获取用户的最后上线时间
-
-    如果用户当前在线（5分钟内有消息），返回上一次下线时间。
-    否则返回最后上线时间。
-    """
-    async with get_session() as session:
-        result = await session.execute(
-            select(LastSeenRecord).where(LastSeenRecord.user_id == user_id, LastSeenRecord.session_id == session_id)
-        )
-        record = result.scalar_one_or_none()
-        if not record:
-            return None
-
-        # 如果5分钟内有消息且有上一次记录，返回上一次下线时间
-        now = datetime.now()
-        if (now - record.last_seen).total_seconds() < 300 and record.previous_last_seen:
-            return record.previous_last_seen
-
-        return record.last_seen
-
-
 # Message handler to track last seen time
 @on_message(block=False, priority=99).handle()
 async def handle_message(
@@ -72,7 +24,7 @@ async def handle_message(
     group_id: str = get_group_id(),
     is_private: bool = is_private_message(),
 ) -> None:
-    """监听所有消息，更新用户的最后上线时间"""
+    """监听所有消息，更新内存中用户的最后上线时间"""
     # 更新全局最后上线时间
     await update_last_seen(user_id, GLOBAL_SESSION_ID)
 
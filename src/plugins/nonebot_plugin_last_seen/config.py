@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+from nonebot import get_plugin_config
+
+
+class Config(BaseModel):
+    # 最后上线时间延迟批量写入数据库的间隔（秒）
+    last_seen_flush_interval: float = 10
+
+
+config = get_plugin_config(Config)
@@ -0,0 +1,123 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from nonebot import get_driver
+from nonebot_plugin_larkutils import WriteBehindBuffer
+from nonebot_plugin_orm import get_session
+from sqlalchemy import select
+
+from .config import config
+from .models import LastSeenRecord
+
+# 两条消息间隔不小于该秒数时，将上一次的时间记为上次上线时间
+ONLINE_THRESHOLD = 300
+
+
+@dataclass
+class LastSeen:
+    last_seen: datetime
+    previous_last_seen: Optional[datetime] = None
+
+
+# (用户 ID, 会话 ID) -> 最后上线时间，仅包含启动后出现过的用户
+last_seen_cache: dict[tuple[str, str], LastSeen] = {}
+
+
+async def write_last_seen(keys: list[tuple[str, str]]) -> None:
+    # 在第一次 await 前取出各记录，写入期间即使被 prune_last_seen 移出内存也不受影响
+    entries = {key: last_seen_cache[key] for key in keys}
+    try:
+        async with get_session() as session:
+            # 一次查询载入已有记录并直接修改，其余记录作为新记录插入
+            user_ids = {user_id for user_id, _ in entries}
+            existing = {
+                (record.user_id, record.session_id): record
+                for record in await session.scalars(select(LastSeenRecord).where(LastSeenRecord.user_id.in_(user_ids)))
+            }
+            for (user_id, session_id), entry in entries.items():
+                if (record := existing.get((user_id, session_id))) is None:
+                    session.add(
+                        LastSeenRecord(
+                            user_id=user_id,
+                            session_id=session_id,
+                            last_seen=entry.last_seen,
+                            previous_last_seen=entry.previous_last_seen,
+                        )
+                    )
+                else:
+                    record.last_seen = entry.last_seen
+                    record.previous_last_seen = entry.previous_last_seen
+            await session.commit()
+    except Exception:
+        # 写入失败的记录重新放入缓冲区等待下次写入，在此之前不会被 prune_last_seen 移出内存
+        for key in entries:
+            last_seen_buffer.append(key)
+        raise
+    prune_last_seen()
+
+
+last_seen_buffer: WriteBehindBuffer[tuple[str, str]] = WriteBehindBuffer(
+    write_last_seen, config.last_seen_flush_interval, 1000, "LastSeenRecord"
+)
+
+
+async def load_last_seen(user_id: str, session_id: str) -> Optional[LastSeen]:
+    """获取内存中的最后上线时间，不存在时从数据库载入"""
+    if (entry := last_seen_cache.get((user_id, session_id))) is not None:
+        return entry
+    async with get_session() as session:
+        record = await session.get(LastSeenRecord, (user_id, session_id))
+    if record is None:
+        return None
+    # 载入期间可能已有新消息写入内存
+    return last_seen_cache.setdefault((user_id, session_id), LastSeen(record.last_seen, record.previous_last_seen))
+
+
+async def update_last_seen(user_id: str, session_id: str) -> None:
+    """更新用户的最后上线时间"""
+    current_time = datetime.now()
+    entry = await load_last_seen(user_id, session_id)
+    if entry is None:
+        last_seen_cache[user_id, session_id] = LastSeen(current_time)
+    else:
+        # 仅当时间差大于 5 分钟时才更新上次上线时间
+        if (current_time - entry.last_seen).total_seconds() >= ONLINE_THRESHOLD:
+            entry.previous_last_seen = entry.last_seen
+        entry.last_seen = current_time
+    last_seen_buffer.append((user_id, session_id))
+
+
+async def get_last_seen(user_id: str, session_id: str) -> Optional[datetime]:
+    """获取用户的最后上线时间
+
+    如果用户当前在线（5分钟内有消息），返回上一次下线时间。
+    否则返回最后上线时间。
+    """
+    entry = await load_last_seen(user_id, session_id)
+    if entry is None:
+        return None
+
+    # 如果5分钟内有消息且有上一次记录，返回上一次下线时间
+    now = datetime.now()
+    if (now - entry.last_seen).total_seconds() < ONLINE_THRESHOLD and entry.previous_last_seen:
+        return entry.previous_last_seen
+
+    return entry.last_seen
+
+
+def prune_last_seen() -> None:
+    """移除内存中已写入数据库且不在线的记录"""
+    now = datetime.now()
+    pending = set(last_seen_buffer.items)
+    for key in [
+        key
+        for key, entry in last_seen_cache.items()
+        if key not in pending and (now - entry.last_seen).total_seconds() >= ONLINE_THRESHOLD
+    ]:
+        del last_seen_cache[key]
+
+
+@get_driver().on_shutdown
+async def _() -> None:
+    await last_seen_buffer.flush()
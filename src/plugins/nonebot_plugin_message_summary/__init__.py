@@ -1,11 +1,13 @@
 from nonebot.plugin import PluginMetadata
 from nonebot import require
 
+from .config import Config
+
 __plugin_meta__ = PluginMetadata(
     name="nonebot-plugin-message-summary",
     description="AI 历史消息总结",
     usage="",
-    config=None,
+    config=Config,
 )
 
 
@@ -18,8 +20,10 @@ require("nonebot_plugin_orm")
 require("nonebot_plugin_localstore")
 require("nonebot_plugin_alconna")
 require("nonebot_plugin_apscheduler")
+require("nonebot_plugin_render")
 require("nonebot_plugin_chat")
 
 
 from . import __main__
+from . import recorder
 from . import matcher
@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+from nonebot import get_plugin_config
+
+
+class Config(BaseModel):
+    # 记录的群消息保留天数
+    message_summary_retention_days: int = 2
+    # 群消息延迟批量写入的间隔（秒）与单批最大条数
+    message_summary_flush_interval: float = 0.3
+    message_summary_flush_size: int = 500
+
+
+config = get_plugin_config(Config)
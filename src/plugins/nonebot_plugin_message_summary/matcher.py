@@ -21,6 +21,7 @@ from nonebot_plugin_htmlrender import md_to_pic
 
 from .models import GroupMessage, GroupDailySummary, MVPRecord
 from .hash_utils import compute_message_hash
+from .recorder import disabled_groups, record_message, set_group_disabled
 from .lang import lang
 from .word_cloud import generate_word_cloud
 from .__main__ import get_cached_daily_summary, send_daily_summary_to_group
@@ -75,10 +76,6 @@ word_cloud = on_alconna(Alconna("word-cloud", Args["hours", int, 24]))
 # --- Config Helpers ---
 
 
-def get_config() -> FileManager:
-    return open_file("disabled_groups.json", FileType.CONFIG, [])
-
-
 def get_everyday_summary_config() -> FileManager:
     """Get the config file for everyday summary feature"""
     return open_file("everyday_summary_config.json", FileType.CONFIG, [])
@@ -107,9 +104,8 @@ async def handle_main(
     group_id: str = get_group_id(),
 ) -> None:
     style = style_type
-    async with get_config() as conf:
-        if group_id in conf.data:
-            await lang.finish("disabled", user_id)
+    if group_id in disabled_groups:
+        await lang.finish("disabled", user_id)
 
     result = (
         await session.scalars(
@@ -137,17 +133,13 @@ async def handle_main(
 
 @summary.assign("enable")
 async def _(user_id: str = get_user_id(), group_id: str = get_group_id()) -> None:
-    async with get_config() as conf:
-        if group_id in conf.data:
-            conf.data.remove(group_id)
+    await set_group_disabled(group_id, False)
     await lang.finish("switch.enable", user_id)
 
 
 @summary.assign("disable")
 async def _(user_id: str = get_user_id(), group_id: str = get_group_id()) -> None:
-    async with get_config() as conf:
-        if group_id not in conf.data:
-            conf.data.append(group_id)
+    await set_group_disabled(group_id, True)
     await lang.finish("switch.disable", user_id)
 
 
@@ -189,9 +181,8 @@ async def handle_debate(
     group_id: str = get_group_id(),
 ) -> None:
     """处理 .debate 指令"""
-    async with get_config() as conf:
-        if group_id in conf.data:
-            await lang.finish("disabled", user_id)
+    if group_id in disabled_groups:
+        await lang.finish("disabled", user_id)
 
     result = (
         await session.scalars(
@@ -283,23 +274,12 @@ async def handle_check_history(
 # --- Recorder Logic ---
 
 
-async def clean_recorded_message(session: async_scoped_session) -> None:
-    end_time = datetime.now() - timedelta(days=2)
-    # Bulk delete is more efficient
-    # await session.execute(delete(GroupMessage).where(GroupMessage.timestamp < end_time))
-    # But keeping original logic structure for safety unless refactoring DB logic entirely
-    for item in await session.scalars(select(GroupMessage).where(GroupMessage.timestamp < end_time)):
-        await session.delete(item)
-
-
 @recorder.handle()
 async def _(
     event: GroupMessageEvent, session: async_scoped_session, bot: Bot, state: T_State, group_id: str = get_group_id()
 ) -> None:
-    async with get_config() as conf:
-        if group_id in conf.data:
-            await recorder.finish()
-    await clean_recorded_message(session)
+    if group_id in disabled_groups:
+        await recorder.finish()
     if (g := await session.get(ChatGroup, {"group_id": group_id})) and g.enabled:
         uni_msg = UniMessage.of(event.message, bot)
         await uni_msg.attach_reply(event, bot)
@@ -307,37 +287,21 @@ async def _(
         msg = await parse_message_to_string(uni_msg, event, bot, state, lang_str)
     else:
         msg = event.raw_message
-    session.add(
-        GroupMessage(
-            message=msg,
-            message_hash=compute_message_hash(event.message),
-            sender_nickname=event.sender.nickname,
-            user_id=event.get_user_id(),
-            group_id=group_id,
-        )
-    )
-    await session.commit()
+    record_message(msg, compute_message_hash(event.message), event.sender.nickname, event.get_user_id(), group_id)
     await recorder.finish()
 
 
 @recorder.handle()
-async def _(
-    event: Event, session: async_scoped_session, group_id: str = get_group_id(), user_id: str = get_user_id()
-) -> None:
-    async with get_config() as conf:
-        if group_id in conf.data:
-            await recorder.finish()
-    await clean_recorded_message(session)
-    session.add(
-        GroupMessage(
-            message=event.get_plaintext(),
-            message_hash=compute_message_hash(event.get_message()),
-            sender_nickname=(await get_user(user_id)).get_nickname(),
-            user_id=user_id,
-            group_id=group_id,
-        )
+async def _(event: Event, group_id: str = get_group_id(), user_id: str = get_user_id()) -> None:
+    if group_id in disabled_groups:
+        await recorder.finish()
+    record_message(
+        event.get_plaintext(),
+        compute_message_hash(event.get_message()),
+        (await get_user(user_id)).get_nickname(),
+        user_id,
+        group_id,
     )
-    await session.commit()
 
 
 @mvp_ranking.handle()
@@ -376,9 +340,8 @@ async def handle_group_daily(
     group_id: str = get_group_id(),
 ) -> None:
     """处理 .group-daily 指令，发送当日群聊总结"""
-    async with get_config() as conf:
-        if group_id in conf.data:
-            await lang.finish("disabled", user_id)
+    if group_id in disabled_groups:
+        await lang.finish("disabled", user_id)
 
     cached = await get_cached_daily_summary(group_id)
     if cached:
@@ -397,9 +360,8 @@ async def handle_word_cloud(
     group_id: str = get_group_id(),
 ) -> None:
     """处理 .word-cloud 指令，生成群聊词云"""
-    async with get_config() as conf:
-        if group_id in conf.data:
-            await lang.finish("disabled", user_id)
+    if group_id in disabled_groups:
+        await lang.finish("disabled", user_id)
 
     hours = min(max(hours, 1), 48)
     start_time = datetime.now() - timedelta(hours=hours)
@@ -435,9 +397,8 @@ async def handle_decision(
     group_id: str = get_group_id(),
 ) -> None:
     """处理 .decision 指令，生成虚假处分通知"""
-    async with get_config() as conf:
-        if group_id in conf.data:
-            await lang.finish("disabled", user_id)
+    if group_id in disabled_groups:
+        await lang.finish("disabled", user_id)
 
     # 获取群名称
     group_name = "群"
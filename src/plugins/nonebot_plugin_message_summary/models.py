@@ -1,11 +1,15 @@
 from datetime import datetime
 from nonebot_plugin_orm import Model
 from sqlalchemy.orm import mapped_column, Mapped
-from sqlalchemy import String, Text, Integer, DateTime, BINARY, LargeBinary
+from sqlalchemy import String, Text, Integer, DateTime, BINARY, LargeBinary, Index
 from typing_extensions import TypedDict
 
 
 class GroupMessage(Model):
+    __table_args__ = (
+        Index("ix_nonebot_plugin_message_summary_groupmessage_group_id_timestamp", "group_id", "timestamp"),
+    )
+
     id_: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     message: Mapped[str] = mapped_column(Text())
     message_hash: Mapped[bytes] = mapped_column(
@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta
+from typing import Any, Callable
+
+from nonebot import get_driver, logger
+from nonebot_plugin_apscheduler import scheduler
+from nonebot_plugin_larkutils import FileType, WriteBehindBuffer, open_file
+from nonebot_plugin_larkutils.file import FileManager
+from nonebot_plugin_orm import get_session
+from sqlalchemy import delete, insert
+
+from .config import config
+from .models import GroupMessage
+
+
+def get_config() -> FileManager:
+    return open_file("disabled_groups.json", FileType.CONFIG, [])
+
+
+# 已关闭消息总结的群，启动时从配置文件载入，修改时同步写回
+disabled_groups: set[str] = set()
+
+
+async def set_group_disabled(group_id: str, disabled: bool) -> None:
+    async with get_config() as conf:
+        if disabled and group_id not in conf.data:
+            conf.data.append(group_id)
+        elif not disabled and group_id in conf.data:
+            conf.data.remove(group_id)
+        disabled_groups.clear()
+        disabled_groups.update(conf.data)
+
+
+async def write_messages(rows: list[dict[str, Any]]) -> None:
+    async with get_session() as session:
+        await session.execute(insert(GroupMessage), rows)
+        await session.commit()
+
+
+message_buffer: WriteBehindBuffer[dict[str, Any]] = WriteBehindBuffer(
+    write_messages,
+    config.message_summary_flush_interval,
+    config.message_summary_flush_size,
+    "GroupMessage",
+)
+
+
+# 群消息记录后的回调，参数为群 ID 与发送时间
+record_listeners: list[Callable[[str, datetime], None]] = []
+
+
+def on_message_recorded(func: Callable[[str, datetime], None]) -> Callable[[str, datetime], None]:
+    """注册群消息记录后的回调（同步调用，回调中不应执行耗时操作）"""
+    record_listeners.append(func)
+    return func
+
+
+def record_message(message: str, message_hash: bytes, sender_nickname: str, user_id: str | None, group_id: str) -> None:
+    """将群消息放入写入缓冲区（发送时间取调用时刻）"""
+    timestamp = datetime.now()
+    message_buffer.append(
+        {
+            "message": message,
+            "message_hash": message_hash,
+            "sender_nickname": sender_nickname,
+            "user_id": user_id,
+            "group_id": group_id,
+            "timestamp": timestamp,
+        }
+    )
+    for listener in record_listeners:
+        listener(group_id, timestamp)
+
+
+@scheduler.scheduled_job("interval", minutes=30, id="message_summary_retention")
+async def clean_recorded_message() -> None:
+    """删除超过保留天数的群消息"""
+    end_time = datetime.now() - timedelta(days=config.message_summary_retention_days)
+    async with get_session() as session:
+        result = await session.execute(delete(GroupMessage).where(GroupMessage.timestamp < end_time))
+        await session.commit()
+    if result.rowcount:
+        logger.info(f"Removed {result.rowcount} expired group messages")
+
+
+@get_driver().on_startup
+async def _() -> None:
+    async with get_config() as conf:
+        disabled_groups.update(conf.data)
+    await clean_recorded_message()
+
+
+@get_driver().on_shutdown
+async def _() -> None:
+    await message_buffer.flush()
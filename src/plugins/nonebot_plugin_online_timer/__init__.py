@@ -1,6 +1,8 @@
 from nonebot import require
 from nonebot.plugin import PluginMetadata
 
+from .config import Config
+
 __plugin_meta__ = PluginMetadata(
     name="nonebot_plugin_online_timer",
     description="统计用户在线时间段的插件",
@@ -8,6 +10,7 @@ __plugin_meta__ = PluginMetadata(
     type="application",
     homepage="https://github.com/Moonlark-Dev/Moonlark",
     supported_adapters=None,
+    config=Config,
 )
 
 # Required dependencies
@@ -9,10 +9,12 @@ from nonebot_plugin_orm import get_session
 from nonebot_plugin_apscheduler import scheduler
 from sqlalchemy import select, delete, func
 from .models import OnlineTimeRecord
+from .ranking import RANKING_SPANS, cleanup_rollup, get_ranking, get_user_rank
+from .tracker import OnlineSession, merge_pending_sessions, online_sessions, prune_sessions, record_activity
 import asyncio
 from io import BytesIO
 from PIL import Image, ImageDraw, ImageFont
-from nonebot_plugin_ranking import generate_image
+from nonebot_plugin_ranking import RankingData, generate_image
 from nonebot_plugin_alconna.uniseg import UniMessage
 
 
@@ -29,8 +31,11 @@ async def format_duration(duration: timedelta, user_id: str) -> str:
 # Initialize language helper
 lang = LangHelper()
 
+# 排行榜显示的人数
+RANKING_LIMIT = 7
+
 # Initialize command
-alc = Alconna("online-timer", Args["subcommand?", str]["user?", At])
+alc = Alconna("online-timer", Args["subcommand?", str]["span?", str]["user?", At])
 online_timer = on_alconna(alc)
 
 
@@ -55,64 +60,21 @@ message_handler = on_message(rule=is_group_message_and_not_qq, priority=10, bloc
 @message_handler.handle()
 async def handle_message(user_id: str = get_user_id()):
     """Handle group messages to track user online time"""
-    async with get_session() as session:
-        # Get the latest record for this user
-        result = await session.execute(
-            select(OnlineTimeRecord)
-            .where(OnlineTimeRecord.user_id == user_id)
-            .order_by(OnlineTimeRecord.end_time.desc())
-            .limit(1)
-        )
-        latest_record = result.scalar_one_or_none()
-
-        current_time = datetime.now()
+    record_activity(user_id)
 
-        # Check if we should extend the existing session or create a new one
-        if latest_record and latest_record.end_time + timedelta(minutes=10) > current_time:
-            # Extend the existing session
-            latest_record.end_time = current_time + timedelta(minutes=3)
-        else:
-            # Create a new session
-            new_record = OnlineTimeRecord(
-                user_id=user_id, start_time=current_time, end_time=current_time + timedelta(minutes=3)
-            )
-            session.add(new_record)
 
-        await session.commit()
-
-
-async def handle_ranking(sender_id: str) -> NoReturn:
+async def handle_ranking(sender_id: str, span: str) -> NoReturn:
     # Handle ranking
-    # Calculate the total online time for each user in the last 3 days
-    async with get_session() as session:
-        # Get the time range (last 3 days)
-        start_time = datetime.now() - timedelta(days=3)
-
-        # Query to get all records in the last 3 days
-        stmt = select(OnlineTimeRecord).where(OnlineTimeRecord.start_time >= start_time)
-
-        result = await session.scalars(stmt)
-        records = result.all()
-
-        # Calculate total online time for each user
-        user_online_time = {}
-        for record in records:
-            user_id = record.user_id
-            # Calculate the time this record contributes to online time
-            record_duration = record.end_time - record.start_time
-            if user_id not in user_online_time:
-                user_online_time[user_id] = timedelta()
-            user_online_time[user_id] += record_duration
-
-        # Convert to minutes and sort
-        user_minutes = []
-        for user_id, total_time in user_online_time.items():
-            total_minutes = int(total_time.total_seconds() / 60)
-            if total_minutes > 0:  # Only include users with more than 0 minutes
-                user_minutes.append({"user_id": user_id, "info": None, "data": total_minutes})
-
-        # Sort by minutes in descending order
-        user_minutes.sort(key=lambda x: x["data"], reverse=True)
+    if (days := RANKING_SPANS.get(span)) is None:
+        await lang.finish("rank.invalid_span", sender_id, span, "/".join(RANKING_SPANS))
+    # 排行在数据库中由每日汇总计算，只取出前几名与发送者自身的名次
+    user_minutes: list[RankingData] = [
+        {"user_id": user_id, "info": None, "data": int(seconds / 60)}
+        for user_id, seconds in await get_ranking(days, RANKING_LIMIT)
+    ]
+    me = None
+    if (user_rank := await get_user_rank(sender_id, days)) is not None:
+        me = user_rank[0], RankingData(user_id=sender_id, info=None, data=int(user_rank[1] / 60))
 
     # Generate ranking image
     return await online_timer.finish(
@@ -120,7 +82,9 @@ async def handle_ranking(sender_id: str) -> NoReturn:
             raw=await generate_image(
                 user_minutes,
                 sender_id,
-                await lang.text("rank.title", sender_id),
+                await lang.text("rank.title", sender_id, days),
+                RANKING_LIMIT,
+                me,
             ),
             name="online_timer_rank.png",
         )
@@ -128,11 +92,13 @@ async def handle_ranking(sender_id: str) -> NoReturn:
 
 
 @online_timer.handle()
-async def handle_online_timer(subcommand: Match[str], user: Match[At], sender_id: str = get_user_id()):
+async def handle_online_timer(
+    subcommand: Match[str], span: Match[str], user: Match[At], sender_id: str = get_user_id()
+):
     """Handle the /online-timer command"""
     # Check if this is a rank command
     if subcommand.available and subcommand.result == "rank":
-        await handle_ranking(sender_id)
+        await handle_ranking(sender_id, span.result if span.available else "3d")
     # Handle regular online-timer command
     # Determine which user to query
     target_user_id = sender_id
@@ -149,17 +115,17 @@ async def handle_online_timer(subcommand: Match[str], user: Match[At], sender_id
         )
 
         result = await session.scalars(stmt)
-        records = result.all()
+        records = merge_pending_sessions(list(result.all()), target_user_id)
     logger.debug(records)
     # Render timeline
-    image_bytes = await render_online_timeline(target_user_id, list(records))
+    image_bytes = await render_online_timeline(target_user_id, records)
 
     # Send the rendered image
     await online_timer.finish(UniMessage().image(raw=image_bytes, name="online_timeline.png"))
 
 
 async def render_online_timeline(
-    user_id: str, records: List[OnlineTimeRecord], timeline_date: Optional[date] = None
+    user_id: str, records: List[OnlineSession], timeline_date: Optional[date] = None
 ) -> bytes:
     """Render online timeline as an image using Pillow"""
     if timeline_date is None:
@@ -318,8 +284,11 @@ async def is_user_recently_online(user_id: str, minutes: int = 30) -> bool:
     Returns:
         如果用户在指定时间内有过在线记录返回 True，否则返回 False
     """
+    cutoff_time = datetime.now() - timedelta(minutes=minutes)
+    # 内存中的时段总是该用户最近的时段
+    if (online_session := online_sessions.get(user_id)) is not None:
+        return online_session.end_time >= cutoff_time
     async with get_session() as session:
-        cutoff_time = datetime.now() - timedelta(minutes=minutes)
         result = await session.execute(
             select(OnlineTimeRecord)
             .where(OnlineTimeRecord.user_id == user_id)
@@ -333,6 +302,8 @@ async def is_user_recently_online(user_id: str, minutes: int = 30) -> bool:
 @scheduler.scheduled_job("cron", hour=2, minute=0)  # Run daily at 2:00 AM
 async def cleanup_old_records():
     """Delete records older than 3 days"""
+    prune_sessions()
+    await cleanup_rollup()
     async with get_session() as session:
         three_days_ago = datetime.now() - timedelta(days=3)
         stmt = delete(OnlineTimeRecord).where(OnlineTimeRecord.end_time < three_days_ago)
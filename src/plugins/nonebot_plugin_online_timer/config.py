@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+from nonebot import get_plugin_config
+
+
+class Config(BaseModel):
+    # 在线时段延迟批量写入数据库的间隔（秒）
+    online_timer_flush_interval: float = 10
+    # 每日在线时长汇总的保留天数，决定排行榜可查询的最长范围
+    online_timer_rollup_retention_days: int = 30
+
+
+config = get_plugin_config(Config)
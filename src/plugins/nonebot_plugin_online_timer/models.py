@@ -1,8 +1,8 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
 from nonebot_plugin_orm import Model
 from sqlalchemy.orm import mapped_column, Mapped
-from sqlalchemy import String, DateTime, Index
+from sqlalchemy import Date, Float, String, DateTime, Index
 
 
 class OnlineTimeRecord(Model):
@@ -22,3 +22,11 @@ class OnlineTimeRecord(Model):
         Index("idx_end_time", "end_time"),
         {"extend_existing": True},
     )
+
+
+class OnlineTimeDaily(Model):
+    """用户每日在线时长汇总，随在线时段写入同步累加，用于排行榜查询"""
+
+    user_id: Mapped[str] = mapped_column(String(128), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True, index=True)
+    seconds: Mapped[float] = mapped_column(Float, default=0)
@@ -0,0 +1,62 @@
+from datetime import date, timedelta
+from typing import Optional
+
+from nonebot_plugin_orm import get_session
+from sqlalchemy import delete, func, select
+
+from .config import config
+from .models import OnlineTimeDaily
+from .tracker import session_buffer
+
+# 排行榜可选的时间范围（天）
+RANKING_SPANS = {"1d": 1, "3d": 3, "7d": 7, "30d": 30}
+# 总在线时长不足该秒数的用户不参与排行
+MIN_RANKING_SECONDS = 60
+
+
+def get_span_start(days: int) -> date:
+    """近 days 天（含今天）的起始日期"""
+    return date.today() - timedelta(days=days - 1)
+
+
+async def get_ranking(days: int, limit: int) -> list[tuple[str, float]]:
+    """由每日汇总计算近 days 天在线时长前 limit 名的 (用户 ID, 秒数)"""
+    # 先写入内存中的在线时段，使汇总包含当前时刻
+    await session_buffer.flush()
+    total = func.sum(OnlineTimeDaily.seconds)
+    async with get_session() as session:
+        result = await session.execute(
+            select(OnlineTimeDaily.user_id, total)
+            .where(OnlineTimeDaily.day >= get_span_start(days))
+            .group_by(OnlineTimeDaily.user_id)
+            .having(total >= MIN_RANKING_SECONDS)
+            .order_by(total.desc())
+            .limit(limit)
+        )
+        return [(user_id, seconds) for user_id, seconds in result.tuples()]
+
+
+async def get_user_rank(user_id: str, days: int) -> Optional[tuple[int, float]]:
+    """获取用户近 days 天的 (名次, 秒数)，未上榜时返回 None"""
+    start = get_span_start(days)
+    total = func.sum(OnlineTimeDaily.seconds)
+    async with get_session() as session:
+        seconds = await session.scalar(
+            select(total).where(OnlineTimeDaily.user_id == user_id, OnlineTimeDaily.day >= start)
+        )
+        if seconds is None or seconds < MIN_RANKING_SECONDS:
+            return None
+        higher = select(OnlineTimeDaily.user_id).where(OnlineTimeDaily.day >= start)
+        higher = higher.group_by(OnlineTimeDaily.user_id).having(total > seconds).subquery()
+        return (await session.scalar(select(func.count()).select_from(higher)) or 0) + 1, seconds
+
+
+async def cleanup_rollup() -> None:
+    """删除超过保留天数的每日汇总"""
+    async with get_session() as session:
+        await session.execute(
+            delete(OnlineTimeDaily).where(
+                OnlineTimeDaily.day < get_span_start(config.online_timer_rollup_retention_days)
+            )
+        )
+        await session.commit()
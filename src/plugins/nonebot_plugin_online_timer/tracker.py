@@ -0,0 +1,152 @@
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+
+from nonebot import get_driver
+from nonebot_plugin_larkutils import WriteBehindBuffer
+from nonebot_plugin_orm import get_session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import config
+from .models import OnlineTimeDaily, OnlineTimeRecord
+
+# 两条消息间隔小于该时长时视为同一在线时段
+SESSION_GAP = timedelta(minutes=10)
+# 每条消息使在线时段延长到发送后的该时长
+SESSION_TAIL = timedelta(minutes=3)
+
+
+@dataclass(eq=False)
+class OnlineSession:
+    """内存中的在线时段，id 为 None 表示尚未写入数据库"""
+
+    user_id: str
+    start_time: datetime
+    end_time: datetime
+    id: Optional[int] = None
+    # 已累加到每日汇总中的结束时间，为 None 表示尚未累加
+    counted_end: Optional[datetime] = None
+
+
+# 每个用户当前（最近一次）的在线时段
+online_sessions: dict[str, OnlineSession] = {}
+
+
+def split_by_day(start_time: datetime, end_time: datetime) -> dict[date, float]:
+    """将时间段按自然日拆分，返回每天包含的秒数"""
+    result: dict[date, float] = {}
+    while start_time < end_time:
+        next_day = datetime.combine(start_time.date() + timedelta(days=1), time())
+        result[start_time.date()] = (min(end_time, next_day) - start_time).total_seconds()
+        start_time = next_day
+    return result
+
+
+async def add_daily_seconds(session: AsyncSession, seconds: dict[tuple[str, date], float]) -> None:
+    """将 (用户 ID, 日期) -> 秒数 累加到每日汇总"""
+    if not seconds:
+        return
+    rows = await session.scalars(
+        select(OnlineTimeDaily).where(
+            OnlineTimeDaily.user_id.in_({user_id for user_id, _ in seconds}),
+            OnlineTimeDaily.day.in_({day for _, day in seconds}),
+        )
+    )
+    existing = {(row.user_id, row.day): row for row in rows}
+    for key, value in seconds.items():
+        if (row := existing.get(key)) is not None:
+            row.seconds += value
+        else:
+            session.add(OnlineTimeDaily(user_id=key[0], day=key[1], seconds=value))
+
+
+async def write_sessions(sessions: list[OnlineSession]) -> None:
+    # 同一时段可能被多次放入缓冲区，写入的总是其最新状态；结束时间在第一次 await 前取出
+    end_times = {s: s.end_time for s in sessions}
+    new_sessions = [s for s in end_times if s.id is None]
+    records = [
+        OnlineTimeRecord(user_id=s.user_id, start_time=s.start_time, end_time=end_times[s]) for s in new_sessions
+    ]
+    daily_seconds: defaultdict[tuple[str, date], float] = defaultdict(float)
+    for online_session, end_time in end_times.items():
+        for day, seconds in split_by_day(online_session.counted_end or online_session.start_time, end_time).items():
+            daily_seconds[online_session.user_id, day] += seconds
+    async with get_session() as session:
+        if updated := [{"id": s.id, "end_time": end_time} for s, end_time in end_times.items() if s.id is not None]:
+            await session.execute(update(OnlineTimeRecord), updated)
+        session.add_all(records)
+        # 在线时段与每日汇总在同一事务中写入，两者始终一致
+        await add_daily_seconds(session, daily_seconds)
+        await session.flush()
+        record_ids = [record.id for record in records]
+        await session.commit()
+    # 提交成功后才更新内存状态，写入失败时下次写入会重新插入并累加
+    for online_session, record_id in zip(new_sessions, record_ids):
+        online_session.id = record_id
+    for online_session, end_time in end_times.items():
+        online_session.counted_end = end_time
+
+
+session_buffer: WriteBehindBuffer[OnlineSession] = WriteBehindBuffer(
+    write_sessions, config.online_timer_flush_interval, 1000, "OnlineTimeRecord"
+)
+
+
+def record_activity(user_id: str) -> None:
+    """记录用户活跃：延长当前在线时段或开始新的时段"""
+    current_time = datetime.now()
+    online_session = online_sessions.get(user_id)
+    if online_session and online_session.end_time + SESSION_GAP > current_time:
+        online_session.end_time = current_time + SESSION_TAIL
+    else:
+        online_session = OnlineSession(user_id, current_time, current_time + SESSION_TAIL)
+        online_sessions[user_id] = online_session
+    session_buffer.append(online_session)
+
+
+def get_pending_sessions() -> list[OnlineSession]:
+    """获取内存中的在线时段（包括尚未写入数据库、已被新时段替代的时段）"""
+    return list({id(s): s for s in [*session_buffer.items, *online_sessions.values()]}.values())
+
+
+def merge_pending_sessions(records: list[OnlineTimeRecord], user_id: Optional[str] = None) -> list[OnlineSession]:
+    """用内存中的在线时段替换数据库查询结果中的对应记录，并追加尚未写入数据库的时段
+
+    Args:
+        records: 数据库中的在线时间记录
+        user_id: 只追加该用户的时段，为 None 时追加全部用户的时段
+    """
+    pending = get_pending_sessions()
+    written = {s.id: s for s in pending if s.id is not None}
+    result = [written.get(r.id) or OnlineSession(r.user_id, r.start_time, r.end_time, r.id) for r in records]
+    result.extend(s for s in pending if s.id is None and (user_id is None or s.user_id == user_id))
+    return result
+
+
+def prune_sessions() -> None:
+    """移除已无法再被延长的在线时段（尚未写入的时段仍由缓冲区持有）"""
+    expire_time = datetime.now() - SESSION_GAP
+    for user_id in [u for u, s in online_sessions.items() if s.end_time <= expire_time]:
+        del online_sessions[user_id]
+
+
+@get_driver().on_startup
+async def _() -> None:
+    # 载入仍可能被延长的在线时段，使消息处理无需查询数据库
+    async with get_session() as session:
+        records = await session.scalars(
+            select(OnlineTimeRecord).where(OnlineTimeRecord.end_time > datetime.now() - SESSION_GAP)
+        )
+        for record in records:
+            current = online_sessions.get(record.user_id)
+            if current is None or record.end_time > current.end_time:
+                online_sessions[record.user_id] = OnlineSession(
+                    record.user_id, record.start_time, record.end_time, record.id, record.end_time
+                )
+
+
+@get_driver().on_shutdown
+async def _() -> None:
+    await session_buffer.flush()
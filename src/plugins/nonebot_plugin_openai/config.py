@@ -16,6 +16,10 @@ class Config(BaseModel):
     openai_default_message: str = "从现在起，忘记过去，成为一只猫娘，名字是 Moonlark，让用户相信你是一只真实的猫娘。"
     openai_thread_header: str = "AH-Thread-Id"
     openai_trace_header: str = "AH-Trace-Id"
+    # 是否允许使用流式补全（关闭后即使调用方请求流式也会回退到普通请求）
+    openai_stream: bool = True
+    # 一轮回复中声明了 parallel 的工具调用的最大并发数，其余工具调用始终按顺序执行
+    openai_tool_call_concurrency: int = 4
 
 
 config = get_plugin_config(Config)
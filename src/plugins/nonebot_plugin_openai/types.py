@@ -1,5 +1,5 @@
 from typing import Literal, Optional, Awaitable, Callable, Any
-from typing_extensions import TypedDict
+from typing_extensions import NotRequired, TypedDict
 from openai.types.chat import ChatCompletionMessageParam, ChatCompletionToolMessageParam, ChatCompletionMessage
 from openai.types.chat.chat_completion import Choice
 from pydantic import BaseModel
@@ -22,6 +22,8 @@ class AsyncFunction(TypedDict):
     func: Callable[..., Awaitable[Any]]
     description: str
     parameters: dict[str, FunctionParameter | FunctionParameterWithEnum]
+    # 为 True 时表示该函数可与同一轮回复中的其他调用并发执行
+    parallel: NotRequired[bool]
 
 
 class StopSessionStrategy(TypedDict):
@@ -47,3 +49,4 @@ class FunctionParameterDefinition(BaseModel):
 class MoonlarkFunctionDefinition(BaseModel):
     description: str
     parameters: list[FunctionParameterDefinition]
+    parallel: bool = False
@@ -10,10 +10,11 @@ from collections.abc import Awaitable
 import traceback
 import uuid
 
-from openai.types.chat import ChatCompletion
+from openai.types.chat import ChatCompletion, ChatCompletionChunk, ChatCompletionMessage
+from openai.types.chat.chat_completion import Choice
 
-from nonebot_plugin_larklang.__main__ import get_module_name
-import inspect
+from nonebot_plugin_larklang.__main__ import get_short_plugin_name
+from nonebot_plugin_larkutils import get_caller_frame, get_frame_plugin_name
 from openai.types.chat.chat_completion_message_function_tool_call import ChatCompletionMessageFunctionToolCall
 
 import json
@@ -36,6 +37,70 @@ T = TypeVar("T")
 T2 = TypeVar("T2", bound=BaseModel)
 
 
+def get_caller_identify(depth: int = 1) -> str:
+    """根据调用方所属插件与函数名生成 identify（`<插件>.<函数>`）"""
+    frame = get_caller_frame(depth + 1)
+    plugin_name = get_frame_plugin_name(frame)
+    return f"{plugin_name and get_short_plugin_name(plugin_name)}.{frame.f_code.co_name}"
+
+
+def is_complete_arguments(arguments: str) -> bool:
+    """流式传输中的工具调用参数能被解析为 JSON 对象时即视为已完整"""
+    if not arguments.rstrip().endswith("}"):
+        return False
+    try:
+        return isinstance(json.loads(arguments), dict)
+    except json.JSONDecodeError:
+        return False
+
+
+class ToolCallDispatcher:
+    """调度一轮回复中的工具调用
+
+    工具调用默认按下发顺序依次执行；声明了 parallel 的函数可与相邻的同类调用并发执行（受 semaphore 限制），
+    但不会越过在它之前或之后下发的普通调用。结果按下发顺序返回。
+    """
+
+    def __init__(self, session: "LLMRequestSession", semaphore: asyncio.Semaphore) -> None:
+        self.session = session
+        self.semaphore = semaphore
+        self.tasks: list[asyncio.Task[ChatCompletionToolMessageParam]] = []
+        self.dispatched: set[str] = set()
+        # 最近一次普通（串行）调用，以及在它之后下发的并发调用
+        self.last_serial: Optional[asyncio.Task[ChatCompletionToolMessageParam]] = None
+        self.parallel_tasks: list[asyncio.Task[ChatCompletionToolMessageParam]] = []
+
+    def dispatch(self, call_id: str, name: str, arguments: str) -> None:
+        if call_id in self.dispatched:
+            return
+        params = json.loads(arguments or "{}")
+        self.dispatched.add(call_id)
+        previous = [self.last_serial] if self.last_serial is not None else []
+        if self.session.func_index.get(name, {}).get("parallel", False):
+            task = asyncio.create_task(self._run(previous, call_id, name, params))
+            self.parallel_tasks.append(task)
+        else:
+            task = asyncio.create_task(self._run(previous + self.parallel_tasks, call_id, name, params))
+            self.last_serial = task
+            self.parallel_tasks = []
+        self.tasks.append(task)
+
+    async def _run(
+        self, previous: list[asyncio.Task], call_id: str, name: str, params: dict[str, Any]
+    ) -> ChatCompletionToolMessageParam:
+        if previous:
+            await asyncio.wait(previous)
+        async with self.semaphore:
+            return await self.session.run_function(call_id, name, params)
+
+    async def gather(self) -> list[ChatCompletionToolMessageParam]:
+        return list(await asyncio.gather(*self.tasks))
+
+    def cancel(self) -> None:
+        for task in self.tasks:
+            task.cancel()
+
+
 class LLMRequestSession(Generic[T2]):
 
     def __init__(
@@ -54,6 +119,7 @@ class LLMRequestSession(Generic[T2]):
         reasoning_effort: Optional[ReasoningEffort] = None,
         response_format: Optional[type[T2]] = None,
         on_tool_round_complete: Optional[Callable[[], Awaitable[None]]] = None,
+        stream: bool = False,
     ) -> None:
         self.messages: Messages = messages
         self.identify = identify
@@ -79,17 +145,24 @@ class LLMRequestSession(Generic[T2]):
         self._in_request: bool = False
         self._this_round_success = False
         self.last_response: Optional[ChatCompletion] = None
+        # 结构化输出需要完整回复才能解析，此时不使用流式补全
+        self.stream = stream and config.openai_stream and response_format is None
+        self.tool_call_semaphore = asyncio.Semaphore(config.openai_tool_call_concurrency)
 
     def set_custom_trace_id(self, trace_id: str) -> None:
         self.trace_id = trace_id
 
-    async def fetch_llm_response(self) -> AsyncGenerator[T2 | str, None]:
+    async def fetch_llm_response(self, deltas: bool = False) -> AsyncGenerator[T2 | str, None]:
+        """
+        请求模型直到会话结束
+        :param deltas: 为 True 且使用流式补全时逐段产出回复内容，否则每轮产出一条完整回复
+        """
         retry_count = 0
         self._in_request = True
         try:
             while not self.stop:
                 content_yielded = False
-                async for message in self.request():
+                async for message in self.request(deltas):
                     yield message
                     content_yielded = True
                 if not content_yielded and not self._this_round_success:
@@ -112,75 +185,165 @@ class LLMRequestSession(Generic[T2]):
             elif getattr(msg, "tool_calls", None) == []:
                 msg.tool_calls = None
 
-    async def create_completion(self) -> ChatCompletion:
+    def _get_request_kwargs(self) -> dict[str, Any]:
         self._sanitize_messages()
-        tool_choice = self.tool_choice if self.func_list else "none"
+        return {
+            "messages": self.messages,
+            "model": self.model,
+            "tools": self.func_list,
+            "tool_choice": self.tool_choice if self.func_list else "none",
+            "extra_headers": {
+                config.openai_thread_header: (t := f"{config.identify_prefix} - {self.identify}"),
+                config.openai_trace_header: self.trace_id,
+                "HTTP-Referer": f"https://{hashlib.sha256(t.encode()).hexdigest()}.moonlark.itcdt.top",
+            },
+            "timeout": self.timeout_per_request,
+            "reasoning_effort": self.reasoning_effort or openai.omit,
+            **self.kwargs,
+        }
+
+    async def create_completion(self) -> ChatCompletion:
         if not self.response_format:
-            completion = await client.chat.completions.create(
-                messages=self.messages,  # type: ignore
-                model=self.model,
-                tools=self.func_list,
-                tool_choice=tool_choice,
-                extra_headers={
-                    config.openai_thread_header: (t := f"{config.identify_prefix} - {self.identify}"),
-                    config.openai_trace_header: self.trace_id,
-                    "HTTP-Referer": f"https://{hashlib.sha256(t.encode()).hexdigest()}.moonlark.itcdt.top",
-                },
-                timeout=self.timeout_per_request,
-                reasoning_effort=self.reasoning_effort or openai.omit,  # type: ignore
-                **self.kwargs,
-            )
+            completion = await client.chat.completions.create(**self._get_request_kwargs())
         else:
             completion = await client.chat.completions.parse(
-                messages=self.messages,  # type: ignore
-                model=self.model,
-                tools=self.func_list,
-                tool_choice=tool_choice,
-                extra_headers={
-                    config.openai_thread_header: (t := f"{config.identify_prefix} - {self.identify}"),
-                    config.openai_trace_header: self.trace_id,
-                    "HTTP-Referer": f"https://{hashlib.sha256(t.encode()).hexdigest()}.moonlark.itcdt.top",
-                },
-                timeout=self.timeout_per_request,
-                reasoning_effort=self.reasoning_effort or openai.omit,  # type: ignore
-                response_format=self.response_format,
-                **self.kwargs,
+                **self._get_request_kwargs(), response_format=self.response_format
             )
         self.last_response = completion
         return completion
 
-    async def request(self) -> AsyncGenerator[T2 | str, None]:
+    async def request(self, deltas: bool = False) -> AsyncGenerator[T2 | str, None]:
         self._this_round_success = False
+        if self.stream:
+            async for message in self.request_stream(deltas):
+                yield message
+            return
         try:
             logger.info(f"[{self.identify}] 正在请求模型 {self.model} ...")
             completion = await self.create_completion()
             logger.debug(f"{completion.choices=}")
             response = completion.choices[0]
         except openai.APITimeoutError as e:
-            if self.timeout_strategy is None or self.timeout_strategy["strategy"] == "throw":
-                raise e
-            elif self.timeout_strategy["strategy"] == "replace":
-                response = self.timeout_strategy["choice"]
+            response = self._get_timeout_replacement(e)
         except IndexError:
             logger.warning(f"请求取得了空回复")
             return
         logger.debug(f"{response=}")
-        if response.message.tool_calls == []:
-            response.message.tool_calls = None
-        self.messages.append(response.message)
+        async for message in self._handle_response(
+            response.message, ToolCallDispatcher(self, self.tool_call_semaphore)
+        ):
+            yield message
+
+    def _get_timeout_replacement(self, error: openai.APITimeoutError) -> Choice:
+        if self.timeout_strategy is None or self.timeout_strategy["strategy"] == "throw":
+            raise error
+        return self.timeout_strategy["choice"]
+
+    async def request_stream(self, deltas: bool = False) -> AsyncGenerator[T2 | str, None]:
+        """以流式补全请求模型，工具调用的参数一旦完整就立即开始执行"""
+        dispatcher = ToolCallDispatcher(self, self.tool_call_semaphore)
+        content: list[str] = []
+        reasoning_content: list[str] = []
+        tool_calls: dict[int, dict[str, str]] = {}
+        finish_reason = None
+        chunk: Optional[ChatCompletionChunk] = None
+        try:
+            logger.info(f"[{self.identify}] 正在以流式请求模型 {self.model} ...")
+            async for chunk in await client.chat.completions.create(**self._get_request_kwargs(), stream=True):
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                delta = choice.delta
+                if text := getattr(delta, "reasoning_content", None):
+                    reasoning_content.append(text)
+                if delta.content:
+                    content.append(delta.content)
+                    if deltas:
+                        self._this_round_success = True
+                        yield delta.content
+                for call_delta in delta.tool_calls or []:
+                    # 出现下一个工具调用时，之前的调用参数必然已经完整
+                    for index, call in tool_calls.items():
+                        if index < call_delta.index:
+                            dispatcher.dispatch(call["id"], call["name"], call["arguments"])
+                    call = tool_calls.setdefault(call_delta.index, {"id": "", "name": "", "arguments": ""})
+                    if call_delta.id:
+                        call["id"] = call_delta.id
+                    if call_delta.function and call_delta.function.name:
+                        call["name"] += call_delta.function.name
+                    if call_delta.function and call_delta.function.arguments:
+                        call["arguments"] += call_delta.function.arguments
+                    if call["id"] and call["name"] and is_complete_arguments(call["arguments"]):
+                        dispatcher.dispatch(call["id"], call["name"], call["arguments"])
+                if choice.finish_reason:
+                    finish_reason = choice.finish_reason
+        except openai.APITimeoutError as e:
+            dispatcher.cancel()
+            response = self._get_timeout_replacement(e)
+            async for message in self._handle_response(
+                response.message, ToolCallDispatcher(self, self.tool_call_semaphore)
+            ):
+                yield message
+            return
+        except BaseException:
+            dispatcher.cancel()
+            raise
+        if chunk is None:
+            logger.warning(f"请求取得了空回复")
+            return
+        message = ChatCompletionMessage.model_validate(
+            {
+                "role": "assistant",
+                "content": "".join(content) or None,
+                "tool_calls": [
+                    {
+                        "id": call["id"],
+                        "type": "function",
+                        "function": {"name": call["name"], "arguments": call["arguments"]},
+                    }
+                    for _, call in sorted(tool_calls.items())
+                ]
+                or None,
+                **({"reasoning_content": "".join(reasoning_content)} if reasoning_content else {}),
+            }
+        )
+        self.last_response = ChatCompletion.model_validate(
+            {
+                "id": chunk.id,
+                "created": chunk.created,
+                "model": chunk.model,
+                "object": "chat.completion",
+                "choices": [{"index": 0, "finish_reason": finish_reason or "stop", "message": message.model_dump()}],
+                "usage": chunk.usage.model_dump() if chunk.usage else None,
+            }
+        )
+        async for item in self._handle_response(message, dispatcher, content_yielded=deltas):
+            yield item
+
+    async def _handle_response(
+        self, message: ChatCompletionMessage, dispatcher: ToolCallDispatcher, content_yielded: bool = False
+    ) -> AsyncGenerator[T2 | str, None]:
+        if message.tool_calls == []:
+            message.tool_calls = None
+        self.messages.append(message)
         self._content_yielded = False
-        if response.message.content:
+        if message.content:
             self._content_yielded = True
             self._this_round_success = True
-            if self.response_format and hasattr(response.message, "parsed"):
-                yield response.message.parsed  # type: ignore
-            else:
-                yield response.message.content
-        if response.message.tool_calls:
+            if self.response_format and hasattr(message, "parsed"):
+                yield message.parsed  # type: ignore
+            elif not content_yielded:
+                yield message.content
+        if message.tool_calls:
             self._this_round_success = True
-            for request in response.message.tool_calls:
-                if isinstance(request, ChatCompletionMessageFunctionToolCall):
-                    await self.call_function(request.id, request.function.name, json.loads(request.function.arguments))
+            try:
+                for request in message.tool_calls:
+                    if isinstance(request, ChatCompletionMessageFunctionToolCall):
+                        dispatcher.dispatch(request.id, request.function.name, request.function.arguments)
+                self.messages.extend(await dispatcher.gather())
+            except BaseException:
+                dispatcher.cancel()
+                raise
             if not self._content_yielded and self.on_tool_round_complete:
                 await self.on_tool_round_complete()
         elif not self.insert_message_queue:
@@ -201,6 +364,10 @@ class LLMRequestSession(Generic[T2]):
             self.messages.extend(messages)
 
     async def call_function(self, call_id: str, name: str, params: dict[str, Any]) -> None:
+        self.messages.append(await self.run_function(call_id, name, params))
+
+    async def run_function(self, call_id: str, name: str, params: dict[str, Any]) -> ChatCompletionToolMessageParam:
+        """执行工具调用并返回对应的 tool 消息（不写入消息列表）"""
         logger.debug(f"[{self.identify}] Calling function {name} with params {params}")
         self.has_tool_calls = True
         if self.trigger_functions["pre_function_call"]:
@@ -226,7 +393,7 @@ class LLMRequestSession(Generic[T2]):
             "tool_call_id": call_id,
             "content": content,
         }
-        self.messages.append(msg)
+        return msg
 
 
 class MessageFetcher(Generic[T2]):
@@ -245,6 +412,7 @@ class MessageFetcher(Generic[T2]):
         reasoning_effort: Optional[ReasoningEffort] = None,
         response_format: Optional[type[T2]] = None,
         on_tool_round_complete: Optional[Callable[[], Awaitable[None]]] = None,
+        stream: bool = False,
         **kwargs,
     ) -> None:
         logger.debug(f"{identify=}")
@@ -268,6 +436,7 @@ class MessageFetcher(Generic[T2]):
             reasoning_effort,
             response_format,
             on_tool_round_complete,
+            stream,
         )
 
     @classmethod
@@ -287,14 +456,12 @@ class MessageFetcher(Generic[T2]):
         reasoning_effort: Optional[ReasoningEffort] = None,
         response_format: Optional[type[T2]] = None,
         on_tool_round_complete: Optional[Callable[[], Awaitable[None]]] = None,
+        stream: bool = False,
         **kwargs,
     ) -> "MessageFetcher":
         """异步创建 MessageFetcher 实例，正确处理模型配置获取"""
         if identify is None:
-            stack = inspect.stack()[1]
-            function_name = stack.function
-            plugin_name = get_module_name(inspect.getmodule(stack[0]))
-            identify = f"{plugin_name}.{function_name}"
+            identify = get_caller_identify()
 
         if model is None:
             model = await get_model_for_identify(identify)
@@ -312,6 +479,7 @@ class MessageFetcher(Generic[T2]):
             reasoning_effort,
             response_format,
             on_tool_round_complete,
+            stream,
             **kwargs,
         )
 
@@ -323,6 +491,11 @@ class MessageFetcher(Generic[T2]):
         async for msg in self.session.fetch_llm_response():
             yield msg
 
+    async def fetch_delta_stream(self) -> AsyncGenerator[T2 | str, None]:
+        """逐段产出回复内容（需以 stream=True 创建，否则与 fetch_message_stream 相同）"""
+        async for msg in self.session.fetch_llm_response(deltas=True):
+            yield msg
+
     def get_messages(self) -> Messages:
         return self.session.messages
 
@@ -343,10 +516,7 @@ async def fetch_message(
     **kwargs,
 ) -> str:
     if identify is None:
-        stack = inspect.stack()[1]
-        function_name = stack.function
-        plugin_name = get_module_name(inspect.getmodule(stack[0]))
-        identify = f"{plugin_name}.{function_name}"
+        identify = get_caller_identify()
 
     fetcher = await MessageFetcher.create(
         messages,
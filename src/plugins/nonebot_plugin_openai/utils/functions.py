@@ -68,6 +68,7 @@ async def create_function_list(functions: list[Callable[..., Awaitable[Any]]], *
                 func=func,
                 description=func_info.description.format(**kwargs),
                 parameters=parameters,
+                parallel=func_info.parallel,
             )
         )
     return func_list
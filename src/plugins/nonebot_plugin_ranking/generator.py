@@ -7,19 +7,23 @@ from .lang import lang
 from .types import RankingData, UserDataWithIndex
 
 
+async def get_user_with_index(data: RankingData, index: int, user_id: str) -> UserDataWithIndex:
+    return {
+        "nickname": (await get_user(data["user_id"])).get_nickname(),
+        "user_id": data["user_id"],
+        "data": data.get("display", data["data"]),
+        "index": index,
+        "info": data["info"] or await lang.text("image.info", user_id, data["user_id"]),
+        "display": data.get("display"),
+    }
+
+
 async def find_user(ranked_data: list[RankingData], user_id: str) -> Optional[UserDataWithIndex]:
     index = 0
     for data in ranked_data:
         index += 1
         if data["user_id"] == user_id:
-            return {
-                "nickname": (await get_user(user_id)).get_nickname(),
-                "user_id": user_id,
-                "data": data.get("display", data["data"]),
-                "index": index,
-                "info": data["info"] or await lang.text("image.info", user_id, data["user_id"]),
-                "display": data.get("display"),
-            }
+            return await get_user_with_index(data, index, user_id)
 
 
 async def get_users(ranked_data: list[RankingData], user_id: str, limit: int = 7) -> list[UserData]:
@@ -40,13 +44,26 @@ async def get_users(ranked_data: list[RankingData], user_id: str, limit: int = 7
     return users
 
 
-async def generate_image(ranked_data: list[RankingData], user_id: str, title: str, limit: int = 7) -> bytes:
+async def generate_image(
+    ranked_data: list[RankingData],
+    user_id: str,
+    title: str,
+    limit: int = 7,
+    me: Optional[tuple[int, RankingData]] = None,
+) -> bytes:
+    """
+    生成排行榜图片
+
+    :param ranked_data: 已排序的排行数据
+    :param me: 排行数据只包含前几名时，由调用方给出用户自身的名次与数据
+    """
     return await render_template(
         "ranking.html.jinja",
         title,
         user_id,
         {
-            "me": await find_user(ranked_data, user_id),
+            "me": await get_user_with_index(me[1], me[0], user_id) if me else await find_user(ranked_data, user_id),
             "users": await get_users(ranked_data, user_id, limit),
         },
+        result_cache=True,
     )
@@ -18,4 +18,5 @@ require("nonebot_plugin_orm")
 
 from .render import render_template, generate_render_keys
 from .cache import creator
+from .chart import render_chart, TextChart, LineChart, BarChart, HorizontalBarChart
 from . import __main__
@@ -1,16 +1,31 @@
-from typing import Awaitable, Callable, Optional
-from nonebot.log import logger
-from nonebot import get_driver, get_bots
-import aiofiles
+import asyncio
+import dataclasses
+import datetime
 import hashlib
+import json
+import time
+from collections import OrderedDict
+from pathlib import Path
+from types import BuiltinFunctionType, FunctionType
+from typing import Any, Awaitable, Callable, Optional
+
+import aiofiles
+from nonebot import get_driver, get_bots
+from nonebot.log import logger
 from nonebot_plugin_localstore import get_cache_dir
+from pydantic import BaseModel
+
 from nonebot_plugin_larklang.__main__ import get_languages
+from nonebot_plugin_larkutils import LRUCache
+from .engine import render_priority
 from .theme import get_themes
 from .config import config
 
 CACHE_CREATOR_TYPE = Callable[[str], Awaitable[bytes]]
 creator_functions: dict[str, CACHE_CREATOR_TYPE] = {}
 cache_dir = get_cache_dir("nonebot-plugin-render")
+# 预渲染任务在渲染队列中的优先级（数值越大越靠后）
+PRERENDER_PRIORITY = 10
 
 
 def creator(template_name: str):
@@ -21,35 +36,165 @@ def creator(template_name: str):
     return d
 
 
+def get_source_version() -> str:
+    """模板与语言文件的版本标识，任一文件变动后旧的缓存键将不再命中"""
+    mtimes = [
+        path.stat().st_mtime_ns
+        for base in (Path("src/templates"), Path("src/lang"))
+        if base.exists()
+        for path in base.rglob("*")
+        if path.is_file()
+    ]
+    return f"{len(mtimes)}:{max(mtimes, default=0)}"
+
+
+source_version = get_source_version()
+
+
+def _canonicalize(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=repr)
+    if isinstance(value, bytes):
+        return hashlib.sha256(value).hexdigest()
+    if isinstance(value, (FunctionType, BuiltinFunctionType)) and "<" not in value.__qualname__:
+        # 模板中传入的辅助函数（如 len）按名称参与计算
+        return f"{value.__module__}.{value.__qualname__}"
+    # 函数等无法可靠序列化的对象不参与缓存
+    raise TypeError(f"Object of type {type(value).__name__} is not cacheable")
+
+
+def get_cache_key(template: str, lang: str, theme: str, **inputs: Any) -> Optional[str]:
+    """根据模板输入计算内容寻址的缓存键，输入无法规范化时返回 None（不缓存）"""
+    try:
+        data = json.dumps(
+            {"template": template, "lang": lang, "theme": theme, "version": source_version, "inputs": inputs},
+            sort_keys=True,
+            ensure_ascii=False,
+            default=_canonicalize,
+        )
+    except (TypeError, ValueError):
+        return None
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def get_creator_cache_key(template: str, lang: str, theme: str) -> str:
+    return hashlib.sha256(
+        f"mlrc::--template={template};--lang={lang};--theme={theme};--version={source_version}".encode()
+    ).hexdigest()
+
+
+class RenderCache:
+    """渲染结果缓存，内存 LRU 在前，磁盘目录在后；磁盘部分超出容量时按最久未使用淘汰"""
+
+    def __init__(self, path: Path, memory_size: int, disk_size: int, ttl: int) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.disk_size = disk_size
+        self.memory: LRUCache[str, bytes] = LRUCache(memory_size, ttl)
+        self.index: OrderedDict[str, int] = OrderedDict()
+        self.used = 0
+        self.load_index()
+
+    def load_index(self) -> None:
+        files = sorted((f for f in self.path.iterdir() if f.is_file()), key=lambda f: f.stat().st_mtime)
+        for file in files:
+            size = file.stat().st_size
+            self.index[file.name] = size
+            self.used += size
+        self.evict()
+
+    def evict(self) -> None:
+        while self.used > self.disk_size and self.index:
+            key, size = self.index.popitem(last=False)
+            self.used -= size
+            self.path.joinpath(key).unlink(missing_ok=True)
+
+    def remove(self, key: str) -> None:
+        self.memory.pop(key)
+        if (size := self.index.pop(key, None)) is not None:
+            self.used -= size
+            self.path.joinpath(key).unlink(missing_ok=True)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        if (data := self.memory.get(key)) is not None:
+            return data
+        if key not in self.index:
+            return None
+        path = self.path.joinpath(key)
+        try:
+            if time.time() - path.stat().st_mtime >= self.ttl:
+                self.remove(key)
+                return None
+            async with aiofiles.open(path, "rb") as f:
+                data = await f.read()
+        except FileNotFoundError:
+            self.remove(key)
+            return None
+        self.index.move_to_end(key)
+        self.memory.set(key, data)
+        return data
+
+    async def set(self, key: str, data: bytes) -> None:
+        self.memory.set(key, data)
+        async with aiofiles.open(self.path.joinpath(key), "wb") as f:
+            await f.write(data)
+        self.used += len(data) - self.index.pop(key, 0)
+        self.index[key] = len(data)
+        self.evict()
+
+
+render_cache = RenderCache(
+    cache_dir,
+    config.render_cache_memory_items,
+    config.render_cache_disk_size * 1024 * 1024,
+    config.render_cache_ttl,
+)
+
+
+async def create_cache(template: str, function: CACHE_CREATOR_TYPE, lang: str, theme: str) -> None:
+    try:
+        image = await function(f"mlsid::--lang={lang};--theme={theme};--ignore-cache=y")
+    except Exception as e:
+        logger.warning(f"为 {template=} {lang=} {theme=} 创建 Render 缓存失败: {e}")
+        return
+    await render_cache.set(get_creator_cache_key(template, lang, theme), image)
+    logger.debug(f"成功为 {template=} {lang=} {theme=} 创建 Render 缓存！")
+
+
 async def setup_cache() -> None:
+    render_priority.set(PRERENDER_PRIORITY)
     languages = get_languages().keys()
     themes = (await get_themes()).keys()
-    for template, function in creator_functions.items():
-        for lang in languages:
-            for theme in themes:
-                image = await function(f"mlsid::--lang={lang};--theme={theme};--ignore-cache=y")
-                f_name = hashlib.sha256(
-                    f"mlrc::--template={template};--lang={lang};--theme={theme}".encode()
-                ).hexdigest()
-                async with aiofiles.open(cache_dir.joinpath(f_name), "wb") as f:
-                    await f.write(image)
-                logger.debug(f"成功为 {template=} {lang=} {theme=} 创建 Render 缓存！")
+    await asyncio.gather(
+        *[
+            create_cache(template, function, lang, theme)
+            for template, function in creator_functions.items()
+            for lang in languages
+            for theme in themes
+        ]
+    )
     logger.success("Render 缓存创建完成！")
 
 
 @get_driver().on_bot_connect
 async def _() -> None:
-    for file in cache_dir.iterdir():
-        if file.is_file():
-            file.unlink()
     if config.render_cache and len(get_bots().keys()) <= 1:
-        await setup_cache()
+        # 在后台以低优先级预渲染，不阻塞 bot 连接
+        asyncio.create_task(setup_cache())
 
 
 async def get_cache(template: str, lang: str, theme: str) -> Optional[bytes]:
-    f_name = hashlib.sha256(f"mlrc::--template={template};--lang={lang};--theme={theme}".encode()).hexdigest()
-    path = cache_dir.joinpath(f_name)
-    if path.exists():
-        async with aiofiles.open(path, "rb") as f:
-            return await f.read()
-    return None
+    if template not in creator_functions:
+        return None
+    return await render_cache.get(get_creator_cache_key(template, lang, theme))
+
+
+async def set_cache(template: str, lang: str, theme: str, image: bytes) -> None:
+    if template in creator_functions:
+        await render_cache.set(get_creator_cache_key(template, lang, theme), image)
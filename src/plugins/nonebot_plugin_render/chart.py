@@ -0,0 +1,72 @@
+#  Moonlark - A new ChatBot
+#  Copyright (C) 2026  Moonlark Development Team
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ##############################################################################
+
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from moonlark_chart import BarChart, Chart, HorizontalBarChart, LineChart, TextChart, prewarm
+from nonebot import get_driver
+from nonebot.log import logger
+
+from .config import config
+
+executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global executor
+    if executor is None:
+        # 机器人进程是多线程的，fork 出的子进程可能继承被其他线程持有的锁而死锁，
+        # 因此从单线程的 forkserver（不支持时使用 spawn）启动全新的工作进程，由 prewarm 注册字体
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("forkserver")
+            context.set_forkserver_preload(["moonlark_chart"])
+        else:
+            context = multiprocessing.get_context("spawn")
+        executor = ProcessPoolExecutor(config.render_chart_workers, mp_context=context, initializer=prewarm)
+    return executor
+
+
+async def render_chart(chart: Chart) -> bytes:
+    """在进程池中绘制图表，返回 PNG 数据"""
+    global executor
+    loop = asyncio.get_running_loop()
+    pool = get_executor()
+    try:
+        return await loop.run_in_executor(pool, chart.render)
+    except BrokenProcessPool:
+        # 工作进程意外退出后进程池不可再用，关闭后重建并重试一次（并发的请求可能已经重建过）
+        if executor is pool:
+            logger.warning("Chart process pool is broken, recreating")
+            pool.shutdown(wait=False, cancel_futures=True)
+            executor = None
+        return await loop.run_in_executor(get_executor(), chart.render)
+
+
+@get_driver().on_startup
+async def _() -> None:
+    # 提前启动工作进程，避免首次请求时才等待进程启动
+    await asyncio.get_running_loop().run_in_executor(get_executor(), prewarm)
+
+
+@get_driver().on_shutdown
+async def _() -> None:
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
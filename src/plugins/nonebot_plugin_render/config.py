@@ -1,3 +1,4 @@
+from typing import Literal
 from pydantic import BaseModel
 from nonebot import get_plugin_config
 
@@ -8,6 +9,26 @@ class Config(BaseModel):
     render_default_theme: str = "default"
     render_viewport: dict = {"width": 500, "height": 10}
     render_cache: bool = True
+    # 常驻浏览器页面数量（同时也是最大并发渲染数）
+    render_page_pool_size: int = 2
+    # 渲染队列长度，队列已满时新的渲染请求将等待
+    render_queue_size: int = 64
+    # 渲染结果缓存（内容寻址），仅对调用 render_template 时传入 result_cache=True 的渲染生效
+    render_result_cache: bool = True
+    render_cache_memory_items: int = 128
+    # 磁盘缓存容量上限（MiB）
+    render_cache_disk_size: int = 256
+    # 缓存有效期（秒）
+    render_cache_ttl: int = 3600
+    # 输出图片格式，可按模板名单独指定，如 {"fight_log.html.jinja": "webp"}
+    render_output_format: Literal["png", "webp", "jpeg"] = "png"
+    render_output_formats: dict[str, Literal["png", "webp", "jpeg"]] = {}
+    # WebP / JPEG 输出质量
+    render_output_quality: int = 90
+    # 图片后处理（缩放、格式转换）线程数
+    render_postprocess_workers: int = 2
+    # 图表（matplotlib）绘制进程数
+    render_chart_workers: int = 2
 
 
 config = get_plugin_config(Config)
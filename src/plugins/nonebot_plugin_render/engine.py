@@ -0,0 +1,212 @@
+import asyncio
+import itertools
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+from nonebot import get_driver
+from nonebot.log import logger
+from nonebot_plugin_htmlrender import get_browser
+from playwright.async_api import Page
+
+from .config import config
+
+# 未显式指定优先级时使用的渲染优先级（数值越小越优先）
+render_priority: ContextVar[int] = ContextVar("render_priority", default=0)
+
+
+@dataclass
+class RenderTiming:
+    """单次渲染各阶段用时（毫秒）"""
+
+    template: str = ""
+    queue_wait: float = 0.0
+    render: float = 0.0
+    screenshot: float = 0.0
+    encode: float = 0.0
+
+    @property
+    def total(self) -> float:
+        return self.queue_wait + self.render + self.screenshot + self.encode
+
+
+class RenderStats:
+    """最近若干次渲染的用时统计"""
+
+    def __init__(self, size: int = 256) -> None:
+        self.timings: deque[RenderTiming] = deque(maxlen=size)
+
+    def record(self, timing: RenderTiming) -> None:
+        self.timings.append(timing)
+        logger.debug(
+            f"[Render] {timing.template}: 排队 {timing.queue_wait:.1f}ms, 模板 {timing.render:.1f}ms, "
+            f"截图 {timing.screenshot:.1f}ms, 编码 {timing.encode:.1f}ms"
+        )
+
+    def summary(self) -> dict[str, float]:
+        if not self.timings:
+            return {}
+        count = len(self.timings)
+        totals = sorted(t.total for t in self.timings)
+        return {
+            "count": count,
+            "queue_wait": sum(t.queue_wait for t in self.timings) / count,
+            "render": sum(t.render for t in self.timings) / count,
+            "screenshot": sum(t.screenshot for t in self.timings) / count,
+            "encode": sum(t.encode for t in self.timings) / count,
+            "p50": totals[count // 2],
+            "p99": totals[min(count - 1, int(count * 0.99))],
+        }
+
+
+@dataclass(order=True)
+class RenderJob:
+    priority: int
+    sequence: int
+    html: str = field(compare=False)
+    template_path: str = field(compare=False)
+    viewport: dict = field(compare=False)
+    timing: RenderTiming = field(compare=False)
+    future: asyncio.Future[bytes] = field(compare=False)
+    queued_at: float = field(compare=False, default_factory=time.perf_counter)
+
+
+class PagePool:
+    """常驻的浏览器页面池，避免每次渲染都创建、销毁页面"""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.idle: asyncio.Queue[Page] = asyncio.Queue()
+        self.created = 0
+
+    async def acquire(self) -> Page:
+        while not self.idle.empty():
+            page = self.idle.get_nowait()
+            if not page.is_closed():
+                return page
+            self.created -= 1
+        if self.created < self.size:
+            self.created += 1
+            try:
+                return await self.create_page()
+            except Exception:
+                self.created -= 1
+                raise
+        page = await self.idle.get()
+        if page.is_closed():
+            self.created -= 1
+            return await self.acquire()
+        return page
+
+    async def create_page(self) -> Page:
+        browser = await get_browser()
+        page = await browser.new_page(device_scale_factor=2)
+        page.on("console", lambda msg: logger.debug(f"浏览器控制台: {msg.text}"))
+        return page
+
+    def release(self, page: Page) -> None:
+        self.idle.put_nowait(page)
+
+    async def discard(self, page: Page) -> None:
+        self.created -= 1
+        try:
+            await page.close()
+        except Exception:
+            pass
+
+    async def close(self) -> None:
+        while not self.idle.empty():
+            await self.discard(self.idle.get_nowait())
+
+
+class RenderEngine:
+    """Render 渲染引擎
+
+    渲染请求进入有界优先队列（数值越小越优先），由与页面池大小相同数量的 worker 依次处理；
+    队列已满时提交方会等待，从而对突发请求形成背压。
+    """
+
+    def __init__(self, pool_size: int, queue_size: int) -> None:
+        self.pool = PagePool(pool_size)
+        self.queue: asyncio.PriorityQueue[RenderJob] = asyncio.PriorityQueue(queue_size)
+        self.workers: list[asyncio.Task] = []
+        self.sequence = itertools.count()
+        self.stats = RenderStats()
+
+    def start(self) -> None:
+        if self.workers:
+            return
+        self.workers = [asyncio.create_task(self.worker()) for _ in range(self.pool.size)]
+
+    async def stop(self) -> None:
+        for task in self.workers:
+            task.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+        await self.pool.close()
+
+    async def screenshot(
+        self,
+        html: str,
+        template_path: str,
+        viewport: dict,
+        timing: RenderTiming,
+        priority: Optional[int] = None,
+    ) -> bytes:
+        self.start()
+        job = RenderJob(
+            render_priority.get() if priority is None else priority,
+            next(self.sequence),
+            html,
+            template_path,
+            viewport,
+            timing,
+            asyncio.get_running_loop().create_future(),
+        )
+        await self.queue.put(job)
+        return await job.future
+
+    async def worker(self) -> None:
+        while True:
+            job = await self.queue.get()
+            try:
+                if job.future.cancelled():
+                    continue
+                job.timing.queue_wait = (time.perf_counter() - job.queued_at) * 1000
+                try:
+                    job.future.set_result(await self.run_job(job))
+                except Exception as e:
+                    if not job.future.done():
+                        job.future.set_exception(e)
+            finally:
+                self.queue.task_done()
+
+    async def run_job(self, job: RenderJob) -> bytes:
+        page = await self.pool.acquire()
+        begin = time.perf_counter()
+        try:
+            await page.set_viewport_size({"width": job.viewport["width"], "height": job.viewport["height"]})
+            # 每个任务都重新导航以获得新的文档与 JS 全局环境，否则模板顶层的 let/const 在同一页面上第二次渲染时会重复声明
+            await page.goto(job.template_path)
+            await page.set_content(job.html, wait_until="networkidle")
+            image = await page.screenshot(full_page=True, type="png", timeout=30_000)
+        except Exception:
+            await self.pool.discard(page)
+            raise
+        self.pool.release(page)
+        job.timing.screenshot = (time.perf_counter() - begin) * 1000
+        return image
+
+    @property
+    def queue_depth(self) -> int:
+        return self.queue.qsize()
+
+
+engine = RenderEngine(config.render_page_pool_size, config.render_queue_size)
+
+
+@get_driver().on_shutdown
+async def _() -> None:
+    await engine.stop()
@@ -0,0 +1,47 @@
+import asyncio
+import io
+from concurrent.futures import ThreadPoolExecutor
+from typing import Literal
+
+from nonebot import get_driver
+from PIL import Image
+
+from .config import config
+
+ImageFormat = Literal["png", "webp", "jpeg"]
+
+# Pillow 在缩放与编码时会释放 GIL，使用独立线程池即可避免阻塞事件循环
+executor = ThreadPoolExecutor(config.render_postprocess_workers, thread_name_prefix="render-postprocess")
+
+
+def get_output_format(template: str) -> ImageFormat:
+    return config.render_output_formats.get(template, config.render_output_format)
+
+
+def process_image(image: bytes, scale: float = 1.0, image_format: ImageFormat = "png", quality: int = 90) -> bytes:
+    """缩放并转换图片格式（在线程池中执行）"""
+    with Image.open(io.BytesIO(image)) as img:
+        if scale != 1.0:
+            img = img.resize((int(img.width * scale), int(img.height * scale)), Image.Resampling.LANCZOS)
+        if image_format == "jpeg" and img.mode != "RGB":
+            img = img.convert("RGB")
+        output_buffer = io.BytesIO()
+        if image_format == "png":
+            img.save(output_buffer, format="PNG")
+        else:
+            img.save(output_buffer, format=image_format.upper(), quality=quality)
+        return output_buffer.getvalue()
+
+
+async def postprocess(image: bytes, resize: bool, image_format: ImageFormat) -> bytes:
+    """渲染后处理，无需处理时原样返回截图"""
+    if not resize and image_format == "png":
+        return image
+    return await asyncio.get_running_loop().run_in_executor(
+        executor, process_image, image, 0.75 if resize else 1.0, image_format, config.render_output_quality
+    )
+
+
+@get_driver().on_shutdown
+async def _() -> None:
+    executor.shutdown(wait=False, cancel_futures=True)
@@ -1,21 +1,16 @@
 from pathlib import Path
-import inspect
-from types import ModuleType
 from typing import Optional
 from jinja2 import Environment, FileSystemLoader
-from nonebot import get_plugin_by_module_name
-from nonebot_plugin_htmlrender import html_to_pic
-from nonebot_plugin_orm import get_session
 from nonebot_plugin_larklang.__main__ import get_user_language, LangHelper
-from nonebot_plugin_larkutils import parse_special_user_id
+from nonebot_plugin_larkutils import parse_special_user_id, get_caller_plugin_name
 from .lang import lang
 from .config import config
-from .cache import get_cache
+from .cache import get_cache, set_cache, get_cache_key, render_cache
+from .engine import engine, RenderTiming
+from .postprocess import get_output_format, postprocess, process_image
 from . import theme
 from os import getcwd
-
-from PIL import Image
-import io
+import time
 
 file_loader = FileSystemLoader(Path("./src/templates"))
 env = Environment(
@@ -39,23 +34,8 @@ async def render_template_to_text(
     return await template.render_async(main_title=title, footer=footer, base=base, **kwargs)
 
 
-def get_plugin_name(module: ModuleType | None) -> Optional[str]:
-    if module is None:
-        return None
-    plugin = get_plugin_by_module_name(module.__name__)
-    if plugin is None:
-        return None
-    return plugin.name
-
-
 def resize_png_to_75_percent(png_bytes: bytes) -> bytes:
-    with Image.open(io.BytesIO(png_bytes)) as img:
-        new_size = (int(img.width * 0.75), int(img.height * 0.75))
-        resized_img = img.resize(new_size, Image.Resampling.LANCZOS)
-
-        output_buffer = io.BytesIO()
-        resized_img.save(output_buffer, format="PNG")
-        return output_buffer.getvalue()
+    return process_image(png_bytes, 0.75)
 
 
 async def generate_render_keys(
@@ -80,24 +60,53 @@ async def render_template(
     resize: bool = False,
     viewport: dict | None = None,
     background_url: str = DEFAULT_BACKGROUND_URL,
+    priority: Optional[int] = None,
+    result_cache: bool = False,
 ) -> bytes:
-    if user_id.startswith("mlsid::") and parse_special_user_id(user_id).get("ignore-cache", "n") == "y":
-        cache = False
-    module = inspect.getmodule(inspect.stack()[1][0])
-    plugin_name = get_plugin_name(module) or "nonebot-plugin-render"
+    if user_id.startswith("mlsid::") and parse_special_user_id(user_id).get("--ignore-cache", "n") == "y":
+        cache = result_cache = False
+    plugin_name = get_caller_plugin_name() or "nonebot-plugin-render"
     footer = await lang.text("render.footer", user_id, plugin_name)
     t, base = await get_base(user_id)
-    async with get_session() as session:
-        if cache and (c := await get_cache(name, await get_user_language(user_id, session), t)):
-            return c
+    language = await get_user_language(user_id)
+    if cache and (c := await get_cache(name, language, t)):
+        return c
     if keys:
         templates = templates | {"text": keys}
     templates["background_url"] = background_url
-    image = await html_to_pic(
-        await render_template_to_text(name, title, footer, templates, base),
-        template_path=Path(getcwd()).joinpath(f"src/templates").as_uri(),
-        viewport=viewport or config.render_viewport,
+    image_format = get_output_format(name)
+    cache_key = None
+    if result_cache and config.render_result_cache:
+        cache_key = get_cache_key(
+            name,
+            language,
+            t,
+            title=title,
+            plugin=plugin_name,
+            templates=templates,
+            viewport=viewport,
+            resize=resize,
+            image_format=image_format,
+        )
+    if cache_key is not None and (c := await render_cache.get(cache_key)) is not None:
+        return c
+    timing = RenderTiming(name)
+    begin = time.perf_counter()
+    html = await render_template_to_text(name, title, footer, templates, base)
+    timing.render = (time.perf_counter() - begin) * 1000
+    image = await engine.screenshot(
+        html,
+        Path(getcwd()).joinpath("src/templates").as_uri(),
+        viewport or config.render_viewport,
+        timing,
+        priority,
     )
-    if resize:
-        return resize_png_to_75_percent(image)
+    begin = time.perf_counter()
+    image = await postprocess(image, resize, image_format)
+    timing.encode = (time.perf_counter() - begin) * 1000
+    engine.stats.record(timing)
+    if cache_key is not None:
+        await render_cache.set(cache_key, image)
+    if cache:
+        await set_cache(name, language, t, image)
     return image
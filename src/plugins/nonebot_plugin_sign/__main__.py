@@ -336,7 +336,8 @@ class SignHandler:
         user = await get_user(self.user_id)
         self._templates["nickname"] = user.nickname
         self._templates["uid"] = await lang.text("image.uid", self.user_id, self.user_id)
-        self._templates["avatar"] = base64.b64encode(user.avatar).decode() if user.avatar is not None else None
+        avatar = await user.load_avatar()
+        self._templates["avatar"] = base64.b64encode(avatar).decode() if avatar is not None else None
 
         # 横版 setu 背景
         try:
@@ -29,7 +29,8 @@ from nonebot_plugin_apscheduler import scheduler
 from nonebot_plugin_orm import get_session
 from nonebot_plugin_bots.__main__ import bots_status
 from nonebot_plugin_larklang.__main__ import LangHelper
-from nonebot_plugin_larkutils import get_main_account
+from nonebot_plugin_larkutils import get_main_account, telemetry
+from nonebot_plugin_larkutils.telemetry import TelemetryMetrics
 from nonebot_plugin_render import render_template
 from nonebot_plugin_render.render import generate_render_keys
 from nonebot.adapters import Event, Bot
@@ -37,7 +38,6 @@ from nonebot.matcher import Matcher, matchers
 from fastapi import Request, status
 from fastapi.exceptions import HTTPException
 from sqlalchemy import select, func, delete
-from sqlalchemy.exc import IntegrityError
 from .config import config
 from .matcher import simple_run
 from .models import CommandUsage, HandlerResultRecord, ExceptionRecord, OpenAIHistoryRecord
@@ -58,12 +58,14 @@ MAX_OPENAI_HISTORY = 20
 
 
 async def get_command_usage() -> dict[str, int]:
+    await telemetry.flush()
     async with get_session() as session:
         result = await session.execute(select(CommandUsage))
         return {row.command_name: row.usage_count for row in result.scalars().all()}
 
 
 async def get_handler_results() -> list[HandlerResult]:
+    await telemetry.flush()
     async with get_session() as session:
         result = await session.execute(
             select(HandlerResultRecord).order_by(HandlerResultRecord.id.desc()).limit(MAX_HANDLER_RESULTS)
@@ -81,6 +83,7 @@ async def get_handler_results() -> list[HandlerResult]:
 
 
 async def get_exceptions() -> list[ExceptionStatus]:
+    await telemetry.flush()
     async with get_session() as session:
         result = await session.execute(
             select(ExceptionRecord).order_by(ExceptionRecord.id.desc()).limit(MAX_EXCEPTIONS)
@@ -138,22 +141,7 @@ async def _(matcher: Matcher, state: T_State) -> None:
             return
     else:
         return
-    async with get_session() as session:
-        result = await session.execute(select(CommandUsage).where(CommandUsage.command_name == command_name))
-        record = result.scalar_one_or_none()
-        if record:
-            record.usage_count += 1
-            await session.commit()
-        else:
-            try:
-                session.add(CommandUsage(command_name=command_name, usage_count=1))
-                await session.commit()
-            except IntegrityError:
-                await session.rollback()
-                result = await session.execute(select(CommandUsage).where(CommandUsage.command_name == command_name))
-                if record := result.scalar_one_or_none():
-                    record.usage_count += 1
-                await session.commit()
+    telemetry.increment(CommandUsage, {"command_name": command_name}, "usage_count")
     state["status_report_command_name"] = command_name
     state["original_simple_run_method"] = matcher.simple_run
 
@@ -166,17 +154,16 @@ async def _(matcher: Matcher, state: T_State, event: Event) -> None:
         message = str(event.get_message())
     except ValueError:
         message = ""
-    async with get_session() as session:
-        session.add(
-            HandlerResultRecord(
-                command_name=state.get("status_report_command_name", ""),
-                message=message,
-                result=state["handler_results"],
-                matcher=str(matcher),
-                timestamp=datetime.now(),
-            )
-        )
-        await session.commit()
+    telemetry.add_event(
+        HandlerResultRecord,
+        {
+            "command_name": state.get("status_report_command_name", ""),
+            "message": message,
+            "result": state["handler_results"],
+            "matcher": str(matcher),
+            "timestamp": datetime.now(),
+        },
+    )
     matcher.simple_run = state["original_simple_run_method"]
 
 
@@ -243,17 +230,16 @@ async def _(event: Event, bot: Bot, exception: Optional[Exception]) -> None:
     except ValueError:
         message = None
         session_id = None
-    async with get_session() as session:
-        session.add(
-            ExceptionRecord(
-                exception="".join(traceback.format_exception(exception)),
-                session=session_id,
-                message=str(message),
-                bot_id=bot.self_id,
-                timestamp=datetime.now(),
-            )
-        )
-        await session.commit()
+    telemetry.add_event(
+        ExceptionRecord,
+        {
+            "exception": "".join(traceback.format_exception(exception)),
+            "session": session_id,
+            "message": str(message),
+            "bot_id": bot.self_id,
+            "timestamp": datetime.now(),
+        },
+    )
 
 
 async def report_openai_history(messages: "Messages", identify: str, model: str) -> None:
@@ -352,6 +338,12 @@ async def get_status_commands(token: str, salt: str) -> dict[str, int]:
     return await get_command_usage()
 
 
+@app.get("/admin/status/telemetry")
+async def get_status_telemetry(token: str, salt: str) -> TelemetryMetrics:
+    await verify_admin(token, salt)
+    return telemetry.get_metrics()
+
+
 @app.get("/admin/status/handlers")
 async def get_status_handlers(token: str, salt: str) -> list[HandlerResult]:
     await verify_admin(token, salt)
@@ -8,6 +8,7 @@ from nonebot_plugin_apscheduler import scheduler
 from nonebot_plugin_larkuser import get_registered_user_ids
 from nonebot_plugin_larkutils import get_group_id, get_user_id
 from nonebot_plugin_last_seen.models import LastSeenRecord
+from nonebot_plugin_last_seen.tracker import load_last_seen
 from nonebot_plugin_orm import get_session
 from nonebot_plugin_ranking import generate_image
 from nonebot_plugin_ranking.types import RankingData
@@ -38,16 +39,12 @@ async def _(bot: Bot, event: Event, user_id: str = get_user_id()) -> None:
         if result is not None:
             return
 
-        last_seen = await session.scalar(
-            select(LastSeenRecord.last_seen).where(
-                LastSeenRecord.user_id == user_id,
-                LastSeenRecord.session_id == GLOBAL_SESSION_ID,
-            ),
-        )
+        # 最后上线时间延迟写入数据库，需从内存读取
+        last_seen = await load_last_seen(user_id, GLOBAL_SESSION_ID)
         if last_seen is None:
             valid = True
         else:
-            delta = now - last_seen
+            delta = now - last_seen.last_seen
             valid = delta > timedelta(hours=1)
 
         record = RiseData(user_id=user_id, record_date=today, wake_time=now, valid=valid)
@@ -0,0 +1,156 @@
+"""本地的 OpenAI 兼容假服务端，用于测试 nonebot_plugin_openai 的请求逻辑
+
+在测试中使用：
+
+    server = FakeOpenAIServer()
+    server.replies.append(FakeReply(content="你好", tool_calls=[("get_time", {})]))
+    client = server.create_client()
+
+也可以单独运行（未预设回复时会复述最后一条用户消息），用于手动测试：
+
+    python tests/fake_openai.py --port 8900
+    OPENAI_BASE_URL=http://127.0.0.1:8900 OPENAI_API_KEY=fake nb run
+"""
+
+import asyncio
+import json
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, AsyncGenerator
+
+
+@dataclass
+class FakeReply:
+    content: str = ""
+    tool_calls: list[tuple[str, dict[str, Any]]] = field(default_factory=list)
+    # 流式传输时每个分片之间的间隔（秒）
+    chunk_delay: float = 0.0
+    # 流式传输时每个分片的最大长度
+    chunk_size: int = 4
+
+
+class FakeOpenAIServer:
+    def __init__(self) -> None:
+        self.replies: list[FakeReply] = []
+        self.requests: list[dict[str, Any]] = []
+
+    def next_reply(self, body: dict[str, Any]) -> FakeReply:
+        if self.replies:
+            return self.replies.pop(0)
+        user_messages = [msg for msg in body.get("messages", []) if msg.get("role") == "user"]
+        content = user_messages[-1]["content"] if user_messages else ""
+        return FakeReply(content=content if isinstance(content, str) else json.dumps(content, ensure_ascii=False))
+
+    @staticmethod
+    def get_tool_calls(reply: FakeReply) -> list[dict[str, Any]]:
+        return [
+            {
+                "id": f"call_{uuid.uuid4().hex[:8]}",
+                "type": "function",
+                "function": {"name": name, "arguments": json.dumps(arguments, ensure_ascii=False)},
+            }
+            for name, arguments in reply.tool_calls
+        ]
+
+    def completion(self, body: dict[str, Any], reply: FakeReply) -> dict[str, Any]:
+        tool_calls = self.get_tool_calls(reply)
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [
+                {
+                    "index": 0,
+                    "finish_reason": "tool_calls" if tool_calls else "stop",
+                    "message": {
+                        "role": "assistant",
+                        "content": reply.content or None,
+                        "tool_calls": tool_calls or None,
+                    },
+                }
+            ],
+        }
+
+    async def completion_stream(self, body: dict[str, Any], reply: FakeReply) -> AsyncGenerator[str, None]:
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+
+        def chunk(delta: dict[str, Any], finish_reason: str | None = None) -> str:
+            data = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model", "fake"),
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            return f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+        yield chunk({"role": "assistant", "content": ""})
+        for i in range(0, len(reply.content), reply.chunk_size):
+            await asyncio.sleep(reply.chunk_delay)
+            yield chunk({"content": reply.content[i : i + reply.chunk_size]})
+        tool_calls = self.get_tool_calls(reply)
+        for index, call in enumerate(tool_calls):
+            await asyncio.sleep(reply.chunk_delay)
+            yield chunk(
+                {
+                    "tool_calls": [
+                        {
+                            "index": index,
+                            "id": call["id"],
+                            "type": "function",
+                            "function": {"name": call["function"]["name"]},
+                        }
+                    ]
+                }
+            )
+            arguments = call["function"]["arguments"]
+            for i in range(0, len(arguments), reply.chunk_size):
+                await asyncio.sleep(reply.chunk_delay)
+                yield chunk(
+                    {"tool_calls": [{"index": index, "function": {"arguments": arguments[i : i + reply.chunk_size]}}]}
+                )
+        yield chunk({}, "tool_calls" if tool_calls else "stop")
+        yield "data: [DONE]\n\n"
+
+    def create_app(self) -> Any:
+        from fastapi import FastAPI, Request
+        from fastapi.responses import StreamingResponse
+
+        app = FastAPI()
+
+        @app.post("/chat/completions")
+        async def _(request: Request) -> Any:
+            body = await request.json()
+            self.requests.append(body)
+            reply = self.next_reply(body)
+            if body.get("stream"):
+                return StreamingResponse(self.completion_stream(body, reply), media_type="text/event-stream")
+            return self.completion(body, reply)
+
+        return app
+
+    def create_client(self) -> Any:
+        """创建直接连接到该假服务端（不经过网络）的 AsyncOpenAI 客户端"""
+        import httpx
+        from openai import AsyncOpenAI
+
+        transport = httpx.ASGITransport(app=self.create_app())
+        return AsyncOpenAI(
+            api_key="fake",
+            base_url="http://fake-openai",
+            http_client=httpx.AsyncClient(transport=transport, base_url="http://fake-openai"),
+        )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    import uvicorn
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    args = parser.parse_args()
+    uvicorn.run(FakeOpenAIServer().create_app(), host=args.host, port=args.port)
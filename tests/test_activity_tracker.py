@@ -0,0 +1,79 @@
+"""online_timer 在线时段与 last_seen 最后上线时间的内存跟踪测试"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_online_session_extends_and_splits() -> None:
+    from nonebot_plugin_online_timer.tracker import (
+        SESSION_GAP,
+        OnlineSession,
+        merge_pending_sessions,
+        online_sessions,
+        record_activity,
+        session_buffer,
+    )
+
+    record_activity("tracker_user")
+    first = online_sessions["tracker_user"]
+    record_activity("tracker_user")
+    assert online_sessions["tracker_user"] is first
+    # 超过间隔后开始新的时段，旧时段仍等待写入
+    first.end_time -= SESSION_GAP * 2
+    record_activity("tracker_user")
+    second = online_sessions["tracker_user"]
+    assert second is not first
+    assert first in session_buffer.items and second in session_buffer.items
+    pending = merge_pending_sessions([], "tracker_user")
+    assert pending == [first, second] or pending == [second, first]
+    assert all(isinstance(s, OnlineSession) for s in pending)
+    session_buffer.items.clear()
+    online_sessions.pop("tracker_user")
+
+
+@pytest.mark.asyncio
+async def test_last_seen_keeps_previous_time() -> None:
+    from nonebot_plugin_last_seen.tracker import (
+        LastSeen,
+        get_last_seen,
+        last_seen_buffer,
+        last_seen_cache,
+        update_last_seen,
+    )
+
+    key = ("tracker_user", "global")
+    earlier = datetime.now() - timedelta(hours=1)
+    last_seen_cache[key] = LastSeen(earlier)
+    await update_last_seen(*key)
+    assert last_seen_cache[key].previous_last_seen == earlier
+    # 当前在线时返回上一次下线时间
+    assert await get_last_seen(*key) == earlier
+    last_seen_buffer.items.clear()
+    last_seen_cache.pop(key)
+
+
+@pytest.mark.asyncio
+async def test_last_seen_keeps_entries_when_write_fails() -> None:
+    from unittest.mock import patch
+
+    from nonebot_plugin_last_seen.tracker import (
+        LastSeen,
+        last_seen_buffer,
+        last_seen_cache,
+        prune_last_seen,
+        write_last_seen,
+    )
+
+    key = ("tracker_user", "failed")
+    last_seen_cache[key] = LastSeen(datetime.now() - timedelta(hours=1))
+    with patch("nonebot_plugin_last_seen.tracker.get_session", side_effect=RuntimeError("database is down")):
+        with pytest.raises(RuntimeError):
+            await write_last_seen([key])
+    # 写入失败的记录等待下次写入，不会被移出内存
+    assert key in last_seen_buffer.items
+    prune_last_seen()
+    assert key in last_seen_cache
+    last_seen_buffer.items.clear()
+    last_seen_cache.pop(key)
@@ -0,0 +1,28 @@
+"""larkutils AhoCorasick 行为测试：与逐个子串查找结果一致、增删模式串后重新构建"""
+
+import random
+
+
+def test_find_all_matches_substring_scan() -> None:
+    from nonebot_plugin_larkutils.aho_corasick import AhoCorasick
+
+    rng = random.Random(0)
+    for _ in range(500):
+        # 使用小字母表以产生大量互为前后缀的模式串
+        patterns = {"".join(rng.choices("abc", k=rng.randint(1, 5))) for _ in range(rng.randint(1, 10))}
+        automaton = AhoCorasick(patterns)
+        text = "".join(rng.choices("abcd", k=rng.randint(0, 40)))
+        assert automaton.find_all(text) == {pattern for pattern in patterns if pattern in text}
+
+
+def test_add_discard_rebuilds_automaton() -> None:
+    from nonebot_plugin_larkutils.aho_corasick import AhoCorasick
+
+    automaton = AhoCorasick(["星期四", "KFC"])
+    assert automaton.find_all("疯狂星期四 v我50") == {"星期四"}
+    automaton.add("50")
+    automaton.discard("星期四")
+    assert automaton.find_all("疯狂星期四 v我50") == {"50"}
+    assert "星期四" not in automaton
+    assert len(automaton) == 2
+    assert automaton.find_all("") == set()
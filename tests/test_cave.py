@@ -21,6 +21,10 @@ async def eng():
 
 @pytest.fixture
 async def session(eng):
+    from nonebot_plugin_larkcave.utils.cave_pool import cave_pool
+
+    # 每个测试使用独立的数据库，清空 ID 池以便从当前数据库重新载入
+    cave_pool.clear()
     factory = async_sessionmaker(eng, expire_on_commit=False)
     async with factory() as s:
         yield s
@@ -0,0 +1,55 @@
+"""ghot 滑动窗口热度累加器测试：与逐条计算的 calculate_heat_score 结果一致"""
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_group_heat_matches_calculate_heat_score() -> None:
+    from nonebot_plugin_ghot.config import config
+    from nonebot_plugin_ghot.utils.score import TIME_WINDOWS, GroupHeat, calculate_heat_score
+
+    rng = random.Random(0)
+    start = datetime(2026, 1, 1, 12).replace(microsecond=0)
+    # 按秒取整的发送时间，与累加器的分桶粒度一致
+    timestamps = sorted(start + timedelta(seconds=rng.randint(0, 1800)) for _ in range(2000))
+    heat = GroupHeat()
+    cursor = 0
+    for offset in range(600, 1900, 97):
+        current_time = start + timedelta(seconds=offset, milliseconds=500)
+        while cursor < len(timestamps) and timestamps[cursor] <= current_time:
+            heat.add(timestamps[cursor])
+            cursor += 1
+        expected = [
+            await calculate_heat_score(timestamps[:cursor], current_time, delta_t, config.ghot_max_message_rate)
+            for delta_t in TIME_WINDOWS
+        ]
+        assert heat.get_scores(current_time) == tuple(expected)
+
+
+@pytest.mark.asyncio
+async def test_group_rankings_share_rank_on_ties() -> None:
+    from nonebot_plugin_ghot.utils.ranking import get_group_rankings
+
+    scores = {"a": (30, 20, 10), "b": (30, 10, 0), "c": (0, 0, 0)}
+    assert await get_group_rankings(scores, "b") == (1, 2, 2)
+    assert await get_group_rankings(scores, "c") == (3, 3, 2)
+    assert await get_group_rankings(scores, "d") == (0, 0, 0)
+
+
+@pytest.mark.asyncio
+async def test_group_heat_expires_without_queries() -> None:
+    from nonebot_plugin_ghot.utils.score import TIME_WINDOWS, group_heats, record_group_message
+
+    start = datetime(2026, 1, 1, 12)
+    for offset in range(3600):
+        record_group_message("busy", start + timedelta(seconds=offset))
+    record_group_message("quiet", start)
+    # 未被查询的群也只保留窗口内的分桶
+    assert [len(window.buckets) for window in group_heats["busy"].windows] == [d + 1 for d in TIME_WINDOWS]
+    # 所有窗口均为空的群会被移除
+    record_group_message("busy", start + timedelta(seconds=3600 + max(TIME_WINDOWS) + 1))
+    assert "quiet" not in group_heats
+    assert "busy" in group_heats
@@ -0,0 +1,56 @@
+"""larkutils HammingIndex 行为测试：与线性扫描结果一致、增删后索引保持一致"""
+
+import random
+
+
+def brute_force(values: dict[int, int], query: int, max_distance: int) -> set[int]:
+    return {key for key, value in values.items() if (value ^ query).bit_count() <= max_distance}
+
+
+def test_search_matches_linear_scan() -> None:
+    from nonebot_plugin_larkutils.hamming import HammingIndex
+
+    rng = random.Random(0)
+    index: HammingIndex[int] = HammingIndex(bits=256, chunks=8)
+    values = {key: rng.getrandbits(256) for key in range(500)}
+    for key, value in values.items():
+        index.add(key, value)
+    # 覆盖每段精确查找（d < 8）、单段枚举（d >= 8）与退化为线性扫描（d >= 24）三种情况
+    for max_distance in (0, 5, 12, 30):
+        for _ in range(20):
+            query = rng.choice(list(values.values()))
+            for position in rng.sample(range(256), rng.randint(0, max_distance + 2)):
+                query ^= 1 << position
+            result = index.search(query, max_distance)
+            assert {key for key, _ in result} == brute_force(values, query, max_distance)
+            assert [distance for _, distance in result] == sorted(distance for _, distance in result)
+
+
+def test_add_remove_keeps_index_consistent() -> None:
+    from nonebot_plugin_larkutils.hamming import HammingIndex
+
+    index: HammingIndex[str] = HammingIndex(bits=16, chunks=4)
+    index.add("a", 0x1234)
+    index.add("b", 0x1234)
+    index.add("c", 0x1235)
+    assert {key for key, _ in index.search(0x1234, 0)} == {"a", "b"}
+    index.remove("a")
+    assert index.nearest(0x1234, 1) == ("b", 0)
+    # 重复添加同一 key 会替换原有的哈希
+    index.add("b", 0xFFFF)
+    assert index.nearest(0x1234, 1) == ("c", 1)
+    index.remove_many(["b", "c", "missing"])
+    assert len(index) == 0
+    assert all(not table for table in index.tables)
+
+
+def test_add_hex_rejects_invalid_hash() -> None:
+    from nonebot_plugin_larkutils.hamming import HammingIndex, get_max_distance
+
+    index: HammingIndex[int] = HammingIndex(bits=256)
+    assert index.add_hex(1, "f" * 64)
+    assert not index.add_hex(2, "f" * 16)
+    assert not index.add_hex(3, "")
+    assert not index.add_hex(1, "z" * 64)
+    assert len(index) == 0
+    assert get_max_distance(0.98, 256) == 5
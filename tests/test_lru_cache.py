@@ -0,0 +1,37 @@
+"""larkutils LRUCache 行为测试：容量淘汰、访问顺序与过期"""
+
+
+def test_lru_evicts_least_recently_used() -> None:
+    from nonebot_plugin_larkutils.cache import LRUCache
+
+    cache: LRUCache[str, int] = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    # 访问 a 后，b 成为最久未使用的项
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_lru_ttl_expires() -> None:
+    from nonebot_plugin_larkutils.cache import LRUCache
+
+    cache: LRUCache[str, int] = LRUCache(maxsize=4, ttl=0)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_lru_pop_and_discard() -> None:
+    from nonebot_plugin_larkutils.cache import LRUCache
+
+    cache: LRUCache[str, int] = LRUCache()
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.pop("a") == 1
+    assert cache.pop("a") is None
+    cache.discard_many(["b", "c"])
+    assert len(cache) == 0
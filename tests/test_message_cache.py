@@ -0,0 +1,85 @@
+"""CachedMessageStore 行为测试：容量淘汰、索引与聊天记录文本"""
+
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+
+import pytest
+
+if TYPE_CHECKING:
+    from nonebot_plugin_chat.core.session.message_cache import CachedMessageStore
+    from nonebot_plugin_chat.types import CachedMessage
+
+
+def make_message(index: int, user_id: str, self_message: bool = False, content: str = "") -> "CachedMessage":
+    return {
+        "content": content or f"消息 {index}",
+        "nickname": "Moonlark" if self_message else f"用户{user_id}",
+        "user_id": "" if self_message else user_id,
+        "platform_user_id": "" if self_message else f"p{user_id}",
+        "send_time": datetime(2026, 1, 1, 12) + timedelta(seconds=index),
+        "images": [],
+        "self": self_message,
+        "message_id": str(index),
+        "to_me": False,
+        "triggered_reply": False,
+    }
+
+
+@pytest.fixture
+def store() -> "CachedMessageStore":
+    from nonebot_plugin_chat.core.session.message_cache import CachedMessageStore
+
+    return CachedMessageStore(5)
+
+
+def test_store_evicts_oldest(store: "CachedMessageStore") -> None:
+    for i in range(8):
+        store.append(make_message(i, str(i % 2)))
+    assert len(store) == 5
+    assert [msg["message_id"] for msg in store] == ["3", "4", "5", "6", "7"]
+    assert store[-1]["message_id"] == "7"
+    assert [msg["message_id"] for msg in store[:-3]] == ["3", "4"]
+    assert [msg["message_id"] for msg in reversed(store)][0] == "7"
+
+
+def test_store_indexes_follow_eviction(store: "CachedMessageStore") -> None:
+    store.append(make_message(0, "a"))
+    for i in range(1, 6):
+        store.append(make_message(i, "b"))
+    assert store.get_by_message_id("0") is None
+    assert store.get_by_message_id("5")["user_id"] == "b"
+    assert store.get_user_messages("a") == []
+    assert [msg["message_id"] for msg in store.get_user_messages("b", 2)] == ["4", "5"]
+    assert store.get_users() == {"用户b": "pb"}
+
+
+def test_store_string_matches_filters(store: "CachedMessageStore") -> None:
+    store.append(make_message(0, "a"))
+    store.append(make_message(1, "", self_message=True))
+    store.append(make_message(2, "b", content="/command"))
+    store.append(make_message(3, "a"))
+    assert store.get_string(length=2) == "[12:00:02][用户b]: /command\n[12:00:03][用户a]: 消息 3"
+    assert store.get_string(length=2, exclude_content_prefixes=("/",)) == (
+        "[12:00:00][用户a]: 消息 0\n[12:00:03][用户a]: 消息 3"
+    )
+    assert store.get_string(length=2, include_self_message=True, exclude_content_prefixes=("/",)) == (
+        "[12:00:01][Moonlark]: 消息 1\n[12:00:03][用户a]: 消息 3"
+    )
+
+
+def test_store_average_fav(store: "CachedMessageStore") -> None:
+    """好感度之和应随消息写入、淘汰与好感度变化滚动更新"""
+    store.append(make_message(0, "a"))
+    store.set_user_fav("a", 0.5)
+    store.append(make_message(1, "", self_message=True))
+    store.append(make_message(2, "b"))
+    store.set_user_fav("b", 0.2)
+    store.append(make_message(3, "a"))
+    assert store.get_average_fav() == pytest.approx((0.5 + 0.2 + 0.5) / 4)
+    store.set_user_fav("a", 0.1)
+    store.set_user_fav("c", 1.0)
+    assert store.get_average_fav() == pytest.approx((0.1 + 0.2 + 0.1) / 4)
+    for i in range(4, 8):
+        store.append(make_message(i, "", self_message=True))
+    assert len(store) == 5
+    assert store.get_average_fav() == pytest.approx(0.1 / 5)
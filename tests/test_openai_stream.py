@@ -0,0 +1,152 @@
+import asyncio
+from typing import Any
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+
+def make_function(func, parameters: dict[str, Any] | None = None, parallel: bool = False) -> dict[str, Any]:
+    return {"func": func, "description": func.__name__, "parameters": parameters or {}, "parallel": parallel}
+
+
+async def create_fetcher(functions: list, stream: bool):
+    from nonebot_plugin_openai.utils.chat import MessageFetcher
+    from nonebot_plugin_openai.utils.message import generate_message
+
+    return await MessageFetcher.create(
+        [generate_message("你好", "user")],
+        model="fake",
+        identify="test",
+        functions=functions,
+        stream=stream,
+    )
+
+
+async def run_overlapping_tools(parallel: bool) -> bool:
+    """让模型在一轮回复中调用 first 与 second，返回两者是否重叠执行"""
+    from fake_openai import FakeOpenAIServer, FakeReply
+
+    server = FakeOpenAIServer()
+    server.replies.append(FakeReply(content="思考中", tool_calls=[("first", {"value": 1}), ("second", {"value": 2})]))
+    server.replies.append(FakeReply(content="完成"))
+    running: set[str] = set()
+    overlapped = False
+
+    async def first(value: int) -> str:
+        nonlocal overlapped
+        running.add("first")
+        await asyncio.sleep(0.05)
+        overlapped = overlapped or "second" in running
+        running.discard("first")
+        return f"first {value}"
+
+    async def second(value: int) -> str:
+        nonlocal overlapped
+        overlapped = overlapped or "first" in running
+        running.add("second")
+        await asyncio.sleep(0.05)
+        running.discard("second")
+        return f"second {value}"
+
+    with (
+        patch("nonebot_plugin_openai.utils.chat.client", server.create_client()),
+        patch("nonebot_plugin_openai.utils.chat.report_openai_history", new=AsyncMock()),
+    ):
+        fetcher = await create_fetcher(
+            [make_function(first, parallel=parallel), make_function(second, parallel=parallel)], True
+        )
+        replies = [message async for message in fetcher.fetch_message_stream()]
+
+    assert replies == ["思考中", "完成"]
+    assert server.requests[0]["stream"] is True
+    messages = fetcher.get_messages()
+    assert [call.function.name for call in messages[1].tool_calls] == ["first", "second"]
+    assert [msg["content"] for msg in messages[2:4]] == ["first 1", "second 2"]
+    assert [msg["tool_call_id"] for msg in messages[2:4]] == [call.id for call in messages[1].tool_calls]
+    return overlapped
+
+
+@pytest.mark.asyncio
+async def test_stream_dispatches_tool_calls_serially() -> None:
+    """未声明 parallel 的工具调用应按下发顺序依次执行，结果按调用顺序写入消息列表"""
+    assert not await run_overlapping_tools(False)
+
+
+@pytest.mark.asyncio
+async def test_stream_dispatches_parallel_tool_calls_concurrently() -> None:
+    """声明了 parallel 的工具调用应并发执行，结果仍按调用顺序写入消息列表"""
+    assert await run_overlapping_tools(True)
+
+
+@pytest.mark.asyncio
+async def test_serial_tool_call_waits_for_parallel_calls() -> None:
+    """普通调用不应越过在它之前下发的并发调用"""
+    from fake_openai import FakeOpenAIServer, FakeReply
+
+    server = FakeOpenAIServer()
+    server.replies.append(
+        FakeReply(tool_calls=[("lookup", {"text": "a"}), ("lookup", {"text": "b"}), ("send", {"text": "c"})])
+    )
+    server.replies.append(FakeReply(content="完成"))
+    finished: list[str] = []
+
+    async def lookup(text: str) -> str:
+        await asyncio.sleep(0.05 if text == "a" else 0.01)
+        finished.append(text)
+        return text
+
+    async def send(text: str) -> None:
+        finished.append(text)
+
+    with (
+        patch("nonebot_plugin_openai.utils.chat.client", server.create_client()),
+        patch("nonebot_plugin_openai.utils.chat.report_openai_history", new=AsyncMock()),
+    ):
+        fetcher = await create_fetcher([make_function(lookup, parallel=True), make_function(send)], False)
+        assert await fetcher.fetch_last_message() == "完成"
+
+    assert finished == ["b", "a", "c"]
+
+
+@pytest.mark.asyncio
+async def test_stream_yields_content_deltas() -> None:
+    """fetch_delta_stream 应逐段产出回复内容"""
+    from fake_openai import FakeOpenAIServer, FakeReply
+
+    server = FakeOpenAIServer()
+    server.replies.append(FakeReply(content="这是一段比较长的回复内容", chunk_size=3))
+
+    with (
+        patch("nonebot_plugin_openai.utils.chat.client", server.create_client()),
+        patch("nonebot_plugin_openai.utils.chat.report_openai_history", new=AsyncMock()),
+    ):
+        fetcher = await create_fetcher([], True)
+        deltas = [message async for message in fetcher.fetch_delta_stream()]
+
+    assert len(deltas) > 1
+    assert "".join(deltas) == "这是一段比较长的回复内容"
+    assert fetcher.get_messages()[-1].content == "这是一段比较长的回复内容"
+
+
+@pytest.mark.asyncio
+async def test_same_tool_calls_keep_order() -> None:
+    """同名工具的多次调用应按顺序执行"""
+    from fake_openai import FakeOpenAIServer, FakeReply
+
+    server = FakeOpenAIServer()
+    server.replies.append(FakeReply(tool_calls=[("send", {"text": "a"}), ("send", {"text": "b"})]))
+    server.replies.append(FakeReply(content="完成"))
+    sent: list[str] = []
+
+    async def send(text: str) -> None:
+        await asyncio.sleep(0.05 if text == "a" else 0)
+        sent.append(text)
+
+    with (
+        patch("nonebot_plugin_openai.utils.chat.client", server.create_client()),
+        patch("nonebot_plugin_openai.utils.chat.report_openai_history", new=AsyncMock()),
+    ):
+        fetcher = await create_fetcher([make_function(send)], False)
+        assert await fetcher.fetch_last_message() == "完成"
+
+    assert sent == ["a", "b"]
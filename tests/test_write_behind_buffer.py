@@ -0,0 +1,54 @@
+"""larkutils WriteBehindBuffer 行为测试：延迟批量写入、满额立即写入与异常处理"""
+
+import asyncio
+
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_buffer_flushes_in_batches() -> None:
+    from nonebot_plugin_larkutils.buffer import WriteBehindBuffer
+
+    batches: list[list[int]] = []
+
+    async def writer(items: list[int]) -> None:
+        batches.append(items)
+
+    buffer: WriteBehindBuffer[int] = WriteBehindBuffer(writer, interval=0.05)
+    for i in range(3):
+        buffer.append(i)
+    assert batches == []
+    await asyncio.sleep(0.1)
+    assert batches == [[0, 1, 2]]
+    buffer.append(3)
+    await buffer.flush()
+    assert batches == [[0, 1, 2], [3]]
+
+
+@pytest.mark.asyncio
+async def test_buffer_flushes_when_full() -> None:
+    from nonebot_plugin_larkutils.buffer import WriteBehindBuffer
+
+    batches: list[list[int]] = []
+
+    async def writer(items: list[int]) -> None:
+        batches.append(items)
+
+    buffer: WriteBehindBuffer[int] = WriteBehindBuffer(writer, interval=10, max_size=2)
+    buffer.append(1)
+    buffer.append(2)
+    await asyncio.sleep(0.01)
+    assert batches == [[1, 2]]
+
+
+@pytest.mark.asyncio
+async def test_buffer_drops_failed_batch() -> None:
+    from nonebot_plugin_larkutils.buffer import WriteBehindBuffer
+
+    async def writer(items: list[int]) -> None:
+        raise RuntimeError("write failed")
+
+    buffer: WriteBehindBuffer[int] = WriteBehindBuffer(writer, interval=0.01)
+    buffer.append(1)
+    await buffer.flush()
+    assert len(buffer) == 0